@@ -0,0 +1,188 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Generate a synthetic repository of slideshows to benchmark builds on.
+
+Run with `python benchmarks/corpus.py DIRECTORY` to inspect or profile a
+corpus. The same parameters and seed always generate the same files, so
+timings of different runs can be compared.
+"""
+
+import argparse
+import os
+import random
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+# Number of subdirectories of each directory of the navigation tree
+DIRECTORIES_PER_LEVEL = 4
+PREPROCESS_SCRIPT_COUNT = 4
+IMAGE_SIZE = 4096
+THEMES = ["black", "white", "solarized", "moon"]
+TRANSITIONS = ["none", "fade", "slide", "zoom"]
+
+
+@dataclass(frozen=True)
+class CorpusSpec:
+    decks: int = 200
+    slides: int = 20
+    link_density: float = 0.2
+    images: int = 50
+    frontmatter_ratio: float = 0.5
+    preprocess_ratio: float = 0.25
+    nav_depth: int = 2
+    seed: int = 0
+
+
+CORPUS_SPEC_HELP = {
+    "decks": "Number of slideshows.",
+    "slides": "Number of slides in each slideshow.",
+    "link_density": "Average number of links to other slideshows on a slide.",
+    "images": "Number of images, each slide shows one of them.",
+    "frontmatter_ratio": "Fraction of the slideshows with frontmatter overrides.",
+    "preprocess_ratio": "Fraction of the slideshows with a preprocess script.",
+    "nav_depth": "Depth of the directories the slideshows are in.",
+    "seed": "Seed of the random choices.",
+}
+
+
+def get_deck_path(slides_path: Path, index: int, nav_depth: int) -> Path:
+    parts = [
+        f"section-{index // DIRECTORIES_PER_LEVEL**level % DIRECTORIES_PER_LEVEL}"
+        for level in range(nav_depth)
+    ]
+    return slides_path.joinpath(*parts, f"deck-{index}.md")
+
+
+def get_relative_url(from_path: Path, to_path: Path) -> str:
+    return Path(os.path.relpath(to_path, from_path.parent)).as_posix()
+
+
+def generate_corpus(spec: CorpusSpec, slides_path: Path) -> list[Path]:
+    """Generate the corpus in an empty directory and return the paths of the slideshows."""
+    rng = random.Random(spec.seed)  # noqa: S311
+
+    image_paths = [slides_path / "img" / f"image-{i}.png" for i in range(spec.images)]
+    for image_index, image_path in enumerate(image_paths):
+        image_path.parent.mkdir(parents=True, exist_ok=True)
+        image_path.write_bytes(image_index.to_bytes(4) * (IMAGE_SIZE // 4))
+
+    script_paths = [
+        slides_path / "scripts" / f"preprocess_{i}.py"
+        for i in range(PREPROCESS_SCRIPT_COUNT)
+    ]
+    if spec.preprocess_ratio > 0:
+        for script_index, script_path in enumerate(script_paths):
+            script_path.parent.mkdir(parents=True, exist_ok=True)
+            script_path.write_text(
+                "def preprocess(markdown_content: str) -> str:\n"
+                f'    return markdown_content.replace("@@", "Script {script_index}")\n',
+            )
+
+    deck_paths = [
+        get_deck_path(slides_path, index, spec.nav_depth) for index in range(spec.decks)
+    ]
+    for index, deck_path in enumerate(deck_paths):
+        frontmatter = generate_frontmatter(spec, rng, index, deck_path, script_paths)
+
+        lines = [f"# Deck {index}", "", "Generated by @@", ""]
+        for slide_index in range(spec.slides):
+            lines.extend(["---", "", f"## Slide {slide_index}", ""])
+            lines.extend(
+                f"- Item {item} with **bold** text and `code`" for item in range(3)
+            )
+            lines.append("")
+
+            link_count = int(spec.link_density) + (rng.random() < spec.link_density % 1)
+            for _ in range(link_count):
+                target_path = deck_paths[rng.randrange(spec.decks)]
+                lines.append(
+                    f"[{target_path.stem}]({get_relative_url(deck_path, target_path)})",
+                )
+            if image_paths:
+                image_path = rng.choice(image_paths)
+                lines.extend(
+                    ["", f"![Image]({get_relative_url(deck_path, image_path)})"],
+                )
+            lines.append("")
+
+        content = "\n".join(lines)
+        if frontmatter:
+            content = f"---\n{yaml.safe_dump(frontmatter)}---\n\n{content}"
+
+        deck_path.parent.mkdir(parents=True, exist_ok=True)
+        deck_path.write_text(content)
+
+    return deck_paths
+
+
+def generate_frontmatter(
+    spec: CorpusSpec,
+    rng: random.Random,
+    index: int,
+    deck_path: Path,
+    script_paths: list[Path],
+) -> dict[str, Any]:
+    frontmatter: dict[str, Any] = {}
+    if rng.random() < spec.frontmatter_ratio:
+        frontmatter["slides"] = {
+            "title": f"Deck {index}",
+            "theme": rng.choice(THEMES),
+        }
+        frontmatter["revealjs"] = {"transition": rng.choice(TRANSITIONS)}
+
+    if rng.random() < spec.preprocess_ratio:
+        frontmatter.setdefault("slides", {})["preprocess_script"] = get_relative_url(
+            deck_path,
+            rng.choice(script_paths),
+        )
+
+    return frontmatter
+
+
+def add_corpus_arguments(parser: argparse.ArgumentParser) -> None:
+    for spec_field in fields(CorpusSpec):
+        parser.add_argument(
+            f"--{spec_field.name.replace('_', '-')}",
+            type=type(spec_field.default),
+            default=spec_field.default,
+            help=f"{CORPUS_SPEC_HELP[spec_field.name]} Default: {spec_field.default}.",
+        )
+
+
+def get_corpus_spec(args: argparse.Namespace) -> CorpusSpec:
+    return CorpusSpec(
+        **{
+            spec_field.name: getattr(args, spec_field.name)
+            for spec_field in fields(CorpusSpec)
+        },
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "directory",
+        type=Path,
+        help="Empty or new directory to generate the corpus in.",
+    )
+    add_corpus_arguments(parser)
+    args = parser.parse_args()
+
+    if args.directory.exists() and any(args.directory.iterdir()):
+        parser.error(f"'{args.directory}' is not empty")
+
+    spec = get_corpus_spec(args)
+    deck_paths = generate_corpus(spec, args.directory)
+    print(
+        f"Generated {len(deck_paths)} slideshows in '{args.directory}': {asdict(spec)}",
+    )
+
+
+if __name__ == "__main__":
+    main()
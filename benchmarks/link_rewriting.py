@@ -0,0 +1,112 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Benchmark the rewriting of .md links on generated decks with many cross-links.
+
+Run with `python benchmarks/link_rewriting.py`. The time per link should stay
+roughly constant as the number of links grows.
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from mkslides.config import SlideConfigResolver, get_config
+from mkslides.linkscanner import find_link_spans
+from mkslides.markupgenerator import MarkupGenerator
+from mkslides.mdfiletoprocess import MdFileToProcess
+
+DEFAULT_LINK_COUNTS = [1000, 2000, 4000, 8000]
+DEFAULT_REPEAT = 3
+
+
+def generate_deck(slides_path: Path, link_count: int) -> Path:
+    """Generate a deck linking to `link_count` other decks, in markdown and HTML links."""
+    lines = ["# Cross-links", ""]
+    html_links = []
+    for index in range(link_count):
+        target = f"deck-{index}.md"
+        (slides_path / target).write_text(f"# Deck {index}\n")
+
+        if index % 2:
+            html_links.append(f'<a target="_blank" href="./{target}">{index}</a>')
+        else:
+            lines.append(f"- [Deck {index}](./{target})")
+
+    # A single long line of HTML links
+    lines.extend(["", f"<p>{' '.join(html_links)}</p>", ""])
+
+    deck_path = slides_path / "index.md"
+    deck_path.write_text("\n".join(lines))
+
+    return deck_path
+
+
+def run(link_count: int, repeat: int) -> tuple[int, float]:
+    """Return the deck size and the best time to check and rewrite its links."""
+    with tempfile.TemporaryDirectory() as directory:
+        slides_path = Path(directory) / "slides"
+        slides_path.mkdir()
+        deck_path = generate_deck(slides_path, link_count)
+        content = deck_path.read_text()
+
+        config = get_config()
+        markup_generator = MarkupGenerator(
+            config,
+            slides_path,
+            Path(directory) / "site",
+            strict=True,
+        )
+
+        link_spans = find_link_spans(content)
+
+        best_time = float("inf")
+        for _ in range(repeat):
+            md_file_data = MdFileToProcess(
+                source_path=deck_path.resolve(),
+                destination_path=Path(directory) / "site" / "index.html",
+                slide_config=SlideConfigResolver(config).base,
+                markdown_content=content,
+                relative_links={link_span.link for link_span in link_spans},
+                link_spans=link_spans,
+            )
+            start_time = time.perf_counter()
+            md_file_data, _ = markup_generator.check_relative_links(md_file_data)
+            best_time = min(best_time, time.perf_counter() - start_time)
+
+        assert ".md" not in md_file_data.markdown_content
+
+    return len(content), best_time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "link_counts",
+        nargs="*",
+        type=int,
+        default=DEFAULT_LINK_COUNTS,
+        help="Numbers of cross-links to generate.",
+    )
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help="Number of runs per deck, the best one is reported.",
+    )
+    args = parser.parse_args()
+
+    print(f"{'links':>8} {'size (KiB)':>12} {'time (ms)':>12} {'µs/link':>10}")
+    for link_count in args.link_counts:
+        size, best_time = run(link_count, args.repeat)
+        print(
+            f"{link_count:>8} {size / 1024:>12.1f} {best_time * 1000:>12.1f} {best_time / link_count * 1e6:>10.2f}",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Benchmark the cost of resolving the configuration of a slideshow.
+
+Run with `python benchmarks/slide_config.py [CONFIG_FILE]`. Before is the full
+copy of the global config that was updated with the frontmatter for each
+slideshow, after is the shared base with the frontmatter applied on top.
+"""
+
+import argparse
+import time
+import tracemalloc
+from collections.abc import Callable
+from copy import deepcopy
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from omegaconf import DictConfig, OmegaConf
+
+from mkslides.config import FRONTMATTER_ALLOWED_KEYS, SlideConfigResolver, get_config
+
+DEFAULT_DECK_COUNT = 1000
+
+FRONTMATTERS: dict[str, dict[str, Any]] = {
+    "none": {},
+    "title": {"slides": {"title": "Title"}},
+    "typical": {
+        "slides": {"title": "Title", "theme": "solarized", "separator": "<!--s-->"},
+        "revealjs": {"width": 1920, "height": 1080, "transition": "zoom"},
+    },
+    "interpolated": {"slides": {"title": "${index.title}: deck"}},
+}
+
+
+def resolve_before(global_config: DictConfig, frontmatter: dict[str, Any]) -> Any:
+    slide_config = deepcopy(global_config)
+    for key in FRONTMATTER_ALLOWED_KEYS:
+        if key in frontmatter:
+            OmegaConf.update(slide_config, key, frontmatter[key])
+
+    # Converted again for every render
+    OmegaConf.to_container(slide_config.revealjs)
+
+    return slide_config
+
+
+def measure(resolve: Callable[[], Any], deck_count: int) -> tuple[float, float]:
+    """Return the time in µs and the retained memory in KiB per slideshow."""
+    start_time = time.perf_counter()
+    for _ in range(deck_count):
+        resolve()
+    duration = time.perf_counter() - start_time
+
+    tracemalloc.start()
+    slide_configs = [resolve() for _ in range(deck_count)]
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del slide_configs
+
+    return duration / deck_count * 1e6, memory / deck_count / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "config_file",
+        nargs="?",
+        type=Path,
+        default=None,
+        help="Config file to use as global config.",
+    )
+    parser.add_argument(
+        "-n",
+        "--decks",
+        type=int,
+        default=DEFAULT_DECK_COUNT,
+        help="Number of slideshows to resolve the config for.",
+    )
+    args = parser.parse_args()
+
+    global_config = get_config(args.config_file)
+    resolver = SlideConfigResolver(global_config)
+
+    print(
+        f"{'frontmatter':>12} {'before (µs)':>12} {'after (µs)':>12} {'before (KiB)':>13} {'after (KiB)':>12}",
+    )
+    for name, frontmatter in FRONTMATTERS.items():
+        before_time, before_memory = measure(
+            partial(resolve_before, global_config, frontmatter),
+            args.decks,
+        )
+        after_time, after_memory = measure(
+            partial(resolver.resolve, frontmatter),
+            args.decks,
+        )
+        print(
+            f"{name:>12} {before_time:>12.1f} {after_time:>12.1f} {before_memory:>13.2f} {after_memory:>12.2f}",
+        )
+
+
+if __name__ == "__main__":
+    main()
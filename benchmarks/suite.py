@@ -0,0 +1,286 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Benchmark builds on a generated corpus and compare them against a baseline.
+
+Run with `python benchmarks/suite.py`. It times cold builds, warm incremental
+builds without changes and the rebuilds after a change while serving. The
+median of each scenario is compared against `benchmarks/baseline.json` and the
+script exits with status 1 if one of them is slower than the baseline by more
+than the tolerance. Timings depend on the machine, so run it with
+`--save-baseline` on the same machine before making changes to get a
+meaningful comparison.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+from corpus import (
+    CorpusSpec,
+    add_corpus_arguments,
+    generate_corpus,
+    get_corpus_spec,
+)
+
+from mkslides.config import get_config
+from mkslides.constants import CACHE_DIR_ENV_VAR
+from mkslides.markupgenerator import MarkupGenerator
+
+DEFAULT_BASELINE_PATH = Path(__file__).parent / "baseline.json"
+DEFAULT_REPEAT = 5
+DEFAULT_TOLERANCE = 0.25
+
+# Differences below this are noise, whatever the tolerance
+MIN_REGRESSION_MS = 2.0
+
+
+class Corpus:
+    def __init__(self, spec: CorpusSpec, directory: Path) -> None:
+        self.slides_path = directory / "slides"
+        self.output_path = directory / "site"
+        self.cache_path = directory / "cache"
+        self.deck_paths = [
+            path.resolve() for path in generate_corpus(spec, self.slides_path)
+        ]
+        self.image_path = (self.slides_path / "img" / "image-0.png").resolve()
+        self.script_path = (self.slides_path / "scripts" / "preprocess_0.py").resolve()
+        self.config = get_config()
+
+    def create_markup_generator(self, *, incremental: bool) -> MarkupGenerator:
+        return MarkupGenerator(
+            self.config,
+            self.slides_path,
+            self.output_path,
+            strict=True,
+            incremental=incremental,
+        )
+
+
+def measure[T](
+    run: Callable[[T], None],
+    repeat: int,
+    prepare: Callable[[int], T],
+) -> dict[str, float]:
+    """Return the median, min and max time in ms of the runs, without the time to prepare each run."""
+    times = []
+    for iteration in range(repeat):
+        argument = prepare(iteration)
+        start_time = time.perf_counter()
+        run(argument)
+        times.append((time.perf_counter() - start_time) * 1000)
+
+    times.sort()
+    return {
+        "median_ms": round(times[len(times) // 2], 3),
+        "min_ms": round(times[0], 3),
+        "max_ms": round(times[-1], 3),
+    }
+
+
+def benchmark_cold_build(corpus: Corpus, repeat: int) -> dict[str, float]:
+    """Benchmark building without the output and the caches kept across builds, as a first build would."""
+
+    def remove_output_and_cache(_: int) -> None:
+        shutil.rmtree(corpus.output_path, ignore_errors=True)
+        shutil.rmtree(corpus.cache_path, ignore_errors=True)
+
+    def run(_: None) -> None:
+        corpus.create_markup_generator(incremental=False).process_markdown()
+
+    return measure(run, repeat, remove_output_and_cache)
+
+
+def benchmark_warm_build(corpus: Corpus, repeat: int) -> dict[str, float]:
+    """Benchmark running the incremental build again without changes, as a new process would."""
+    shutil.rmtree(corpus.output_path, ignore_errors=True)
+    corpus.create_markup_generator(incremental=True).process_markdown()
+
+    def run(_: int) -> None:
+        corpus.create_markup_generator(incremental=True).process_markdown()
+
+    return measure(run, repeat, int)
+
+
+def benchmark_reloads(corpus: Corpus, repeat: int) -> dict[str, dict[str, float]]:
+    """Benchmark rebuilding after a change while serving, for different kinds of changes."""
+    shutil.rmtree(corpus.output_path, ignore_errors=True)
+    markup_generator = corpus.create_markup_generator(incremental=True)
+    markup_generator.process_markdown()
+
+    deck_path = corpus.deck_paths[len(corpus.deck_paths) // 2]
+
+    def edit_deck(iteration: int) -> Path:
+        deck_path.write_text(deck_path.read_text() + f"\nEdit {iteration}\n")
+        return deck_path
+
+    def add_deck(iteration: int) -> Path:
+        new_deck_path = deck_path.with_name(f"new-deck-{iteration}.md")
+        new_deck_path.write_text(f"# New deck {iteration}\n")
+        return new_deck_path
+
+    def edit_image(iteration: int) -> Path:
+        corpus.image_path.write_bytes(iteration.to_bytes(4) * 1024)
+        return corpus.image_path
+
+    def edit_script(iteration: int) -> Path:
+        corpus.script_path.write_text(
+            corpus.script_path.read_text() + f"\n# Edit {iteration}\n",
+        )
+        return corpus.script_path
+
+    edits: dict[str, Callable[[int], Path]] = {
+        "reload_deck": edit_deck,
+        "reload_new_deck": add_deck,
+        "reload_image": edit_image,
+    }
+    if corpus.script_path.exists():
+        edits["reload_script"] = edit_script
+
+    def rebuild(changed_path: Path) -> None:
+        # The stat cache is invalidated after a change, as serve does
+        markup_generator.stat_cache.invalidate([changed_path])
+        markup_generator.process_changes({changed_path})
+
+    return {name: measure(rebuild, repeat, edit) for name, edit in edits.items()}
+
+
+def run_benchmarks(spec: CorpusSpec, repeat: int) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory() as directory:
+        start_time = time.perf_counter()
+        corpus = Corpus(spec, Path(directory))
+        # Use a cache the cold builds can clear, instead of the user cache
+        os.environ[CACHE_DIR_ENV_VAR] = str(corpus.cache_path)
+        print(
+            f"Generated {len(corpus.deck_paths)} slideshows in {time.perf_counter() - start_time:.1f}s",
+        )
+
+        benchmarks = {
+            "cold_build": benchmark_cold_build(corpus, repeat),
+            "warm_build": benchmark_warm_build(corpus, repeat),
+            **benchmark_reloads(corpus, repeat),
+        }
+
+    return {
+        "corpus": asdict(spec),
+        "repeat": repeat,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "benchmarks": benchmarks,
+    }
+
+
+def compare(
+    results: dict[str, Any],
+    baseline: dict[str, Any],
+    tolerance: float,
+) -> list[str]:
+    """Print the comparison with the baseline and return the names of the regressed benchmarks."""
+    print(f"{'benchmark':>16} {'baseline (ms)':>14} {'median (ms)':>12} {'change':>8}")
+
+    regressions = []
+    for name, result in results["benchmarks"].items():
+        median = result["median_ms"]
+        if name not in baseline["benchmarks"]:
+            print(f"{name:>16} {'-':>14} {median:>12.1f} {'-':>8}")
+            continue
+
+        baseline_median = baseline["benchmarks"][name]["median_ms"]
+        change = median / baseline_median - 1 if baseline_median else 0.0
+        is_regression = (
+            change > tolerance and median - baseline_median > MIN_REGRESSION_MS
+        )
+        if is_regression:
+            regressions.append(name)
+
+        print(
+            f"{name:>16} {baseline_median:>14.1f} {median:>12.1f} {change:>+8.0%}"
+            + ("  REGRESSION" if is_regression else ""),
+        )
+
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    add_corpus_arguments(parser)
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help=f"Number of runs of each benchmark, the median is compared. Default: {DEFAULT_REPEAT}.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        default=None,
+        help="Write the results as JSON to this file.",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=DEFAULT_BASELINE_PATH,
+        help="Results to compare against. Default: benchmarks/baseline.json.",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Save the results as the baseline instead of comparing against it.",
+    )
+    parser.add_argument(
+        "-t",
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help=f"Fraction a median may be slower than the baseline. Default: {DEFAULT_TOLERANCE}.",
+    )
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    spec = get_corpus_spec(args)
+    baseline = None
+    if not args.save_baseline and args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        if baseline["corpus"] != asdict(spec):
+            print(
+                f"FAILED: the baseline is for another corpus, run with the same corpus arguments: {baseline['corpus']}",
+            )
+            sys.exit(1)
+
+    results = run_benchmarks(spec, args.repeat)
+    results_json = json.dumps(results, indent=4) + "\n"
+    if args.output:
+        args.output.write_text(results_json)
+
+    if baseline is None:
+        compare(results, {"benchmarks": {}}, args.tolerance)
+        if args.save_baseline:
+            args.baseline.write_text(results_json)
+            print(f"Saved baseline to '{args.baseline}'")
+        else:
+            print(f"No baseline at '{args.baseline}', run with --save-baseline first")
+        return
+
+    if regressions := compare(results, baseline, args.tolerance):
+        print(
+            f"FAILED: {', '.join(regressions)} slower than the baseline by more than {args.tolerance:.0%}",
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
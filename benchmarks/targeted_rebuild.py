@@ -0,0 +1,124 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Benchmark the rebuild after a change while serving, on a generated repository.
+
+Run with `python benchmarks/targeted_rebuild.py`. It compares the full
+incremental build that serve used to do on every change with the targeted
+rebuild of the changed files.
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+from collections.abc import Callable
+from functools import partial
+from pathlib import Path
+
+from mkslides.config import get_config
+from mkslides.markupgenerator import MarkupGenerator
+
+DEFAULT_DECK_COUNT = 900
+DEFAULT_REPEAT = 5
+
+
+def generate_repository(slides_path: Path, deck_count: int) -> None:
+    for index in range(deck_count):
+        deck_path = slides_path / f"category-{index % 30}" / f"deck-{index}.md"
+        deck_path.parent.mkdir(parents=True, exist_ok=True)
+        deck_path.write_text(
+            f"---\nslides:\n    title: Deck {index}\n---\n\n# Deck {index}\n\n"
+            + "\n---\n\n## Slide\n\n![](../shared.png)\n" * 20,
+        )
+
+        (slides_path / f"category-{index % 30}" / f"image-{index}.png").write_bytes(
+            b"\0" * 4096,
+        )
+
+    (slides_path / "shared.png").write_bytes(b"\0" * 4096)
+
+
+def measure(
+    edit: Callable[[int], None],
+    rebuild: Callable[[], None],
+    repeat: int,
+) -> float:
+    """Return the median time in ms to rebuild after an edit."""
+    times = []
+    for iteration in range(repeat):
+        edit(iteration)
+        start_time = time.perf_counter()
+        rebuild()
+        times.append(time.perf_counter() - start_time)
+
+    return sorted(times)[len(times) // 2] * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "-n",
+        "--decks",
+        type=int,
+        default=DEFAULT_DECK_COUNT,
+        help="Number of slideshows to generate.",
+    )
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help="Number of rebuilds, the median is reported.",
+    )
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as directory:
+        slides_path = Path(directory) / "slides"
+        generate_repository(slides_path, args.decks)
+        deck_path = (slides_path / "category-1" / "deck-1.md").resolve()
+        image_path = (slides_path / "category-2" / "image-2.png").resolve()
+        config = get_config()
+
+        markup_generator = MarkupGenerator(
+            config,
+            slides_path,
+            Path(directory) / "site",
+            strict=False,
+            incremental=True,
+        )
+        markup_generator.process_markdown()
+
+        def edit_deck(iteration: int) -> None:
+            deck_path.write_text(deck_path.read_text() + f"\n\nEdit {iteration}\n")
+            markup_generator.stat_cache.invalidate([deck_path])
+
+        def edit_title(iteration: int) -> None:
+            content = deck_path.read_text()
+            deck_path.write_text(content.replace("title: ", f"title: {iteration} ", 1))
+            markup_generator.stat_cache.invalidate([deck_path])
+
+        def edit_image(iteration: int) -> None:
+            image_path.write_bytes(bytes([iteration]) * 4096)
+            markup_generator.stat_cache.invalidate([image_path])
+
+        print(f"{'change':>8} {'full (ms)':>10} {'targeted (ms)':>14}")
+        for name, edit, changed_path in [
+            ("deck", edit_deck, deck_path),
+            ("title", edit_title, deck_path),
+            ("image", edit_image, image_path),
+        ]:
+            full_time = measure(edit, markup_generator.process_markdown, args.repeat)
+            targeted_time = measure(
+                edit,
+                partial(markup_generator.process_changes, {changed_path}),
+                args.repeat,
+            )
+            print(f"{name:>8} {full_time:>10.1f} {targeted_time:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
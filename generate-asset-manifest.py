@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+from pathlib import Path
+
+from mkslides.assetmanifest import scan_asset_manifest
+
+################################################################################
+
+manifest_path = Path("src/mkslides/assets/asset-manifest.json")
+
+################################################################################
+
+asset_manifest = scan_asset_manifest()
+manifest_path.write_text(asset_manifest.to_json(), encoding="utf-8")
+
+print(
+    f"Updated {manifest_path}: reveal.js {asset_manifest.revealjs_version} with {len(asset_manifest.revealjs_themes)} themes, highlight.js {asset_manifest.highlightjs_themes_version} with {len(asset_manifest.highlightjs_themes)} themes",
+)
@@ -7,26 +7,25 @@ import tempfile
 from pathlib import Path
 
 import click
-from omegaconf import OmegaConf
-from rich.logging import RichHandler
 
-from mkslides.serve import serve
+from mkslides.assetstrategy import AssetStrategy
+from mkslides.tracing import Tracer
 from mkslides.utils import parse_ip_port
 
-from .build import build
-from .config import get_config
 from .constants import (
     DEFAULT_INPUT_DIR,
     DEFAULT_INPUT_DIR2,
     DEFAULT_OUTPUT_DIR,
-    HIGHLIGHTJS_THEMES_VERSION,
-    REVEALJS_VERSION,
+    OUTPUT_FINGERPRINTS_FILENAME,
     VERSION,
 )
 
+# The modules that build and serve, and their dependencies like OmegaConf,
+# Jinja2 and rich, are imported by the commands that need them. This keeps
+# the startup of e.g. `mkslides --version` fast.
+
 logger = logging.getLogger()
 logger.setLevel("INFO")
-logger.addHandler(RichHandler(show_path=False))
 
 ################################################################################
 
@@ -45,6 +44,19 @@ def get_input_path(input_path: Path) -> Path:
     raise FileNotFoundError(msg)
 
 
+def print_version(ctx: click.Context, _: click.Parameter, value: bool) -> None:
+    if not value or ctx.resilient_parsing:
+        return
+
+    from mkslides.assetmanifest import get_asset_manifest  # noqa: PLC0415
+
+    asset_manifest = get_asset_manifest()
+    click.echo(
+        f"mkslides, version {VERSION}\nreveal.js, version {asset_manifest.revealjs_version}\nhighlight.js themes, version {asset_manifest.highlightjs_themes_version}",
+    )
+    ctx.exit()
+
+
 ################################################################################
 
 files_argument_data = {
@@ -70,6 +82,15 @@ strict_argument_data = {
     "help": "Fail if a relative link cannot be resolved, otherwise just print a warning.",
 }
 
+asset_strategy_argument_data = {
+    "type": click.Choice(
+        [strategy.value for strategy in AssetStrategy],
+        case_sensitive=False,
+    ),
+    "help": "How to install the bundled reveal.js and highlight.js assets in the site dir. They are not installed again if the installed versions already match.",
+    "default": AssetStrategy.COPY.value,
+}
+
 
 @click.group(
     context_settings={
@@ -78,12 +99,14 @@ strict_argument_data = {
         "max_content_width": 120,
     },
 )
-@click.version_option(
-    VERSION,
+@click.option(
     "-V",
     "--version",
-    message=f"mkslides, version {VERSION}\nreveal.js, version {REVEALJS_VERSION}\nhighlight.js themes, version {HIGHLIGHTJS_THEMES_VERSION}"
-    "",
+    help="Show the version and exit.",
+    is_flag=True,
+    expose_value=False,
+    is_eager=True,
+    callback=print_version,
 )
 @click.option(
     "-v",
@@ -94,6 +117,10 @@ strict_argument_data = {
 )
 def cli(verbose: bool) -> None:
     """MkSlides - Slides with Markdown using the power of Reveal.js."""
+    from rich.logging import RichHandler  # noqa: PLC0415
+
+    logger.addHandler(RichHandler(show_path=False))
+
     if verbose:
         logger.setLevel("DEBUG")
         logger.debug("Verbose output enabled")
@@ -109,16 +136,67 @@ def cli(verbose: bool) -> None:
     "-d",
     "--site-dir",
     type=click.Path(path_type=Path),
-    help="The directory to output the result of the slides build. All files are removed from the site dir before building.",
+    help="The directory to output the result of the slides build. All files are removed from the site dir before building, unless --incremental is used. Bundled assets that are up to date are kept.",
     metavar="PATH",
     default=DEFAULT_OUTPUT_DIR,
 )
 @click.option("-s", "--strict", **strict_argument_data)  # type: ignore[arg-type]
+@click.option(
+    "-i",
+    "--incremental",
+    help="Keep the site dir and only re-render the slideshows whose sources, config, templates or preprocess scripts changed since the previous incremental build. Outputs whose sources were removed are deleted.",
+    is_flag=True,
+)
+@click.option("--asset-strategy", **asset_strategy_argument_data)  # type: ignore[arg-type]
+@click.option(
+    "--tree-shake-assets",
+    help="Only install the bundled files the default slideshow template loads and the themes and highlight themes the slideshows use, with the fonts and images they reference. Custom templates that load other bundled files need all assets installed.",
+    is_flag=True,
+)
+@click.option(
+    "-j",
+    "--jobs",
+    help="Number of worker processes to process the slideshows with. The index is still generated once all slideshows are processed.",
+    metavar="N",
+    default=1,
+    type=click.IntRange(min=1),
+)
+@click.option(
+    "--fingerprint",
+    help=f"Add copies of the bundled assets, themes, favicons and linked files with a hash of their content in the name, e.g. 'reveal.3f2a9c1d.css', and reference those instead, so they can be cached indefinitely. The fingerprinted names are listed in '{OUTPUT_FINGERPRINTS_FILENAME}' in the site dir.",
+    is_flag=True,
+)
+@click.option(
+    "--precompress",
+    help="Write gzip compressed copies of the HTML, CSS, JS, SVG and JSON files in the site dir next to them, e.g. 'reveal.js.gz', for servers that serve precompressed files. Brotli compressed copies are also written if the brotli package is installed, e.g. with 'pip install mkslides[precompress]'. Files below 1 KiB are not compressed and unchanged files are not compressed again.",
+    is_flag=True,
+)
+@click.option(
+    "--checksum",
+    help="Compare the files copied from PATH with those already in the site dir by content instead of by size and modification time, to skip copying the files that are unchanged. Only files kept from a previous build with --incremental can be skipped.",
+    is_flag=True,
+)
+@click.option(
+    "--trace",
+    "trace_file",
+    help="Write the duration of each build phase per slideshow to this file, in the Chrome trace event format. Open it in https://ui.perfetto.dev to find the slideshows and phases that slow down the build.",
+    metavar="FILENAME",
+    type=click.Path(dir_okay=False, path_type=Path),
+)
 def build_command(
+    *,
     files: Path,
     config_file: Path | None,
     site_dir: str,
     strict: bool,
+    incremental: bool,
+    asset_strategy: str,
+    tree_shake_assets: bool,
+    jobs: int,
+    fingerprint: bool,
+    precompress: bool,
+    checksum: bool,
+    trace_file: Path | None,
 ) -> None:
     """
     Build the MkSlides documentation.
@@ -132,6 +210,9 @@ def build_command(
     """
     logger.debug("Command: build")
 
+    from mkslides.build import build  # noqa: PLC0415
+    from mkslides.config import get_config  # noqa: PLC0415
+
     config = get_config(config_file)
     input_path = get_input_path(files)
     output_path = Path(site_dir).resolve(strict=False)
@@ -140,7 +221,26 @@ def build_command(
         msg = f'Files "{input_path}" should not be within the site dir "{site_dir}" as this can mean the source files are overwritten by the output.'
         raise ValueError(msg)
 
-    build(config, input_path, output_path, strict)
+    tracer = Tracer() if trace_file else None
+    try:
+        build(
+            config,
+            input_path,
+            output_path,
+            strict,
+            incremental=incremental,
+            asset_strategy=AssetStrategy(asset_strategy),
+            tree_shake_assets=tree_shake_assets,
+            jobs=jobs,
+            fingerprint=fingerprint,
+            precompress=precompress,
+            checksum=checksum,
+            tracer=tracer,
+        )
+    finally:
+        # Also written when the build fails, to see where it stopped
+        if tracer and trace_file:
+            tracer.save(trace_file)
 
 
 # Serve Command ################################################################
@@ -167,17 +267,26 @@ def build_command(
 @click.option(
     "--debounce-interval",
     "debounce_interval",
-    help="Interval in seconds to debounce file changes. After an initial file change, the browser will only be reloaded after this interval has passed without any new file changes. This helps to prevent multiple reloads when multiple file changes happen in quick succession.",
-    default=1.0,
+    help="Interval in seconds to debounce file changes. After an initial file change, the browser will only be reloaded after this interval has passed without any new file changes. This helps to prevent multiple reloads when multiple file changes happen in quick succession. Default: 0.05 if the operating system notifies file changes, otherwise 1.0, as the watched files are scanned for changes.",
     type=float,
 )
+@click.option("--asset-strategy", **asset_strategy_argument_data)  # type: ignore[arg-type]
+@click.option(
+    "--in-memory",
+    "in_memory",
+    help="Keep the rendered slideshows and small files in memory and serve them from there, instead of writing them to a temporary directory. Large files and the bundled assets are served from their original location.",
+    is_flag=True,
+)
 def serve_command(
+    *,
     files: Path,
     config_file: Path | None,
     strict: bool,
     dev_addr: str,
     open_in_browser: bool,
-    debounce_interval: float,
+    debounce_interval: float | None,
+    asset_strategy: str,
+    in_memory: bool,
 ) -> None:
     """
     Run the builtin development server.
@@ -191,15 +300,28 @@ def serve_command(
     """
     logger.debug("Command: serve")
 
+    from omegaconf import OmegaConf  # noqa: PLC0415
+
+    from mkslides.config import get_config  # noqa: PLC0415
+    from mkslides.serve import serve  # noqa: PLC0415
+
     config = get_config(config_file)
     input_path = get_input_path(files)
-    output_path = Path(tempfile.mkdtemp(prefix="mkslides_")).resolve(strict=False)
+    if in_memory:
+        # Only used to generate the relative URLs, nothing is written to it
+        output_path = Path(DEFAULT_OUTPUT_DIR).resolve(strict=False)
+    else:
+        output_path = Path(tempfile.mkdtemp(prefix="mkslides_")).resolve(
+            strict=False,
+        )
     dev_ip, dev_port = parse_ip_port(dev_addr)
     serve_config = OmegaConf.structured(
         {
+            "asset_strategy": asset_strategy,
             "debounce_interval": debounce_interval,
             "dev_ip": dev_ip,
             "dev_port": dev_port,
+            "in_memory": in_memory,
             "open_in_browser": open_in_browser,
             "strict": strict,
         },
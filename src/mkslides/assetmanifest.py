@@ -0,0 +1,93 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import json
+import logging
+from dataclasses import asdict, dataclass
+from functools import cache
+from importlib.resources.abc import Traversable
+from pathlib import Path
+
+from mkslides.constants import (
+    ASSET_MANIFEST_RESOURCE,
+    HIGHLIGHTJS_RESOURCE,
+    HIGHLIGHTJS_THEMES_RESOURCE,
+    REVEALJS_RESOURCE,
+    REVEALJS_THEMES_RESOURCE,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class AssetManifest:
+    """Versions and theme names of the bundled reveal.js and highlight.js assets."""
+
+    revealjs_version: str
+    revealjs_themes: frozenset[str]
+    highlightjs_themes_version: str
+    highlightjs_themes: frozenset[str]
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        data["revealjs_themes"] = sorted(self.revealjs_themes)
+        data["highlightjs_themes"] = sorted(self.highlightjs_themes)
+        return json.dumps(data, indent=4) + "\n"
+
+    @classmethod
+    def from_json(cls, content: str) -> "AssetManifest":
+        data = json.loads(content)
+        return cls(
+            revealjs_version=data["revealjs_version"],
+            revealjs_themes=frozenset(data["revealjs_themes"]),
+            highlightjs_themes_version=data["highlightjs_themes_version"],
+            highlightjs_themes=frozenset(data["highlightjs_themes"]),
+        )
+
+
+def gather_themes(resource: Traversable) -> frozenset[str]:
+    theme_names = set()
+    for theme in resource.iterdir():
+        if theme.is_file():
+            theme_path = Path(theme.name)
+            if theme_path.suffix == ".css":
+                theme_names.add(theme_path.stem)
+
+    return frozenset(theme_names)
+
+
+def read_version(package_json: Traversable) -> str:
+    with package_json.open(encoding="utf-8-sig") as f:
+        return json.load(f)["version"]
+
+
+def scan_asset_manifest() -> AssetManifest:
+    """Create the asset manifest by scanning the bundled assets."""
+    return AssetManifest(
+        revealjs_version=read_version(REVEALJS_RESOURCE.joinpath("package.json")),
+        revealjs_themes=gather_themes(REVEALJS_THEMES_RESOURCE),
+        highlightjs_themes_version=read_version(
+            HIGHLIGHTJS_RESOURCE.joinpath("build", "package.json"),
+        ),
+        highlightjs_themes=gather_themes(HIGHLIGHTJS_THEMES_RESOURCE),
+    )
+
+
+@cache
+def get_asset_manifest() -> AssetManifest:
+    """
+    Get the asset manifest shipped with the package.
+
+    The manifest is generated with `generate-asset-manifest.py` when the
+    bundled assets are updated, so no directories have to be scanned at
+    runtime. Without it, e.g. in a checkout where it was not generated yet,
+    the assets are scanned instead.
+    """
+    try:
+        content = ASSET_MANIFEST_RESOURCE.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        logger.debug("No asset manifest found, scanning the bundled assets")
+        return scan_asset_manifest()
+
+    return AssetManifest.from_json(content)
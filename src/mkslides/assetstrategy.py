@@ -0,0 +1,131 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import logging
+import os
+import shutil
+import sys
+from enum import Enum
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# https://man7.org/linux/man-pages/man2/ioctl_ficlone.2.html
+FICLONE = 0x40049409
+
+
+class AssetStrategy(Enum):
+    COPY = "copy"
+    HARDLINK = "hardlink"
+    SYMLINK = "symlink"
+    REFLINK = "reflink"
+
+
+def remove_path(path: Path) -> None:
+    """Remove a file, symlink or directory tree."""
+    if path.is_symlink() or not path.is_dir():
+        path.unlink()
+    else:
+        shutil.rmtree(path)
+
+
+def __hardlink_file(source: str, destination: str) -> None:
+    try:
+        os.link(source, destination)
+    except OSError:
+        # E.g. source and destination are on different filesystems
+        shutil.copy2(source, destination)
+
+
+def __reflink_file(source: str, destination: str) -> None:
+    if sys.platform == "linux":
+        import fcntl  # noqa: PLC0415
+
+        with Path(source).open("rb") as source_file:
+            try:
+                with Path(destination).open("wb") as destination_file:
+                    fcntl.ioctl(
+                        destination_file.fileno(),
+                        FICLONE,
+                        source_file.fileno(),
+                    )
+            except OSError:
+                # The filesystem does not support reflinks
+                pass
+            else:
+                shutil.copystat(source, destination)
+                return
+
+    shutil.copy2(source, destination)
+
+
+def install_tree(
+    source_path: Path,
+    destination_path: Path,
+    strategy: AssetStrategy,
+) -> None:
+    """Install the directory tree at source path at the destination path using the given strategy."""
+    if destination_path.exists() or destination_path.is_symlink():
+        remove_path(destination_path)
+
+    destination_path.parent.mkdir(parents=True, exist_ok=True)
+
+    match strategy:
+        case AssetStrategy.COPY:
+            shutil.copytree(source_path, destination_path)
+        case AssetStrategy.HARDLINK:
+            shutil.copytree(
+                source_path,
+                destination_path,
+                copy_function=__hardlink_file,
+            )
+        case AssetStrategy.SYMLINK:
+            destination_path.symlink_to(source_path, target_is_directory=True)
+        case AssetStrategy.REFLINK:
+            shutil.copytree(
+                source_path,
+                destination_path,
+                copy_function=__reflink_file,
+            )
+
+    logger.debug(
+        f"Installed directory '{source_path.absolute()}' to '{destination_path.absolute()}' using strategy '{strategy.value}'",
+    )
+
+
+def install_file(
+    source_path: Path,
+    destination_path: Path,
+    strategy: AssetStrategy,
+) -> None:
+    """
+    Install the file at source path at the destination path using the given strategy.
+
+    The file is installed under a temporary name first and then moved in
+    place, so worker processes can install the same file at the same time.
+    """
+    destination_path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = destination_path.with_name(
+        f".{destination_path.name}.{os.getpid()}.tmp",
+    )
+
+    try:
+        match strategy:
+            case AssetStrategy.COPY:
+                shutil.copy2(source_path, temporary_path)
+            case AssetStrategy.HARDLINK:
+                __hardlink_file(str(source_path), str(temporary_path))
+            case AssetStrategy.SYMLINK:
+                temporary_path.symlink_to(source_path)
+            case AssetStrategy.REFLINK:
+                __reflink_file(str(source_path), str(temporary_path))
+
+        temporary_path.replace(destination_path)
+    except BaseException:
+        temporary_path.unlink(missing_ok=True)
+        raise
+
+    logger.debug(
+        f"Installed file '{source_path.absolute()}' to '{destination_path.absolute()}' using strategy '{strategy.value}'",
+    )
@@ -7,7 +7,11 @@ from pathlib import Path
 
 from omegaconf import DictConfig
 
+from mkslides.assetstrategy import AssetStrategy
 from mkslides.markupgenerator import MarkupGenerator
+from mkslides.outputstore import OutputStore
+from mkslides.statcache import StatCache
+from mkslides.tracing import Tracer
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +21,34 @@ def build(
     input_path: Path,
     output_path: Path,
     strict: bool,
-) -> None:
-    markup_generator = MarkupGenerator(config, input_path, output_path, strict)
+    *,
+    incremental: bool = False,
+    asset_strategy: AssetStrategy = AssetStrategy.COPY,
+    jobs: int = 1,
+    fingerprint: bool = False,
+    tree_shake_assets: bool = False,
+    precompress: bool = False,
+    checksum: bool = False,
+    stat_cache: StatCache | None = None,
+    output_store: OutputStore | None = None,
+    tracer: Tracer | None = None,
+) -> MarkupGenerator:
+    markup_generator = MarkupGenerator(
+        config,
+        input_path,
+        output_path,
+        strict,
+        incremental=incremental,
+        asset_strategy=asset_strategy,
+        jobs=jobs,
+        fingerprint=fingerprint,
+        tree_shake_assets=tree_shake_assets,
+        precompress=precompress,
+        checksum=checksum,
+        stat_cache=stat_cache,
+        output_store=output_store,
+        tracer=tracer,
+    )
     markup_generator.process_markdown()
+
+    return markup_generator
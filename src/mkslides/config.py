@@ -3,9 +3,11 @@
 # SPDX-License-Identifier: MIT
 
 import logging
-from dataclasses import dataclass, field
+from copy import deepcopy
+from dataclasses import dataclass, field, fields, replace
 from pathlib import Path
-from typing import Any
+from types import NoneType
+from typing import Any, get_args
 
 from omegaconf import MISSING, DictConfig, OmegaConf
 
@@ -34,6 +36,7 @@ class Slides:
     favicon: str | None = None
     highlight_theme: str = "monokai"
     preprocess_script: str | None = None
+    prerender: bool = False
     separator_notes: str | None = None
     separator_vertical: str | None = None
     separator: str | None = None
@@ -49,6 +52,17 @@ class Plugin:
     extra_javascript: list[str] | None = None
 
 
+@dataclass
+class Images:
+    optimize: bool = False
+    max_dimension: int = 1920
+    # WebP is displayed by all current browsers, older ones show the original
+    # instead of AVIF
+    formats: list[str] = field(default_factory=lambda: ["webp"])
+    quality: int = 80
+    srcset_widths: list[int] = field(default_factory=list)
+
+
 # For internal use only
 @dataclass
 class Internal:
@@ -66,9 +80,198 @@ class Config:
         },
     )
     plugins: list[Plugin] = field(default_factory=list)
+    exclude: list[str] = field(default_factory=list)
+    gitignore: bool = False
+    images: Images = field(default_factory=Images)
     internal: Internal = field(default_factory=Internal)
 
 
+SLIDES_FIELD_NAMES = frozenset(slides_field.name for slides_field in fields(Slides))
+NULLABLE_SLIDES_FIELD_NAMES = frozenset(
+    slides_field.name
+    for slides_field in fields(Slides)
+    if NoneType in get_args(slides_field.type)
+)
+BOOL_SLIDES_FIELD_NAMES = frozenset(
+    slides_field.name for slides_field in fields(Slides) if slides_field.type is bool
+)
+PLUGIN_FIELD_NAMES = frozenset(plugin_field.name for plugin_field in fields(Plugin))
+
+
+@dataclass(frozen=True)
+class SlideConfig:
+    """Resolved configuration of a slideshow, with its own copy of the values, so changing them does not affect the other slideshows."""
+
+    slides: Slides
+    revealjs: dict[str, Any]
+    plugins: list[Plugin]
+
+
+class SlideConfigResolver:
+    """
+    Resolve the configuration of each slideshow from the global config and its frontmatter.
+
+    The global config is resolved once into a base of plain objects. The
+    frontmatter of a slideshow is applied on top of it, and the result is
+    copied, so slideshows never share the dictionaries and lists of the base
+    or of each other. Overrides that need the validation or conversion of
+    OmegaConf are merged into the global config instead.
+    """
+
+    def __init__(self, global_config: DictConfig) -> None:
+        self.global_config = global_config
+        self.base = SlideConfig(
+            **{
+                key: _to_plain_section(global_config, key)
+                for key in FRONTMATTER_ALLOWED_KEYS
+            },
+        )
+
+    def resolve(self, frontmatter_metadata: dict[str, object]) -> SlideConfig:
+        overrides = {
+            key: frontmatter_metadata[key]
+            for key in FRONTMATTER_ALLOWED_KEYS
+            if key in frontmatter_metadata
+        }
+        if not overrides:
+            return _copy_slide_config(self.base)
+
+        if not all(
+            PLAIN_OVERRIDE_CHECKS[key](override) for key, override in overrides.items()
+        ):
+            return _copy_slide_config(self.__resolve_with_omegaconf(overrides))
+
+        slide_config = self.base
+        if isinstance(slides_override := overrides.get("slides"), dict):
+            slides_values: dict[str, Any] = {
+                key: value
+                if value is None or key in BOOL_SLIDES_FIELD_NAMES
+                else str(value)
+                for key, value in slides_override.items()
+            }
+            slides = replace(slide_config.slides, **slides_values)
+            slide_config = replace(slide_config, slides=slides)
+        if isinstance(revealjs_override := overrides.get("revealjs"), dict):
+            revealjs = _merge_dicts(slide_config.revealjs, revealjs_override)
+            slide_config = replace(slide_config, revealjs=revealjs)
+        if isinstance(plugins_override := overrides.get("plugins"), list):
+            plugins = [Plugin(**plugin) for plugin in plugins_override]
+            slide_config = replace(slide_config, plugins=plugins)
+
+        return _copy_slide_config(slide_config)
+
+    def __resolve_with_omegaconf(self, overrides: dict[str, object]) -> SlideConfig:
+        config = deepcopy(self.global_config)
+        for key, override in overrides.items():
+            OmegaConf.update(config, key, override)
+
+        # Only the overridden sections are converted, the others are taken from the base
+        return replace(
+            self.base,
+            **{key: _to_plain_section(config, key) for key in overrides},
+        )
+
+
+def _copy_slide_config(slide_config: SlideConfig) -> SlideConfig:
+    return SlideConfig(
+        slides=replace(slide_config.slides),
+        revealjs=_copy_plain_value(slide_config.revealjs),
+        plugins=[
+            replace(
+                plugin,
+                extra_css=_copy_plain_value(plugin.extra_css),
+                extra_javascript=_copy_plain_value(plugin.extra_javascript),
+            )
+            for plugin in slide_config.plugins
+        ],
+    )
+
+
+def _copy_plain_value(value: Any) -> Any:
+    """Copy the dictionaries and lists of a value, the other plain values are immutable."""
+    if isinstance(value, dict):
+        return {key: _copy_plain_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_plain_value(item) for item in value]
+
+    return value
+
+
+def _to_plain_section(config: DictConfig, key: str) -> Any:
+    if key == "revealjs":
+        revealjs = OmegaConf.to_container(config.revealjs)
+        assert isinstance(revealjs, dict)
+        return {str(option): value for option, value in revealjs.items()}
+
+    return OmegaConf.to_object(config[key])
+
+
+def _is_plain_slides_override(override: object) -> bool:
+    """Check if the override only sets known fields to values that OmegaConf stores as string, bool or None, without interpolation."""
+    return isinstance(override, dict) and all(
+        key in SLIDES_FIELD_NAMES
+        and (
+            (value is None and key in NULLABLE_SLIDES_FIELD_NAMES)
+            or (
+                isinstance(value, bool)
+                if key in BOOL_SLIDES_FIELD_NAMES
+                else (isinstance(value, str) and "${" not in value)
+                or isinstance(value, int | float)
+            )
+        )
+        for key, value in override.items()
+    )
+
+
+def _is_plain_plugins_override(override: object) -> bool:
+    return isinstance(override, list) and all(
+        isinstance(plugin, dict)
+        and plugin.keys() <= PLUGIN_FIELD_NAMES
+        and isinstance(plugin.get("name", ""), str | None)
+        and all(
+            value is None
+            or (
+                isinstance(value, list) and all(isinstance(item, str) for item in value)
+            )
+            for key, value in plugin.items()
+            if key != "name"
+        )
+        for plugin in override
+    )
+
+
+def _is_plain_dict(value: object) -> bool:
+    return isinstance(value, dict) and all(
+        isinstance(key, str) and _is_plain_value(item) for key, item in value.items()
+    )
+
+
+def _is_plain_value(value: object) -> bool:
+    if isinstance(value, list):
+        return all(_is_plain_value(item) for item in value)
+
+    return _is_plain_dict(value) or isinstance(value, str | int | float | None)
+
+
+def _merge_dicts(base: dict[str, Any], override: dict[str, Any]) -> dict[str, Any]:
+    """Merge like OmegaConf: dictionaries are merged recursively, other values replaced."""
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge_dicts(merged[key], value)
+        else:
+            merged[key] = value
+
+    return merged
+
+
+PLAIN_OVERRIDE_CHECKS = {
+    "slides": _is_plain_slides_override,
+    "revealjs": _is_plain_dict,
+    "plugins": _is_plain_plugins_override,
+}
+
+
 def get_config(config_file: Path | None = None) -> DictConfig:
     config = OmegaConf.structured(Config)
 
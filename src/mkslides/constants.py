@@ -2,33 +2,17 @@
 #
 # SPDX-License-Identifier: MIT
 
-import json
 import logging
 import re
-from importlib import metadata, resources
-from importlib.resources.abc import Traversable
+from importlib import resources
 from pathlib import Path
 
-from jinja2 import Environment, FileSystemLoader, PackageLoader, select_autoescape
+from mkslides import __version__
 
 logger = logging.getLogger(__name__)
 
 ################################################################################
 
-
-def gather_themes(resource: Traversable) -> list[str]:
-    theme_names = []
-    for theme in resource.iterdir():
-        if theme.is_file():
-            theme_path = Path(theme.name)
-            if theme_path.suffix == ".css":
-                theme_names.append(theme_path.stem)
-
-    return theme_names
-
-
-################################################################################
-
 HTML_BACKGROUND_IMAGE_REGEX = re.compile(
     r"""
     data-background-image=      # data-background-image attribute
@@ -39,37 +23,9 @@ HTML_BACKGROUND_IMAGE_REGEX = re.compile(
     re.VERBOSE,
 )
 
-MD_RELATIVE_LINK_REGEX = re.compile(
-    r"""
-    \[(?P<alt_text>.*?)\]       # Alt text
-    \(
-        <?
-        (?P<location>.+?)       # Image location
-        >?
-    \)
-    """,
-    re.VERBOSE,
-)
-
-HTML_RELATIVE_LINK_REGEX = re.compile(
-    r"""
-    <a                          # Start of the image
-    .+?                         # Any attributes
-    href=                       # src attribute
-        (?P<delimiter>['\"])    # Delimiter
-        \s*
-        (?P<location>.+?)       # Image location
-        \s*
-        (?P=delimiter)          # Delimiter
-    .*?                         # Any attributes
-    >                           # End of the image
-    """,
-    re.VERBOSE,
-)
-
 MD_EXTENSION_REGEX = re.compile(r"\.[mM][dD]$")
 
-VERSION = metadata.version(__package__)
+VERSION = __version__
 DEFAULT_CONFIG_LOCATION = Path("mkslides.yml")
 DEFAULT_INPUT_DIR = "slides"
 DEFAULT_INPUT_DIR2 = "docs"
@@ -77,31 +33,44 @@ DEFAULT_OUTPUT_DIR = "site"
 
 ASSETS_RESOURCE = resources.files(__package__).joinpath("assets")
 
+# Versions and theme names of the bundled assets, see assetmanifest.py
+ASSET_MANIFEST_RESOURCE = ASSETS_RESOURCE.joinpath("asset-manifest.json")
+
 REVEALJS_RESOURCE = ASSETS_RESOURCE.joinpath("reveal.js")
 REVEALJS_THEMES_RESOURCE = REVEALJS_RESOURCE.joinpath("dist", "theme")
-REVEALJS_THEMES_LIST = gather_themes(REVEALJS_THEMES_RESOURCE)
-REVEALJS_VERSION = None
-with REVEALJS_RESOURCE.joinpath("package.json").open(encoding="utf-8-sig") as f:
-    REVEALJS_VERSION = json.load(f)["version"]
 
 HIGHLIGHTJS_RESOURCE = ASSETS_RESOURCE.joinpath("highlight.js")
 HIGHLIGHTJS_THEMES_RESOURCE = HIGHLIGHTJS_RESOURCE.joinpath("build", "styles")
-HIGHLIGHTJS_THEMES_LIST = gather_themes(HIGHLIGHTJS_THEMES_RESOURCE)
 
-HIGHLIGHTJS_THEMES_VERSION = None
-with HIGHLIGHTJS_RESOURCE.joinpath("build", "package.json").open(
-    encoding="utf-8-sig",
-) as f:
-    HIGHLIGHTJS_THEMES_VERSION = json.load(f)["version"]
+TEMPLATES_PACKAGE_PATH = "assets/templates"
+DEFAULT_INDEX_TEMPLATE_NAME = "index.html.jinja"
+DEFAULT_SLIDESHOW_TEMPLATE_NAME = "slideshow.html.jinja"
 
-DEFAULT_JINJA2_ENVIRONMENT = Environment(
-    loader=PackageLoader(__package__, "assets/templates"),
-    autoescape=select_autoescape(),
-)
-DEFAULT_INDEX_TEMPLATE = DEFAULT_JINJA2_ENVIRONMENT.get_template("index.html.jinja")
-DEFAULT_SLIDESHOW_TEMPLATE = DEFAULT_JINJA2_ENVIRONMENT.get_template(
-    "slideshow.html.jinja",
+OUTPUT_ASSETS_DIRNAME: str = "mkslides-assets"
+OUTPUT_ASSETS_VERSION_STAMP_FILENAME: str = ".mkslides-assets-version.json"
+OUTPUT_MANIFEST_FILENAME: str = ".mkslides-manifest.json"
+OUTPUT_FINGERPRINTS_FILENAME: str = "fingerprints.json"
+
+# Files of the bundled reveal.js assets referenced by the default slideshow template
+REVEALJS_PAGE_FILES: tuple[str, ...] = (
+    "dist/reveal.css",
+    "dist/reveal.js",
+    "dist/plugin/highlight.js",
+    "dist/plugin/markdown.js",
+    "dist/plugin/math.js",
+    "dist/plugin/notes.js",
+    "dist/plugin/search.js",
+    "dist/plugin/zoom.js",
 )
-LOCAL_JINJA2_ENVIRONMENT = Environment(loader=FileSystemLoader("."), autoescape=True)
 
-OUTPUT_ASSETS_DIRNAME: str = "mkslides-assets"
+# Larger files are served from their source location when building in memory
+OUTPUT_STORE_MAX_FILE_SIZE: int = 1024 * 1024
+
+# Caches kept across builds are stored in the user cache directory, unless set
+CACHE_DIR_ENV_VAR: str = "MKSLIDES_CACHE_DIR"
+CACHE_DIRNAME: str = "mkslides"
+
+GITIGNORE_FILENAME: str = ".gitignore"
+
+# Always excluded, before the exclude patterns of the config
+DEFAULT_EXCLUDE_PATTERNS: tuple[str, ...] = (".git/", ".hg/", ".svn/")
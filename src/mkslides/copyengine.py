@@ -0,0 +1,224 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import logging
+import os
+import shutil
+import stat
+import sys
+import threading
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+from mkslides.assetstrategy import FICLONE
+from mkslides.manifest import hash_file
+
+logger = logging.getLogger(__name__)
+
+# Files of at least this size are copied in a thread pool, as copying them
+# is bound by I/O, smaller files are copied right away
+CONCURRENT_COPY_MIN_SIZE = 1024 * 1024
+
+# Maximum number of bytes copied by a single `copy_file_range` call
+COPY_CHUNK_SIZE = 1024 * 1024 * 1024
+
+
+@dataclass
+class CopyStatistics:
+    copied_files: int = 0
+    copied_bytes: int = 0
+    skipped_files: int = 0
+    skipped_bytes: int = 0
+
+    def add(self, size: int, *, is_copied: bool) -> None:
+        if is_copied:
+            self.copied_files += 1
+            self.copied_bytes += size
+        else:
+            self.skipped_files += 1
+            self.skipped_bytes += size
+
+    def update(self, other: "CopyStatistics") -> None:
+        self.copied_files += other.copied_files
+        self.copied_bytes += other.copied_bytes
+        self.skipped_files += other.skipped_files
+        self.skipped_bytes += other.skipped_bytes
+
+
+def format_size(size: int) -> str:
+    """Format a number of bytes with a binary unit, e.g. `1.5 MiB`."""
+    value = float(size)
+    for unit in ["B", "KiB", "MiB", "GiB"]:
+        if value < 1024:  # noqa: PLR2004
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+
+    return f"{value:.1f} TiB"
+
+
+def is_identical(source_path: Path, destination_path: Path, *, checksum: bool) -> bool:
+    """
+    Check if the destination is a copy of the source.
+
+    Files are compared by size and modification time, as copies get the
+    modification time of their source, or by content if `checksum` is set.
+    """
+    try:
+        destination_stat = destination_path.lstat()
+    except OSError:
+        return False
+
+    source_stat = source_path.stat()
+    if (
+        not stat.S_ISREG(destination_stat.st_mode)
+        or destination_stat.st_size != source_stat.st_size
+    ):
+        return False
+
+    if checksum:
+        return hash_file(source_path) == hash_file(destination_path)
+
+    return destination_stat.st_mtime_ns == source_stat.st_mtime_ns
+
+
+def __copy_contents(source_file: BinaryIO, destination_file: BinaryIO) -> None:
+    """Copy the contents of a file, letting the filesystem share or copy the data itself where it supports this."""
+    source_fd = source_file.fileno()
+    destination_fd = destination_file.fileno()
+
+    if sys.platform == "linux":
+        import fcntl  # noqa: PLC0415
+
+        try:
+            fcntl.ioctl(destination_fd, FICLONE, source_fd)
+        except OSError:
+            # The filesystem does not support reflinks
+            pass
+        else:
+            return
+
+    if hasattr(os, "copy_file_range"):
+        try:
+            while os.copy_file_range(source_fd, destination_fd, COPY_CHUNK_SIZE) > 0:
+                pass
+        except OSError:
+            # E.g. source and destination are on different filesystems on an
+            # older kernel, the rest is copied from the current offsets
+            pass
+        else:
+            return
+
+    shutil.copyfileobj(source_file, destination_file)
+
+
+def __get_temporary_path(destination_path: Path) -> Path:
+    """Get a hidden path next to the destination to write to before moving it in place, unique per process and thread."""
+    destination_path.parent.mkdir(parents=True, exist_ok=True)
+    return destination_path.with_name(
+        f".{destination_path.name}.{os.getpid()}.{threading.get_ident()}.tmp",
+    )
+
+
+def write_file(destination_path: Path, content: bytes) -> None:
+    """Write a file under a temporary name first and then move it in place, so readers never see a partial file."""
+    temporary_path = __get_temporary_path(destination_path)
+
+    try:
+        temporary_path.write_bytes(content)
+        temporary_path.replace(destination_path)
+    except BaseException:
+        temporary_path.unlink(missing_ok=True)
+        raise
+
+
+def copy_file(source_path: Path, destination_path: Path) -> None:
+    """
+    Copy a file with its permissions and modification time.
+
+    The file is copied under a temporary name first and then moved in place,
+    so an interrupted copy never leaves a partial file at the destination.
+    """
+    temporary_path = __get_temporary_path(destination_path)
+
+    try:
+        with (
+            source_path.open("rb", buffering=0) as source_file,
+            temporary_path.open("wb", buffering=0) as destination_file,
+        ):
+            __copy_contents(source_file, destination_file)
+        shutil.copystat(source_path, temporary_path)
+        temporary_path.replace(destination_path)
+    except BaseException:
+        temporary_path.unlink(missing_ok=True)
+        raise
+
+
+def copy_file_if_changed(
+    source_path: Path,
+    destination_path: Path,
+    *,
+    checksum: bool = False,
+) -> bool:
+    """Copy a file unless the destination is already a copy of it, and return whether it was copied."""
+    if is_identical(source_path, destination_path, checksum=checksum):
+        logger.debug(f"File '{destination_path}' is up to date, skipping copy")
+        return False
+
+    is_overwrite = destination_path.exists()
+    copy_file(source_path, destination_path)
+
+    action = "Overwritten" if is_overwrite else "Copied"
+    logger.debug(
+        f"{action} file '{source_path.absolute()}' to '{destination_path.absolute()}'",
+    )
+    return True
+
+
+def copy_files(
+    files: Iterable[tuple[Path, Path]],
+    *,
+    checksum: bool = False,
+) -> tuple[list[Path], CopyStatistics]:
+    """
+    Copy files from their source to their destination path, skipping the files that are already copied.
+
+    Large files are copied concurrently, while the smaller ones are copied in
+    the calling thread. Returns the destination paths that were copied to.
+    """
+    copied_paths: list[Path] = []
+    statistics = CopyStatistics()
+
+    with ThreadPoolExecutor() as executor:
+        futures: list[tuple[Path, int, Future[bool]]] = []
+        for source_path, destination_path in files:
+            size = source_path.stat().st_size
+            if size >= CONCURRENT_COPY_MIN_SIZE:
+                future = executor.submit(
+                    copy_file_if_changed,
+                    source_path,
+                    destination_path,
+                    checksum=checksum,
+                )
+                futures.append((destination_path, size, future))
+                continue
+
+            is_copied = copy_file_if_changed(
+                source_path,
+                destination_path,
+                checksum=checksum,
+            )
+            statistics.add(size, is_copied=is_copied)
+            if is_copied:
+                copied_paths.append(destination_path)
+
+        for destination_path, size, future in futures:
+            is_copied = future.result()
+            statistics.add(size, is_copied=is_copied)
+            if is_copied:
+                copied_paths.append(destination_path)
+
+    return copied_paths, statistics
@@ -0,0 +1,415 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import base64
+import contextlib
+import hashlib
+import logging
+import mimetypes
+import os
+import posixpath
+import struct
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from mkslides.outputstore import OutputStore
+
+logger = logging.getLogger(__name__)
+
+RELOAD_PATH = "/.mkslides/reload"
+
+# Connects to the reload websocket, telling the server which page is shown
+RELOAD_SCRIPT = b"""<script>
+(() => {
+    const url = new URL("%s", location.href);
+    url.protocol = location.protocol === "https:" ? "wss:" : "ws:";
+    url.searchParams.set("page", location.pathname);
+    let isReconnect = false;
+    const connect = () => {
+        const socket = new WebSocket(url);
+        socket.onopen = () => {
+            if (isReconnect) {
+                location.reload();
+            }
+        };
+        socket.onmessage = (event) => {
+            if (event.data === "reload") {
+                location.reload();
+            }
+        };
+        socket.onclose = () => {
+            isReconnect = true;
+            setTimeout(connect, 1000);
+        };
+    };
+    connect();
+})();
+</script>
+""" % RELOAD_PATH.encode()
+
+HEAD_END = b"</head>"
+
+# https://datatracker.ietf.org/doc/html/rfc6455
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+WEBSOCKET_OPCODE_TEXT = 0x1
+WEBSOCKET_OPCODE_CLOSE = 0x8
+WEBSOCKET_OPCODE_PING = 0x9
+WEBSOCKET_OPCODE_PONG = 0xA
+WEBSOCKET_MAX_PAYLOAD_SIZE = 64 * 1024
+
+HTTP_REASONS = {
+    200: "OK",
+    301: "Moved Permanently",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+}
+
+
+def get_relative_path(url_path: str) -> str | None:
+    """Get the path relative to the site root requested by a URL path, or None if it is outside the site."""
+    relative_path = unquote(url_path)
+    if relative_path.endswith("/"):
+        relative_path += "index.html"
+
+    relative_path = posixpath.normpath(relative_path.lstrip("/"))
+    if relative_path == ".." or relative_path.startswith("../"):
+        return None
+
+    return relative_path
+
+
+def encode_websocket_frame(opcode: int, payload: bytes) -> bytes:
+    """Encode a single unmasked websocket frame, as sent by a server."""
+    header = bytes([0x80 | opcode])
+    if len(payload) < 126:  # noqa: PLR2004
+        header += bytes([len(payload)])
+    elif len(payload) < 2**16:
+        header += bytes([126]) + struct.pack("!H", len(payload))
+    else:
+        header += bytes([127]) + struct.pack("!Q", len(payload))
+
+    return header + payload
+
+
+async def read_websocket_frame(reader: asyncio.StreamReader) -> tuple[int, bytes]:
+    """Read a single websocket frame and return its opcode and unmasked payload."""
+    first_byte, second_byte = await reader.readexactly(2)
+    opcode = first_byte & 0x0F
+
+    length = second_byte & 0x7F
+    if length == 126:  # noqa: PLR2004
+        (length,) = struct.unpack("!H", await reader.readexactly(2))
+    elif length == 127:  # noqa: PLR2004
+        (length,) = struct.unpack("!Q", await reader.readexactly(8))
+    if length > WEBSOCKET_MAX_PAYLOAD_SIZE:
+        msg = f"Websocket frame of {length} bytes is too large"
+        raise ValueError(msg)
+
+    mask = await reader.readexactly(4) if second_byte & 0x80 else bytes(4)
+    payload = await reader.readexactly(length)
+
+    return opcode, bytes(byte ^ mask[index % 4] for index, byte in enumerate(payload))
+
+
+class DevServer:
+    """
+    Development server for the built site, reloading only the browsers whose page changed.
+
+    Every HTML page gets a script that connects to a websocket and tells the
+    server which page is shown. After a rebuild, only the clients whose page
+    or one of its dependencies changed are told to reload. The site is served
+    from the output store if the output is kept in memory, or from the output
+    directory otherwise.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        *,
+        output_path: Path | None = None,
+        output_store: OutputStore | None = None,
+    ) -> None:
+        assert (output_path is None) != (output_store is None), (
+            "Either an output path or an output store must be given"
+        )
+
+        self.host = host
+        self.port = port
+        self.output_path = output_path
+        self.output_store = output_store
+
+        # Paths of the outputs each page depends on, besides the page itself
+        self.dependencies: dict[str, set[str]] = {}
+
+        # Page shown by each connected client
+        self.__clients: dict[asyncio.StreamWriter, str] = {}
+        self.__server: asyncio.Server | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        self.__server = await asyncio.start_server(
+            self.__handle_connection,
+            self.host,
+            self.port,
+        )
+
+        # The port is chosen by the OS when 0 is given
+        self.port = self.__server.sockets[0].getsockname()[1]
+        logger.info(f"Serving on {self.url}")
+
+    async def stop(self) -> None:
+        if self.__server is None:
+            return
+
+        self.__server.close()
+        for writer in list(self.__clients):
+            writer.close()
+        await self.__server.wait_closed()
+        self.__server = None
+
+    async def notify(self, changed_paths: set[str] | None) -> int:
+        """
+        Reload the clients whose page or one of its dependencies changed.
+
+        All clients are reloaded if the changed paths are None. Returns the
+        number of reloaded clients.
+        """
+        clients = [
+            writer
+            for writer, page in self.__clients.items()
+            if changed_paths is None
+            or page in changed_paths
+            or not changed_paths.isdisjoint(self.dependencies.get(page, ()))
+        ]
+
+        await asyncio.gather(
+            *(
+                self.__send_websocket_frame(writer, WEBSOCKET_OPCODE_TEXT, b"reload")
+                for writer in clients
+            ),
+        )
+
+        logger.info(f"Reloaded {len(clients)} of {len(self.__clients)} browsers")
+
+        return len(clients)
+
+    async def __handle_connection(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        try:
+            while request := await self.__read_request(reader):
+                method, target, headers = request
+                url = urlsplit(target)
+
+                if headers.get("upgrade", "").lower() == "websocket":
+                    if url.path == RELOAD_PATH:
+                        await self.__handle_websocket(
+                            reader,
+                            writer,
+                            headers,
+                            url.query,
+                        )
+                    else:
+                        await self.__send_response(writer, 404, close=True)
+                    break
+
+                await self.__handle_request(writer, method, url.path)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+            logger.debug(f"Closed connection: {e!r}")
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def __read_request(
+        self,
+        reader: asyncio.StreamReader,
+    ) -> tuple[str, str, dict[str, str]] | None:
+        """Read the request line and headers, or return None when the client closed the connection."""
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+
+        method, target, _ = request_line.decode("latin-1").split(" ", 2)
+
+        headers: dict[str, str] = {}
+        while (line := await reader.readline()).strip():
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if "content-length" in headers or "transfer-encoding" in headers:
+            msg = f"Request '{method} {target}' with a body is not supported"
+            raise ValueError(msg)
+
+        return method, target, headers
+
+    async def __handle_request(
+        self,
+        writer: asyncio.StreamWriter,
+        method: str,
+        url_path: str,
+    ) -> None:
+        if method not in {"GET", "HEAD"}:
+            await self.__send_response(writer, 405)
+            return
+
+        relative_path = get_relative_path(url_path)
+        content = self.__get_content(relative_path) if relative_path else None
+
+        if content is None:
+            # E.g. a directory requested without trailing slash
+            if (
+                relative_path
+                and self.__get_content(f"{relative_path}/index.html") is not None
+            ):
+                await self.__send_response(
+                    writer,
+                    301,
+                    headers={"Location": f"{url_path}/"},
+                )
+            else:
+                await self.__send_response(writer, 404, b"404: Not Found")
+            return
+
+        assert relative_path
+        content_type = mimetypes.guess_type(relative_path)[0]
+        content_type = content_type or "application/octet-stream"
+
+        if content_type == "text/html":
+            if isinstance(content, Path):
+                content = await asyncio.to_thread(content.read_bytes)
+            content = self.__inject_reload_script(content)
+
+        await self.__send_response(
+            writer,
+            200,
+            content,
+            headers={"Content-Type": content_type},
+            is_head=method == "HEAD",
+        )
+
+    def __get_content(self, relative_path: str) -> bytes | Path | None:
+        if self.output_store is not None:
+            return self.output_store.get(relative_path)
+
+        assert self.output_path
+        path = self.output_path / relative_path
+        return path if path.is_file() else None
+
+    def __inject_reload_script(self, content: bytes) -> bytes:
+        if HEAD_END in content:
+            return content.replace(HEAD_END, RELOAD_SCRIPT + HEAD_END, 1)
+
+        return content + RELOAD_SCRIPT
+
+    async def __send_response(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        content: bytes | Path = b"",
+        *,
+        headers: dict[str, str] | None = None,
+        is_head: bool = False,
+        close: bool = False,
+    ) -> None:
+        if isinstance(content, Path):
+            file = await asyncio.to_thread(content.open, "rb")
+            length = os.fstat(file.fileno()).st_size
+        else:
+            file = None
+            length = len(content)
+
+        try:
+            lines = [f"HTTP/1.1 {status} {HTTP_REASONS[status]}"]
+            lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+            lines.append(f"Content-Length: {length}")
+            lines.append("Cache-Control: no-store")
+            if close:
+                lines.append("Connection: close")
+            writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+
+            if is_head:
+                pass
+            elif file is not None:
+                # Large files are sent straight from the source, without reading them in memory
+                await writer.drain()
+                await asyncio.get_running_loop().sendfile(writer.transport, file)
+            else:
+                assert isinstance(content, bytes)
+                writer.write(content)
+
+            await writer.drain()
+        finally:
+            if file is not None:
+                file.close()
+
+    async def __handle_websocket(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        headers: dict[str, str],
+        query: str,
+    ) -> None:
+        key = headers.get("sec-websocket-key")
+        page = get_relative_path(parse_qs(query).get("page", ["/"])[0])
+        if not key or not page:
+            await self.__send_response(writer, 400, close=True)
+            return
+
+        accept = base64.b64encode(
+            hashlib.sha1(
+                (key + WEBSOCKET_GUID).encode("latin-1"),
+                usedforsecurity=False,
+            ).digest(),
+        ).decode("latin-1")
+        writer.write(
+            (
+                "HTTP/1.1 101 Switching Protocols\r\n"
+                "Upgrade: websocket\r\n"
+                "Connection: Upgrade\r\n"
+                f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+            ).encode("latin-1"),
+        )
+        await writer.drain()
+
+        self.__clients[writer] = page
+        logger.debug(f"Browser connected, showing '{page}'")
+
+        try:
+            while True:
+                opcode, payload = await read_websocket_frame(reader)
+                if opcode == WEBSOCKET_OPCODE_CLOSE:
+                    await self.__send_websocket_frame(writer, opcode, payload[:2])
+                    break
+                if opcode == WEBSOCKET_OPCODE_PING:
+                    await self.__send_websocket_frame(
+                        writer,
+                        WEBSOCKET_OPCODE_PONG,
+                        payload,
+                    )
+        finally:
+            del self.__clients[writer]
+            logger.debug(f"Browser disconnected, showing '{page}'")
+
+    async def __send_websocket_frame(
+        self,
+        writer: asyncio.StreamWriter,
+        opcode: int,
+        payload: bytes,
+    ) -> None:
+        try:
+            writer.write(encode_websocket_frame(opcode, payload))
+            await writer.drain()
+        except ConnectionError as e:
+            logger.debug(f"Could not send to browser: {e!r}")
@@ -0,0 +1,273 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import logging
+import os
+import threading
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+from watchdog.events import (
+    DirCreatedEvent,
+    DirDeletedEvent,
+    DirMovedEvent,
+    FileCreatedEvent,
+    FileDeletedEvent,
+    FileModifiedEvent,
+    FileMovedEvent,
+    FileSystemEvent,
+    FileSystemEventHandler,
+)
+from watchdog.observers import Observer
+from watchdog.observers.polling import PollingObserver
+
+from mkslides.pathfilter import PathFilter
+
+logger = logging.getLogger(__name__)
+
+# Interval in seconds between scans of the watched paths
+POLL_INTERVAL = 0.5
+
+# Notifications of files being opened, closed or their directory being
+# modified are not needed, as the changes of the files are notified as well
+NOTIFIED_EVENT_TYPES: list[type[FileSystemEvent]] = [
+    DirCreatedEvent,
+    DirDeletedEvent,
+    DirMovedEvent,
+    FileCreatedEvent,
+    FileDeletedEvent,
+    FileModifiedEvent,
+    FileMovedEvent,
+]
+
+
+def create_file_watcher(
+    paths: Iterable[Path],
+    path_filter: PathFilter | None = None,
+    on_change: Callable[[], None] | None = None,
+) -> "FileWatcher | NotifyingFileWatcher":
+    """Create a watcher using the change notifications of the operating system, or one that scans for changes if they are not available."""
+    paths = list(paths)
+    if Observer is not PollingObserver:
+        try:
+            return NotifyingFileWatcher(paths, path_filter, on_change)
+        except OSError as e:
+            logger.warning(
+                f"Could not watch for change notifications, scanning for changes instead: {e}",
+            )
+    else:
+        logger.debug("No change notifications on this platform, scanning for changes")
+
+    return FileWatcher(paths, path_filter)
+
+
+class FileWatcher:
+    """
+    Detect added, changed and removed files below the watched paths.
+
+    Each poll scans the watched paths and compares the modification time and
+    size of the files with the previous scan. Symlinked directories and paths
+    excluded by the path filter are not scanned.
+    """
+
+    # Changes are only seen by polling, which scans the watched paths
+    poll_interval: float | None = POLL_INTERVAL
+
+    def __init__(
+        self,
+        paths: Iterable[Path],
+        path_filter: PathFilter | None = None,
+    ) -> None:
+        self.paths = [path.absolute() for path in paths]
+        self.path_filter = path_filter
+        self.__snapshot = self.__scan()
+
+    def close(self) -> None:
+        """Stop watching, nothing runs between polls."""
+
+    def poll(self) -> set[Path]:
+        """Return the paths of the files that were added, changed or removed since the previous poll."""
+        snapshot = self.__scan()
+        changed_keys = snapshot.keys() ^ self.__snapshot.keys()
+        changed_keys.update(
+            key
+            for key, signature in snapshot.items()
+            if self.__snapshot.get(key, signature) != signature
+        )
+        self.__snapshot = snapshot
+
+        return {Path(key) for key in changed_keys}
+
+    def __scan(self) -> dict[str, tuple[int, int]]:
+        """Get the modification time and size of all files below the watched paths."""
+        snapshot: dict[str, tuple[int, int]] = {}
+
+        for path in self.paths:
+            try:
+                result = path.stat()
+            except OSError:
+                continue
+
+            if path.is_dir():
+                self.__scan_directory(str(path), snapshot)
+            else:
+                snapshot[str(path)] = (result.st_mtime_ns, result.st_size)
+
+        return snapshot
+
+    def __scan_directory(
+        self,
+        key: str,
+        snapshot: dict[str, tuple[int, int]],
+    ) -> None:
+        directory_keys = [key]
+        while directory_keys:
+            try:
+                with os.scandir(directory_keys.pop()) as entries:
+                    for entry in entries:
+                        is_dir = entry.is_dir()
+                        if self.path_filter and self.path_filter.is_excluded(
+                            entry.path,
+                            is_dir,
+                        ):
+                            continue
+
+                        if is_dir:
+                            if not entry.is_symlink():
+                                directory_keys.append(entry.path)
+                        elif entry.is_file():
+                            result = entry.stat()
+                            snapshot[entry.path] = (result.st_mtime_ns, result.st_size)
+            except OSError as e:
+                logger.debug(f"Could not scan directory: {e}")
+
+
+class NotifyingFileWatcher(FileSystemEventHandler):
+    """
+    Detect added, changed and removed files below the watched paths from the change notifications of the operating system.
+
+    The notifications are received by watchdog in a background thread, e.g.
+    with inotify on Linux, so the watched paths are never scanned. Each poll
+    returns the paths notified since the previous poll, and `on_change` is
+    called from the background thread when a path is notified. Added, removed
+    and moved directories are returned themselves. Paths excluded by the path
+    filter, or below an excluded directory, are ignored.
+    """
+
+    # Polling only collects the notified paths, so it is only needed after a change
+    poll_interval: float | None = None
+
+    def __init__(
+        self,
+        paths: Iterable[Path],
+        path_filter: PathFilter | None = None,
+        on_change: Callable[[], None] | None = None,
+    ) -> None:
+        self.path_filter = path_filter
+        self.on_change = on_change
+
+        self.__lock = threading.Lock()
+        self.__changed_keys: set[str] = set()
+        # Files created since the previous poll, which are not a change if they
+        # are removed again before it, like the temporary files of editors
+        self.__created_keys: set[str] = set()
+
+        # Files are watched through their directory, as not all platforms can
+        # watch single files
+        self.__directory_keys: list[str] = []
+        self.__file_keys: set[str] = set()
+        self.__observer = Observer()
+        for path in paths:
+            absolute_path = path.absolute()
+            if absolute_path.is_dir():
+                self.__directory_keys.append(str(absolute_path))
+                watched_key = str(absolute_path)
+            else:
+                self.__file_keys.add(str(absolute_path))
+                watched_key = str(absolute_path.parent)
+
+            self.__observer.schedule(
+                self,
+                watched_key,
+                recursive=watched_key in self.__directory_keys,
+                event_filter=NOTIFIED_EVENT_TYPES,
+            )
+
+        self.__observer.start()
+
+    def poll(self) -> set[Path]:
+        """Return the paths of the files that were added, changed or removed since the previous poll."""
+        with self.__lock:
+            changed_keys = self.__changed_keys
+            self.__changed_keys = set()
+            self.__created_keys.clear()
+
+        return {Path(key) for key in changed_keys}
+
+    def close(self) -> None:
+        """Stop receiving notifications."""
+        self.__observer.stop()
+        self.__observer.join()
+
+    def on_any_event(self, event: FileSystemEvent) -> None:
+        """Record the paths of a notification, called from the background thread."""
+        is_changed = False
+        with self.__lock:
+            if event.event_type in {"deleted", "moved"}:
+                is_changed |= self.__remove_key(os.fsdecode(event.src_path), event)
+            if event.event_type == "moved":
+                is_changed |= self.__add_key(os.fsdecode(event.dest_path), event)
+            elif event.event_type in {"created", "modified"}:
+                is_changed |= self.__add_key(os.fsdecode(event.src_path), event)
+
+        if is_changed and self.on_change:
+            self.on_change()
+
+    def __add_key(self, key: str, event: FileSystemEvent) -> bool:
+        if not self.__is_watched(key, event.is_directory):
+            return False
+
+        if event.event_type == "created" and key not in self.__changed_keys:
+            self.__created_keys.add(key)
+        self.__changed_keys.add(key)
+        return True
+
+    def __remove_key(self, key: str, event: FileSystemEvent) -> bool:
+        if not self.__is_watched(key, event.is_directory):
+            return False
+
+        if key in self.__created_keys:
+            self.__created_keys.discard(key)
+            self.__changed_keys.discard(key)
+        else:
+            self.__changed_keys.add(key)
+        return True
+
+    def __is_watched(self, key: str, is_dir: bool) -> bool:
+        """Check if a path is a watched file or below a watched directory, and not excluded."""
+        if key in self.__file_keys:
+            return True
+
+        directory_key = next(
+            (
+                directory_key
+                for directory_key in self.__directory_keys
+                if key.startswith(directory_key + os.sep)
+            ),
+            None,
+        )
+        if directory_key is None:
+            return False
+        if self.path_filter is None:
+            return True
+
+        # The path filter assumes the parents of a path are not excluded
+        parent_key = directory_key
+        names = key[len(directory_key) + 1 :].split(os.sep)  # noqa: PTH206
+        for name in names[:-1]:
+            parent_key = os.path.join(parent_key, name)  # noqa: PTH118
+            if self.path_filter.is_excluded(parent_key, is_dir=True):
+                return False
+
+        return not self.path_filter.is_excluded(key, is_dir)
@@ -0,0 +1,22 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+from pathlib import Path
+
+from mkslides.assetstrategy import AssetStrategy, install_file
+
+# Number of hexadecimal characters of the content hash in a fingerprinted name
+FINGERPRINT_LENGTH = 8
+
+
+def get_fingerprinted_name(name: str, file_hash: str) -> str:
+    """Insert the content hash before the suffix of a file name, e.g. `reveal.3f2a9c1d.css`."""
+    path = Path(name)
+    return f"{path.stem}.{file_hash[:FINGERPRINT_LENGTH]}{path.suffix}"
+
+
+def install_fingerprinted_copy(source_path: Path, destination_path: Path) -> None:
+    """Copy a file to its fingerprinted path, unless it is already there, as the content at a fingerprinted path never changes."""
+    if not destination_path.exists():
+        install_file(source_path, destination_path, AssetStrategy.COPY)
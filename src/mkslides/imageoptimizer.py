@@ -0,0 +1,234 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import logging
+import os
+import re
+import shutil
+import threading
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from urllib.parse import quote
+
+from omegaconf import DictConfig, OmegaConf
+
+from mkslides.config import Images
+from mkslides.fingerprint import FINGERPRINT_LENGTH
+from mkslides.linkscanner import LinkKind, LinkSpan
+from mkslides.manifest import hash_config, hash_text
+from mkslides.utils import get_user_cache_path
+
+logger = logging.getLogger(__name__)
+
+# Suffixes of the images that are optimized, animated and vector images are left as is
+IMAGE_SUFFIXES = frozenset([".bmp", ".jpeg", ".jpg", ".png", ".tif", ".tiff", ".webp"])
+
+# Pillow format and suffix of the modern formats images are encoded in
+IMAGE_FORMATS = {
+    "avif": ("AVIF", ".avif"),
+    "webp": ("WEBP", ".webp"),
+}
+
+# Media type of the optimized variants by their suffix
+IMAGE_TYPES = {
+    ".avif": "image/avif",
+    ".jpg": "image/jpeg",
+    ".png": "image/png",
+    ".webp": "image/webp",
+}
+
+# Kinds of the links to images shown in an `<img>`, which are optimized. Other
+# references, like background images, cannot fall back to the original image
+PICTURE_IMAGE_KINDS = frozenset([LinkKind.MARKDOWN_IMAGE, LinkKind.HTML_IMAGE])
+
+# Comment setting the attributes of the element before it, e.g.
+# `<!-- .element: class="r-stretch" -->`
+ELEMENT_ATTRIBUTES_REGEX = re.compile(r"[ \t]*<!--\s*\.element\b.*?-->", re.DOTALL)
+
+# Name of an image variant in a cache entry, e.g. `1920w.webp`
+VARIANT_NAME_REGEX = re.compile(r"^(?P<width>\d+)w\.[a-z]+$")
+
+
+@dataclass(frozen=True)
+class ImageVariant:
+    path: Path
+    width: int
+
+
+def is_optimizable_image(path: str) -> bool:
+    return Path(path).suffix.lower() in IMAGE_SUFFIXES
+
+
+def get_variant_prefix(source_name: str, key: str) -> str:
+    """Get the start of the names of the optimized variants of an image, e.g. `photo.3f2a9c1d.`."""
+    return f"{Path(source_name).stem}.{key[:FINGERPRINT_LENGTH]}."
+
+
+def get_srcset(urls: dict[str, int]) -> str:
+    """Get the value of a `srcset` attribute for the given URLs of the variants of an image and their widths."""
+    return ", ".join(f"{quote(url)} {width}w" for url, width in urls.items())
+
+
+def get_picture_insertions(
+    content: str,
+    link_spans: Iterable[LinkSpan],
+    images: dict[str, dict[str, int]],
+) -> list[tuple[int, int, str]]:
+    """
+    Get the insertions that wrap the images with the given links in a `<picture>`, with a `<source>` listing the URLs of their optimized variants.
+
+    The image itself keeps linking the original, which is shown by browsers
+    that do not support the format of the variants. A comment setting the
+    attributes of the image is kept right after it, inside the `<picture>`.
+    """
+    insertions = []
+    for link_span in link_spans:
+        if link_span.kind not in PICTURE_IMAGE_KINDS or not (
+            urls := images.get(link_span.link)
+        ):
+            continue
+
+        image_type = IMAGE_TYPES[Path(next(iter(urls))).suffix]
+        picture_end = link_span.element_end
+        if match := ELEMENT_ATTRIBUTES_REGEX.match(content, picture_end):
+            picture_end = match.end()
+
+        insertions.append(
+            (
+                link_span.element_start,
+                link_span.element_start,
+                f'<picture><source type="{image_type}" srcset="{get_srcset(urls)}">',
+            ),
+        )
+        insertions.append((picture_end, picture_end, "</picture>"))
+
+    return insertions
+
+
+class ImageOptimizer:
+    """
+    Downscale images and encode them in a modern format.
+
+    The variants of an image are cached in a directory named after the hash
+    of its content and the settings, so an image is only encoded again when
+    it or the settings change. Images can be optimized from multiple threads,
+    as Pillow releases the GIL while decoding, resizing and encoding.
+    """
+
+    def __init__(self, settings: Images, cache_path: Path | None = None) -> None:
+        try:
+            import PIL  # type: ignore[import-not-found, unused-ignore]  # noqa: PLC0415
+        except ImportError as error:
+            msg = "Image optimization requires the Pillow package, install it with 'pip install mkslides[images]'"
+            raise ImportError(msg) from error
+
+        for image_format in settings.formats:
+            if image_format not in IMAGE_FORMATS:
+                msg = f"Unknown image format '{image_format}', expected one of: {', '.join(IMAGE_FORMATS)}"
+                raise ValueError(msg)
+
+        self.settings = settings
+        self.cache_path = cache_path or get_user_cache_path() / "images"
+        self.settings_hash = hash_text(hash_config(settings) + PIL.__version__)
+
+    def get_key(self, source_hash: str) -> str:
+        """Get the key of the cache entry of an image with the given content hash."""
+        return hash_text(source_hash + self.settings_hash)
+
+    def optimize(self, source_path: Path, key: str) -> list[ImageVariant]:
+        """Get the variants of an image from the largest to the smallest, encoding them if they are not cached."""
+        entry_path = self.cache_path / key[:2] / key
+        if entry_path.is_dir():
+            logger.debug(f"Optimized image '{source_path}' found in cache")
+        else:
+            self.__create_entry(source_path, entry_path)
+
+        variants = [
+            ImageVariant(path, int(match["width"]))
+            for path in entry_path.iterdir()
+            if (match := VARIANT_NAME_REGEX.match(path.name))
+        ]
+        return sorted(variants, key=lambda variant: variant.width, reverse=True)
+
+    def __create_entry(self, source_path: Path, entry_path: Path) -> None:
+        from PIL import (  # type: ignore[import-not-found, unused-ignore]  # noqa: PLC0415
+            Image,
+            ImageOps,
+        )
+
+        # The variants are encoded in a temporary directory first, so a
+        # concurrent build never sees a partial entry
+        temporary_path = entry_path.with_name(
+            f".{entry_path.name}.{os.getpid()}.{threading.get_ident()}.tmp",
+        )
+        temporary_path.mkdir(parents=True)
+        try:
+            max_dimension = self.settings.max_dimension
+            with Image.open(source_path) as source_image:
+                # Large JPEG photos are decoded at a reduced scale
+                source_image.draft(source_image.mode, (max_dimension, max_dimension))
+                image = ImageOps.exif_transpose(source_image)
+
+            image.thumbnail((max_dimension, max_dimension))
+            image_format, suffix, save_options = self.__get_output_format(image)
+            if image_format == "JPEG" and image.mode not in {"L", "RGB"}:
+                image = image.convert("RGB")
+
+            widths = {image.width} | {
+                width for width in self.settings.srcset_widths if width < image.width
+            }
+            for width in sorted(widths, reverse=True):
+                height = max(1, round(image.height * width / image.width))
+                variant = (
+                    image
+                    if width == image.width
+                    else image.resize((width, height), Image.Resampling.LANCZOS)
+                )
+                variant.save(
+                    temporary_path / f"{width}w{suffix}",
+                    format=image_format,
+                    **save_options,
+                )
+
+            try:
+                temporary_path.rename(entry_path)
+            except OSError:
+                # Another process added the same entry in the meantime
+                shutil.rmtree(temporary_path)
+        except BaseException:
+            shutil.rmtree(temporary_path, ignore_errors=True)
+            raise
+
+        logger.debug(
+            f"Optimized image '{source_path}' to {image.width}x{image.height} {suffix}",
+        )
+
+    def __get_output_format(self, image: Any) -> tuple[str, str, dict[str, Any]]:
+        """Get the first configured format Pillow can encode, or JPEG or PNG if none of them are available."""
+        from PIL import features  # type: ignore[import-not-found, unused-ignore]  # noqa: PLC0415
+
+        quality = self.settings.quality
+        for image_format in self.settings.formats:
+            pillow_format, suffix = IMAGE_FORMATS[image_format]
+            if image_format in features.modules and features.check_module(
+                image_format,
+            ):
+                return pillow_format, suffix, {"quality": quality}
+
+        if "A" in image.getbands() or "transparency" in image.info:
+            return "PNG", ".png", {"optimize": True}
+
+        return "JPEG", ".jpg", {"quality": quality, "optimize": True}
+
+
+def get_image_optimizer(config: DictConfig) -> ImageOptimizer | None:
+    """Get the image optimizer for the `images` section of the config, or None if images are not optimized."""
+    if not config.images.optimize:
+        return None
+
+    settings = OmegaConf.to_object(config.images)
+    assert isinstance(settings, Images)
+    return ImageOptimizer(settings)
@@ -0,0 +1,1605 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import html
+import re
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable
+from dataclasses import dataclass
+from enum import Enum
+
+from mkslides.constants import HTML_BACKGROUND_IMAGE_REGEX
+
+# The scanner follows the block and inline rules of Python-Markdown with the
+# "extra" extensions, so it finds the same links as rendering the markdown to
+# HTML and parsing that HTML, without building either document.
+
+# https://github.com/Python-Markdown/markdown/blob/master/markdown/core.py
+BLOCK_LEVEL_TAGS = frozenset(
+    [
+        "address",
+        "article",
+        "aside",
+        "blockquote",
+        "body",
+        "canvas",
+        "center",
+        "colgroup",
+        "dd",
+        "details",
+        "div",
+        "dl",
+        "dt",
+        "fieldset",
+        "figcaption",
+        "figure",
+        "footer",
+        "form",
+        "group",
+        "h1",
+        "h2",
+        "h3",
+        "h4",
+        "h5",
+        "h6",
+        "header",
+        "hgroup",
+        "hr",
+        "html",
+        "iframe",
+        "legend",
+        "li",
+        "main",
+        "map",
+        "math",
+        "menu",
+        "nav",
+        "noscript",
+        "object",
+        "ol",
+        "option",
+        "output",
+        "p",
+        "pre",
+        "progress",
+        "script",
+        "section",
+        "style",
+        "summary",
+        "table",
+        "tbody",
+        "td",
+        "textarea",
+        "tfoot",
+        "th",
+        "thead",
+        "tr",
+        "ul",
+        "video",
+    ],
+)
+
+# Block-level tags of which the content is never parsed as markdown, even when
+# they have a markdown attribute
+RAW_TAGS = frozenset(["canvas", "math", "option", "pre", "script", "style", "textarea"])
+
+VOID_TAGS = frozenset(
+    [
+        "area",
+        "base",
+        "br",
+        "col",
+        "embed",
+        "hr",
+        "img",
+        "input",
+        "link",
+        "meta",
+        "param",
+        "source",
+        "track",
+        "wbr",
+    ],
+)
+
+CDATA_TAGS = frozenset(["script", "style"])
+
+CODE_TAGS = frozenset(["code", "pre"])
+
+
+# https://github.com/Python-Markdown/markdown/blob/master/markdown/extensions/md_in_html.py
+MARKDOWN_ATTRIBUTE_VALUES = frozenset(["1", "block", "span"])
+
+# https://github.com/Python-Markdown/markdown/blob/master/markdown/core.py
+TAB_LENGTH = 4
+
+ESCAPED_CHARS = frozenset("\\`*_{}[]()>#+-.!|")
+
+PLACEHOLDER_REGEX = re.compile(r"\x02(\d+)\x03")
+
+# Characters that are replaced or removed before parsing
+NORMALIZED_CHARACTERS_REGEX = re.compile(r"[\r\t\x02\x03]")
+
+LINE_END_REGEX = re.compile(r"\r\n?|\n")
+
+LINE_CHARACTERS_REGEX = re.compile(r"[\t\x02\x03]")
+
+WHITESPACE_LINE_REGEX = re.compile(r"\n +(?=\n)")
+
+# https://github.com/Python-Markdown/markdown/blob/master/markdown/extensions/fenced_code.py
+FENCED_CODE_REGEX = re.compile(
+    r"""
+    (?P<fence>^(?:~{3,}|`{3,}))[ ]*                             # Opening fence
+    (
+        (\{[^\n]*\})                                            # Attributes
+        |
+        (\.?[\w#.+-]*[ ]*)?                                     # Language
+        (hl_lines=(?P<quot>"|').*?(?P=quot)[ ]*)?               # Highlighted lines
+    )
+    \n
+    .*?(?<=\n)                                                  # Code
+    (?P=fence)[ ]*$                                             # Closing fence
+    """,
+    re.MULTILINE | re.DOTALL | re.VERBOSE,
+)
+
+HTML_BLOCK_START_REGEX = re.compile(
+    r"""
+    (?P<comment><!--)                                           # Comment anywhere
+    |
+    ^[ ]{0,3}<(?P<tag>[a-zA-Z][^\s/>]*)                         # Tag at the start of a line
+    """,
+    re.MULTILINE | re.VERBOSE,
+)
+
+HTML_TOKEN_REGEX = re.compile(
+    r"""
+    <!--(?P<comment>.*?)-->                                     # Comment
+    |
+    <(?P<closing>/?)(?P<tag>[a-zA-Z][^\s/>]*)                   # Tag name
+    (?P<attributes>(?:[^>"']|"[^"]*"|'[^']*')*?)                # Attributes
+    (?P<self_closing>/?)>
+    """,
+    re.DOTALL | re.VERBOSE,
+)
+
+HTML_ATTRIBUTE_REGEX = re.compile(
+    r"""
+    (?P<name>[^\s/>"'=][^\s/>=]*)
+    (?:
+        \s*=+\s*
+        (?P<value>'[^']*'|"[^"]*"|(?!['"])[^>\s]*)
+    )?
+    """,
+    re.VERBOSE,
+)
+
+HTML_START_TAG_REGEX = re.compile(r"<(?P<tag>[a-zA-Z][^\s/>]*)")
+
+# https://html.spec.whatwg.org/multipage/images.html#parsing-a-srcset-attribute
+# URL of an image candidate in a srcset attribute, with the commas that end it
+SRCSET_URL_REGEX = re.compile(r"[^\s,]\S*")
+
+# https://github.com/Python-Markdown/markdown/blob/master/markdown/inlinepatterns.py
+INLINE_HTML_REGEX = re.compile(
+    r"""<(\/?+[a-zA-Z][^\s"'<>@]*+(?:\s+[^\s"'=<>]++(?:\s*+=\s*+(?:"[^"]*+"|'[^']*+'|[^\s"'=<>]++))?+)*+\s*+/?|"""
+    r"""!--(?:(?!<!--|-->).)*--|"""
+    r"""[?](?:(?!<[?]|[?]>).)*[?]|"""
+    r"""!\[CDATA\[(?:(?!<!\[CDATA\[|\]\]>).)*\]\])>""",
+    re.DOTALL,
+)
+
+INLINE_AUTOLINK_REGEX = re.compile(
+    r"<(?:(?:[Ff]|[Hh][Tt])[Tt][Pp][Ss]?://[^<>]*|[^<> !]+@[^@<> ]+)>",
+)
+
+INLINE_TOKEN_REGEX = re.compile(r"!?\[|<")
+
+INLINE_CODE_OR_ESCAPE_REGEX = re.compile(r"\\(?P<escaped>.)|`", re.DOTALL)
+
+LINK_ANGLE_BRACKETS_REGEX = re.compile(
+    r"""\(\s*(?:(<[^<>]*>)\s*(?:('[^']*'|"[^"]*")\s*)?\))?""",
+    re.DOTALL,
+)
+
+LINK_REFERENCE_REGEX = re.compile(r"\s?\[([^\]]*)\]", re.DOTALL)
+
+WHITESPACE_REGEX = re.compile(r"\s+")
+
+ENTITY_REGEX = re.compile(
+    r"&(?:\#[0-9]+|\#x[0-9a-f]+|[0-9a-z]+);",
+    re.IGNORECASE,
+)
+
+# https://github.com/Python-Markdown/markdown/blob/master/markdown/blockprocessors.py
+REFERENCE_DEFINITION_REGEX = re.compile(
+    r"""^[ ]{0,3}\[([^\[\]]*)\]:[ ]*(?:\n[ ]*)?([^\s]+)[ ]*(?:\n[ ]*)?((["'])(.*)\4[ ]*|\((.*)\)[ ]*)?$""",
+    re.MULTILINE,
+)
+
+BLOCKQUOTE_REGEX = re.compile(r"(^|\n)[ ]{0,3}>[ ]?(.*)")
+
+LIST_ITEM_REGEX = re.compile(r"^[ ]{0,3}(?:[*+-]|\d+\.)[ ]+")
+
+NESTED_LIST_ITEM_REGEX = re.compile(r"^[ ]{4,7}(?:[*+-]|\d+\.)[ ]+")
+
+FOOTNOTE_DEFINITION_REGEX = re.compile(r"^[ ]{0,3}\[\^(?P<id>[^\]]*)\]:")
+
+# https://github.com/Python-Markdown/markdown/blob/master/markdown/extensions/abbr.py
+ABBREVIATION_DEFINITION_REGEX = re.compile(
+    r"^[*]\[(?P<abbreviation>[^\\]*?)\][ ]?:[ ]*\n?[ ]*(?P<title>.*)$",
+    re.MULTILINE,
+)
+
+# https://github.com/Python-Markdown/markdown/blob/master/markdown/extensions/def_list.py
+DEFINITION_REGEX = re.compile(r"(^|\n)[ ]{0,3}:[ ]{1,3}(.*?)(\n|$)")
+
+DEFINITION_NO_INDENT_REGEX = re.compile(r"^[ ]{0,3}[^ :]")
+
+# Headers and horizontal rules are blocks on their own
+SINGLE_LINE_BLOCK_REGEX = re.compile(
+    r"^(?:\#{1,6}|[ ]{0,3}(?:(?:-[ ]{0,2}){3,}|(?:_[ ]{0,2}){3,}|(?:\*[ ]{0,2}){3,})[ ]*$)",
+)
+
+
+class LinkKind(Enum):
+    MARKDOWN_LINK = "markdown link"
+    MARKDOWN_IMAGE = "markdown image"
+    HTML_LINK = "html link"
+    HTML_IMAGE = "html image"
+    HTML_PICTURE_IMAGE = "html picture image"
+    HTML_SOURCE = "html source"
+    HTML_SRCSET = "html srcset"
+    BACKGROUND_IMAGE = "background image"
+
+
+@dataclass(frozen=True)
+class LinkSpan:
+    """
+    A link found in the markdown, with the position of its target.
+
+    The target is `markdown_content[start:end]`, before unescaping. The
+    element the link is part of is `markdown_content[element_start:element_end]`:
+    the markdown link or image, the HTML tag or the comment. For reference
+    links, the target is in the reference definition.
+    """
+
+    link: str
+    kind: LinkKind
+    start: int
+    end: int
+    element_start: int
+    element_end: int
+
+
+# Attribute with the link of each tag and the kind of that link
+LINK_ATTRIBUTES = {
+    "a": ("href", LinkKind.HTML_LINK),
+    "img": ("src", LinkKind.HTML_IMAGE),
+    "source": ("src", LinkKind.HTML_SOURCE),
+}
+
+# Tags with a srcset attribute, of which each image candidate is a link
+SRCSET_TAGS = frozenset(["img", "source"])
+
+# Kinds of the links in HTML attributes, which are escaped in the markdown
+HTML_LINK_KINDS = frozenset(
+    [
+        *(kind for _, kind in LINK_ATTRIBUTES.values()),
+        LinkKind.HTML_PICTURE_IMAGE,
+        LinkKind.HTML_SRCSET,
+    ],
+)
+
+
+def find_links(markdown_content: str) -> set[str]:
+    """
+    Find all link targets in the given markdown content.
+
+    These are the targets of markdown links and images, of `<a>`, `<img>` and
+    `<source>` tags, of the image candidates in the `srcset` of `<img>` and
+    `<source>` tags and of `data-background-image` attributes in comments.
+    Links in code are ignored.
+    """
+    return {link_span.link for link_span in find_link_spans(markdown_content)}
+
+
+def find_link_spans(markdown_content: str) -> list[LinkSpan]:
+    """Find all links in the given markdown content like `find_links`, with the positions of their targets."""
+    return LinkScanner().scan(markdown_content)
+
+
+def replace_spans(content: str, replacements: Iterable[tuple[int, int, str]]) -> str:
+    """
+    Replace the given ranges of the content in a single pass.
+
+    Ranges that are replaced more than once, like the target of a reference
+    definition that is used by several links, are replaced only once. An
+    empty range inserts its replacement.
+    """
+    parts = []
+    position = 0
+    for start, end, replacement in sorted(set(replacements)):
+        if start < position:
+            continue
+
+        parts.append(content[position:start])
+        parts.append(replacement)
+        position = end
+
+    parts.append(content[position:])
+    return "".join(parts)
+
+
+class SourceText:
+    """
+    Text derived from the scanned markdown, with the positions in the markdown its pieces come from.
+
+    A piece is either a copy of a range of the markdown, or text replacing
+    one, like the spaces of an expanded tab or the placeholder of a code span.
+    Positions in the text are mapped back through these pieces, so the
+    scanner can report the positions of links in the markdown itself.
+
+    A slice only refers to the text it is part of, as most slices, like the
+    lines of a block, are never mapped or joined.
+    """
+
+    __slots__ = ("base", "offset", "piece_starts", "pieces", "text")
+
+    def __init__(
+        self,
+        text: str,
+        pieces: list[tuple[int, int, int, int]] | None = None,
+        base: "SourceText | None" = None,
+        offset: int = 0,
+    ) -> None:
+        self.text = text
+
+        # Start and end of each piece in the text and in the markdown, a
+        # slice has none of its own
+        self.pieces = pieces or []
+        self.piece_starts = [piece[0] for piece in pieces] if pieces else []
+
+        # The text this is a slice of, starting at the offset
+        self.base = base
+        self.offset = offset
+
+    @classmethod
+    def copy(cls, content: str, start: int, end: int) -> "SourceText":
+        return cls(content[start:end], [(0, end - start, start, end)])
+
+    @classmethod
+    def replacing(cls, text: str, source_start: int, source_end: int) -> "SourceText":
+        return cls(text, [(0, len(text), source_start, source_end)])
+
+    @classmethod
+    def concat(cls, parts: Iterable["SourceText | str"]) -> "SourceText":
+        """Concatenate the parts, text that is not derived from the markdown is mapped to the end of the part before it."""
+        texts = []
+        pieces: list[tuple[int, int, int, int]] = []
+        offset = 0
+        source_end = 0
+
+        for part in parts:
+            if isinstance(part, str):
+                part_pieces = [(0, len(part), source_end, source_end)]
+                texts.append(part)
+            else:
+                part_pieces = part.get_pieces()
+                texts.append(part.text)
+
+            for (
+                piece_start,
+                piece_end,
+                piece_source_start,
+                piece_source_end,
+            ) in part_pieces:
+                piece = (
+                    piece_start + offset,
+                    piece_end + offset,
+                    piece_source_start,
+                    piece_source_end,
+                )
+                if piece[0] == piece[1]:
+                    continue
+
+                if (
+                    pieces
+                    and pieces[-1][1] == piece[0]
+                    and pieces[-1][3] == piece[2]
+                    and SourceText.__is_copy(pieces[-1])
+                    and SourceText.__is_copy(piece)
+                ):
+                    # Merge consecutive ranges of the markdown
+                    pieces[-1] = (pieces[-1][0], piece[1], pieces[-1][2], piece[3])
+                else:
+                    pieces.append(piece)
+                source_end = piece_source_end
+
+            offset += len(texts[-1])
+
+        return cls("".join(texts), pieces)
+
+    @classmethod
+    def join(cls, separator: str, parts: Iterable["SourceText"]) -> "SourceText":
+        parts = list(parts)
+        if (contiguous_part := cls.__join_contiguous(separator, parts)) is not None:
+            return contiguous_part
+
+        joined_parts: list[SourceText | str] = []
+        for part in parts:
+            if joined_parts:
+                joined_parts.append(separator)
+            joined_parts.append(part)
+
+        return cls.concat(joined_parts)
+
+    @staticmethod
+    def __join_contiguous(
+        separator: str,
+        parts: list["SourceText"],
+    ) -> "SourceText | None":
+        """Join slices that follow each other in the same text, like lines that are not changed, as a slice of that text."""
+        if not parts:
+            return None
+        if len(parts) == 1:
+            return parts[0]
+
+        base = parts[0].base
+        if base is None:
+            return None
+
+        position = parts[0].offset + len(parts[0].text)
+        for part in parts[1:]:
+            if (
+                part.base is not base
+                or part.offset != position + len(separator)
+                or not base.text.startswith(separator, position)
+            ):
+                return None
+            position = part.offset + len(part.text)
+
+        return base.slice(parts[0].offset, position)
+
+    @staticmethod
+    def __is_copy(piece: tuple[int, int, int, int]) -> bool:
+        return piece[1] - piece[0] == piece[3] - piece[2]
+
+    def get_pieces(self) -> list[tuple[int, int, int, int]]:
+        if self.base is None:
+            return self.pieces
+
+        start = self.offset
+        end = start + len(self.text)
+        pieces = []
+        base_pieces = self.base.pieces
+        for index in range(
+            max(bisect_right(self.base.piece_starts, start) - 1, 0),
+            len(base_pieces),
+        ):
+            piece_start, piece_end, source_start, source_end = base_pieces[index]
+            if piece_start >= end:
+                break
+
+            clipped_start = max(piece_start, start)
+            clipped_end = min(piece_end, end)
+            if SourceText.__is_copy(base_pieces[index]):
+                source_end = source_start + clipped_end - piece_start
+                source_start += clipped_start - piece_start
+            pieces.append(
+                (clipped_start - start, clipped_end - start, source_start, source_end),
+            )
+
+        return pieces
+
+    def slice(self, start: int, end: int | None = None) -> "SourceText":
+        length = len(self.text)
+        start = min(start, length)
+        end = length if end is None else max(min(end, length), start)
+
+        if self.base is None:
+            return SourceText(self.text[start:end], base=self, offset=start)
+
+        return SourceText(
+            self.text[start:end],
+            base=self.base,
+            offset=self.offset + start,
+        )
+
+    def split(self, separator: str) -> list["SourceText"]:
+        parts = []
+        position = 0
+        while (index := self.text.find(separator, position)) != -1:
+            parts.append(self.slice(position, index))
+            position = index + len(separator)
+
+        parts.append(self.slice(position))
+        return parts
+
+    def removeprefix(self, prefix: str) -> "SourceText":
+        return self.slice(len(prefix)) if self.text.startswith(prefix) else self
+
+    def lstrip(self, characters: str) -> "SourceText":
+        return self.slice(len(self.text) - len(self.text.lstrip(characters)))
+
+    def rstrip(self, characters: str) -> "SourceText":
+        return self.slice(0, len(self.text.rstrip(characters)))
+
+    def get_source_span(self, start: int, end: int) -> tuple[int, int]:
+        """Get the range of the markdown the given range of the text comes from."""
+        if self.base is not None:
+            return self.base.get_source_span(self.offset + start, self.offset + end)
+
+        if start >= end:
+            position = self.get_source_position(start)
+            return position, position
+
+        index = bisect_right(self.piece_starts, start) - 1
+        piece_start, _, source_start, _ = self.pieces[index]
+        if SourceText.__is_copy(self.pieces[index]):
+            source_start += start - piece_start
+
+        return source_start, self.get_source_position(end)
+
+    def get_source_position(self, position: int) -> int:
+        """Get the position in the markdown right after the given position of the text."""
+        if self.base is not None:
+            return self.base.get_source_position(self.offset + position)
+
+        if not self.pieces:
+            return 0
+
+        index = max(bisect_left(self.piece_starts, position) - 1, 0)
+        piece_start, _, source_start, source_end = self.pieces[index]
+        if SourceText.__is_copy(self.pieces[index]):
+            return source_start + position - piece_start
+
+        return source_end
+
+
+class LinkScanner:
+    def __init__(self) -> None:
+        self.link_spans: list[LinkSpan] = []
+        self.references: dict[str, tuple[str, int, int]] = {}
+        self.inline_blocks: list[SourceText] = []
+        self.footnotes: dict[str, SourceText] = {}
+
+        # Whether the next block is the first in its container, which makes a
+        # definition without terms a paragraph instead
+        self.is_first_block = True
+
+        # The text being scanned for links, to map their positions back to
+        # the markdown
+        self.source_text = SourceText("", [])
+
+        # Stack of open HTML tags to know if a link is inside code
+        self.open_tags: list[str] = []
+
+        # Code spans and escaped characters of the inline block being scanned
+        self.stash: list[tuple[str, str]] = []
+
+    def scan(self, markdown_content: str) -> list[LinkSpan]:
+        text = self.__normalize(markdown_content)
+        text = self.__remove_fenced_code(text)
+        text = self.__extract_html_blocks(text)
+
+        # Reference definitions can follow their use, so inline content is
+        # only scanned once all blocks are parsed.
+        self.__parse_blocks(text)
+        for footnote in list(self.footnotes.values()):
+            self.__parse_container(footnote)
+        for block in self.inline_blocks:
+            self.__scan_inline_block(block)
+
+        return self.link_spans
+
+    ############################################################################
+
+    def __normalize(self, markdown_content: str) -> SourceText:
+        """Normalize the line endings, expand tabs and empty the lines with only spaces, like Python-Markdown does."""
+        if not NORMALIZED_CHARACTERS_REGEX.search(
+            markdown_content,
+        ) and not WHITESPACE_LINE_REGEX.search(markdown_content + "\n"):
+            return SourceText.concat(
+                [
+                    SourceText.copy(markdown_content, 0, len(markdown_content)),
+                    "\n\n",
+                ],
+            )
+
+        parts: list[SourceText | str] = []
+        position = 0
+        for line_end in LINE_END_REGEX.finditer(markdown_content):
+            parts.extend(
+                self.__normalize_line(
+                    markdown_content,
+                    position,
+                    line_end.start(),
+                    is_first_line=position == 0,
+                ),
+            )
+            parts.append(SourceText.replacing("\n", *line_end.span()))
+            position = line_end.end()
+
+        parts.extend(
+            self.__normalize_line(
+                markdown_content,
+                position,
+                len(markdown_content),
+                is_first_line=position == 0,
+            ),
+        )
+        parts.append("\n\n")
+        return SourceText.concat(parts)
+
+    def __normalize_line(
+        self,
+        content: str,
+        start: int,
+        end: int,
+        *,
+        is_first_line: bool,
+    ) -> list[SourceText]:
+        parts = []
+        column = 0
+        position = start
+        for match in LINE_CHARACTERS_REGEX.finditer(content, start, end):
+            if position < match.start():
+                parts.append(SourceText.copy(content, position, match.start()))
+                column += match.start() - position
+
+            if match.group() == "\t":
+                spaces = TAB_LENGTH - column % TAB_LENGTH
+                parts.append(SourceText.replacing(" " * spaces, *match.span()))
+                column += spaces
+
+            position = match.end()
+
+        if position < end:
+            parts.append(SourceText.copy(content, position, end))
+
+        if not is_first_line and all(
+            part.text and not part.text.strip(" ") for part in parts
+        ):
+            return []
+
+        return parts
+
+    def __remove_fenced_code(self, text: SourceText) -> SourceText:
+        if "```" not in text.text and "~~~" not in text.text:
+            return text
+
+        parts: list[SourceText | str] = []
+        position = 0
+        for match in FENCED_CODE_REGEX.finditer(text.text):
+            parts.append(text.slice(position, match.start()))
+            parts.append("\n\n")
+            position = match.end()
+
+        parts.append(text.slice(position))
+        return SourceText.concat(parts)
+
+    def __extract_html_blocks(self, source_text: SourceText) -> SourceText:
+        """Scan raw HTML blocks and return the remaining markdown."""
+        self.source_text = source_text
+        text = source_text.text
+        markdown_parts: list[SourceText | str] = []
+        position = 0
+
+        # Content after a raw HTML block on the same line can start another
+        # raw HTML block
+        tail_end = 0
+
+        while True:
+            match = HTML_BLOCK_START_REGEX.search(text, position)
+            tag_start = (
+                self.__find_block_tag(text, position, tail_end)
+                if position < tail_end
+                else None
+            )
+
+            end: int | None
+            if tag_start is not None and (not match or tag_start < match.start()):
+                start = tag_start
+                end = self.__scan_html_block(text, start)
+            elif not match:
+                break
+            elif match.group("comment"):
+                start = match.start()
+                comment_end = text.find("-->", start + 4)
+                line_start = text.rfind("\n", 0, start) + 1
+                if comment_end == -1:
+                    # An unclosed comment is text
+                    end = None
+                elif start - line_start >= TAB_LENGTH or text[line_start:start].strip():
+                    # Inline comments are part of the markdown
+                    markdown_parts.append(source_text.slice(position, comment_end + 3))
+                    position = comment_end + 3
+                    continue
+                else:
+                    self.__handle_comment(text, start + 4, comment_end)
+                    end = comment_end + 3
+            else:
+                start = match.start("tag") - 1
+                end = (
+                    self.__scan_html_block(text, start)
+                    if match.group("tag").lower() in BLOCK_LEVEL_TAGS
+                    else None
+                )
+
+            if end is None:
+                markdown_parts.append(source_text.slice(position, start + 1))
+                position = start + 1
+                continue
+
+            markdown_parts.append(source_text.slice(position, start))
+            markdown_parts.append("\n\n")
+            position = end
+
+            line_end = text.find("\n", end)
+            tail_end = line_end if text[end:line_end].strip() else 0
+
+        markdown_parts.append(source_text.slice(position))
+        return SourceText.concat(markdown_parts)
+
+    def __find_block_tag(self, text: str, start: int, end: int) -> int | None:
+        """Return the position of the first block-level start tag in the range."""
+        for match in HTML_START_TAG_REGEX.finditer(text, start, end):
+            if match.group("tag").lower() in BLOCK_LEVEL_TAGS:
+                return match.start()
+
+        return None
+
+    def __scan_html_block(self, text: str, start: int) -> int | None:
+        """
+        Scan the raw HTML block starting with the tag at the start position.
+
+        Return the position after the block, which ends when all its tags are
+        closed, or None if there is no valid tag.
+        """
+        if (
+            not (tag_match := HTML_TOKEN_REGEX.match(text, start))
+            or tag_match.group(
+                "comment",
+            )
+            is not None
+        ):
+            return None
+
+        self.open_tags = []
+        tag = tag_match.group("tag").lower()
+        attributes = self.__parse_attributes(text, tag_match)
+        is_markdown = (
+            tag not in RAW_TAGS
+            and "markdown" in attributes
+            and attributes["markdown"][0] in MARKDOWN_ATTRIBUTE_VALUES
+        )
+        if tag_match.group("self_closing") or tag == "hr" or is_markdown:
+            # The content of a block with a markdown attribute is parsed as
+            # markdown, so only the tag itself is raw.
+            self.__handle_tag(text, tag_match, attributes, is_self_closing=True)
+            return tag_match.end()
+
+        position = start
+        while match := HTML_TOKEN_REGEX.search(text, position):
+            position = match.end()
+
+            if match.group("comment") is not None:
+                self.__handle_comment(text, *match.span("comment"))
+                continue
+
+            tag = match.group("tag").lower()
+            self.__handle_tag(
+                text,
+                match,
+                self.__parse_attributes(text, match),
+                is_self_closing=bool(match.group("self_closing")),
+            )
+
+            if tag in CDATA_TAGS and not match.group("closing"):
+                # Script and style content does not contain tags
+                cdata_end = text.lower().find(f"</{tag}", position)
+                position = len(text) if cdata_end == -1 else cdata_end
+            elif not self.open_tags:
+                return position
+
+        return len(text)
+
+    def __handle_tag(
+        self,
+        text: str,
+        tag_match: re.Match,
+        attributes: dict[str, tuple[str, int, int]],
+        *,
+        is_self_closing: bool,
+    ) -> None:
+        tag = tag_match.group("tag").lower()
+        if tag_match.group("closing"):
+            if tag in self.open_tags:
+                while self.open_tags.pop() != tag:
+                    pass
+            return
+
+        if (link_attribute := LINK_ATTRIBUTES.get(tag)) and (
+            attribute := attributes.get(link_attribute[0])
+        ):
+            link, start, end = attribute
+            kind = link_attribute[1]
+            if kind == LinkKind.HTML_IMAGE and "picture" in self.open_tags:
+                kind = LinkKind.HTML_PICTURE_IMAGE
+            self.__add_link(
+                link,
+                kind,
+                start,
+                end,
+                element_start=tag_match.start(),
+                element_end=tag_match.end(),
+            )
+
+        if tag in SRCSET_TAGS and (attribute := attributes.get("srcset")):
+            _, start, end = attribute
+            self.__add_srcset_links(text, start, end, *tag_match.span())
+
+        if not is_self_closing and tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def __add_srcset_links(
+        self,
+        text: str,
+        start: int,
+        end: int,
+        element_start: int,
+        element_end: int,
+    ) -> None:
+        """Add the URLs of the image candidates in the escaped srcset attribute value in the given range."""
+        position = start
+        while match := SRCSET_URL_REGEX.search(text, position, end):
+            url = match.group().rstrip(",")
+            url_end = match.start() + len(url)
+            self.__add_link(
+                html.unescape(self.__restore(url, is_html=True)),
+                LinkKind.HTML_SRCSET,
+                match.start(),
+                url_end,
+                element_start=element_start,
+                element_end=element_end,
+            )
+
+            if url_end < match.end():
+                # The commas end the candidate, it has no descriptors
+                position = match.end()
+            else:
+                descriptors_end = text.find(",", url_end, end)
+                position = end if descriptors_end == -1 else descriptors_end + 1
+
+    def __handle_comment(self, text: str, start: int, end: int) -> None:
+        """Handle the comment with its content in the given range."""
+        if match := HTML_BACKGROUND_IMAGE_REGEX.search(text, start, end):
+            # Comments are found in code too, like Python-Markdown does
+            self.__add_link_span(
+                self.__restore(match.group("location"), is_html=True),
+                LinkKind.BACKGROUND_IMAGE,
+                *match.span("location"),
+                element_start=start - len("<!--"),
+                element_end=end + len("-->"),
+            )
+
+    def __parse_attributes(
+        self,
+        text: str,
+        tag_match: re.Match,
+    ) -> dict[str, tuple[str, int, int]]:
+        """Parse the attributes of a tag into their value and the range of the value."""
+        parsed_attributes = {}
+        for match in HTML_ATTRIBUTE_REGEX.finditer(
+            text,
+            tag_match.start("attributes"),
+            tag_match.end("attributes"),
+        ):
+            start, end = match.span("value")
+            if start == -1:
+                start = end = match.end()
+            elif text[start] in {"'", '"'}:
+                start += 1
+                end -= 1
+
+            value = html.unescape(self.__restore(text[start:end], is_html=True))
+            parsed_attributes[match.group("name").lower()] = (value, start, end)
+
+        return parsed_attributes
+
+    def __add_link(
+        self,
+        link: str,
+        kind: LinkKind,
+        start: int,
+        end: int,
+        *,
+        element_start: int,
+        element_end: int,
+    ) -> None:
+        """Add a link with the given positions in the text being scanned, unless it is in code."""
+        if not CODE_TAGS.intersection(self.open_tags):
+            self.__add_link_span(
+                link,
+                kind,
+                start,
+                end,
+                element_start=element_start,
+                element_end=element_end,
+            )
+
+    def __add_link_span(
+        self,
+        link: str,
+        kind: LinkKind,
+        start: int,
+        end: int,
+        *,
+        element_start: int,
+        element_end: int,
+    ) -> None:
+        self.link_spans.append(
+            LinkSpan(
+                link,
+                kind,
+                *self.source_text.get_source_span(start, end),
+                *self.source_text.get_source_span(element_start, element_end),
+            ),
+        )
+
+    ############################################################################
+
+    def __parse_blocks(self, text: SourceText) -> None:
+        """Collect reference definitions and the blocks with inline content."""
+        after_list = False
+
+        block_end = -2
+        for raw_block in text.text.split("\n\n"):
+            block_start = block_end + 2
+            block_end = block_start + len(raw_block)
+            if not raw_block.strip():
+                continue
+
+            # Python-Markdown removes the empty lines before a block one by one
+            block = text.slice(block_start, block_end).lstrip("\n")
+            if block.text.startswith("    "):
+                if not after_list:
+                    self.__parse_indented_code(block)
+                    continue
+
+                # Content of the previous list item
+                block = SourceText.join(
+                    "\n",
+                    (line.slice(4) for line in block.split("\n")),
+                )
+                if block.text.startswith("    "):
+                    continue
+            else:
+                after_list = bool(
+                    LIST_ITEM_REGEX.match(block.text)
+                    or FOOTNOTE_DEFINITION_REGEX.match(block.text)
+                    or self.__find_definition(block.text),
+                )
+
+            self.__parse_block(block)
+
+    def __parse_indented_code(self, block: SourceText) -> None:
+        self.is_first_block = False
+        lines = block.split("\n")
+        for index, line in enumerate(lines):
+            if line.text and not line.text.startswith("    "):
+                # The rest is not part of the code block
+                self.__parse_blocks(SourceText.join("\n", lines[index:]))
+                return
+
+    def __parse_block(self, block: SourceText) -> None:  # noqa: C901
+        lines = block.text.split("\n")
+
+        line_start = 0
+        for line in lines:
+            if SINGLE_LINE_BLOCK_REGEX.match(line):
+                line_end = line_start + len(line)
+                if line_start:
+                    self.__parse_blocks(block.slice(0, line_start - 1))
+                self.__add_inline_block(block.slice(line_start, line_end))
+                if line_end < len(block.text):
+                    self.__parse_blocks(block.slice(line_end + 1))
+                return
+            line_start += len(line) + 1
+
+        if LIST_ITEM_REGEX.match(block.text):
+            self.__parse_list(block.split("\n"))
+            return
+
+        if match := self.__find_definition(block.text):
+            self.__parse_definition(block, match)
+            return
+
+        if ">" in block.text and (match := BLOCKQUOTE_REGEX.search(block.text)):
+            self.__parse_blocks(block.slice(0, match.start()))
+            quote = SourceText.join(
+                "\n",
+                (
+                    line.slice(line_match.start(2))
+                    if (line_match := BLOCKQUOTE_REGEX.match(line.text))
+                    else line
+                    for line in block.slice(match.start()).split("\n")
+                ),
+            )
+            self.__parse_container(quote)
+            return
+
+        line_start = 0
+        for line in lines:
+            if match := FOOTNOTE_DEFINITION_REGEX.match(line):
+                if line_start:
+                    self.__parse_blocks(block.slice(0, line_start - 1))
+                self.__parse_footnote(
+                    match.group("id"),
+                    block.slice(line_start).split("\n"),
+                    match.end(),
+                )
+                return
+            line_start += len(line) + 1
+
+        self.__add_inline_block(block)
+
+    def __parse_list(self, lines: list[SourceText]) -> None:
+        items: list[list[SourceText]] = []
+        for line in lines:
+            if match := LIST_ITEM_REGEX.match(line.text):
+                items.append([line.slice(match.end())])
+            elif NESTED_LIST_ITEM_REGEX.match(line.text) and not items[-1][
+                0
+            ].text.startswith("    "):
+                items.append([line])
+            else:
+                items[-1].append(line)
+
+        for item in items:
+            self.__parse_container(
+                SourceText.join("\n", (line.removeprefix("    ") for line in item)),
+            )
+
+    def __parse_container(self, text: SourceText) -> None:
+        """Parse the blocks of a list item, quote, definition or footnote."""
+        self.is_first_block = True
+        self.__parse_blocks(text)
+        self.is_first_block = False
+
+    def __find_definition(self, text: str) -> re.Match[str] | None:
+        if ":" not in text or not (match := DEFINITION_REGEX.search(text)):
+            return None
+
+        # Without terms, the previous paragraph has them
+        if text[: match.start()].strip() or not self.is_first_block:
+            return match
+
+        return None
+
+    def __parse_definition(self, block: SourceText, match: re.Match[str]) -> None:
+        """Parse a definition list item, of which the terms are only inline content."""
+        for term in block.slice(0, match.start()).split("\n"):
+            if term.text.strip():
+                self.inline_blocks.append(term)
+
+        rest = block.slice(match.end())
+        lines = rest.split("\n")
+        if DEFINITION_NO_INDENT_REGEX.match(rest.text):
+            index = len(lines)
+        else:
+            # Only the indented lines are part of the definition
+            index = 0
+            while index < len(lines) and (
+                lines[index].text.startswith("    ") or not lines[index].text.strip()
+            ):
+                lines[index] = lines[index].removeprefix("    ")
+                index += 1
+
+        definition = block.slice(*match.span(2))
+        if index and (rest_definition := SourceText.join("\n", lines[:index])).text:
+            definition = SourceText.join("\n", [definition, rest_definition])
+        if definition.text.startswith("    "):
+            # An indented definition is content, not code
+            definition = SourceText.join(
+                "\n",
+                (line.removeprefix("    ") for line in definition.split("\n")),
+            )
+        self.__parse_container(definition)
+
+        if index < len(lines):
+            self.__parse_blocks(SourceText.join("\n", lines[index:]))
+
+    def __parse_footnote(
+        self,
+        footnote_id: str,
+        lines: list[SourceText],
+        start: int,
+    ) -> None:
+        """Store the content of a footnote, it is parsed after the document."""
+        content = [lines[0].slice(start).lstrip(" ")]
+        for index, line in enumerate(lines[1:], start=1):
+            if match := FOOTNOTE_DEFINITION_REGEX.match(line.text):
+                self.footnotes[footnote_id] = SourceText.join("\n", content)
+                self.__parse_footnote(match.group("id"), lines[index:], match.end())
+                return
+
+            content.append(line.removeprefix("    "))
+
+        # Later definitions replace earlier ones
+        self.footnotes[footnote_id] = SourceText.join("\n", content)
+
+    def __add_inline_block(self, block: SourceText) -> None:
+        """Add a block with inline content, without its abbreviation and reference definitions."""
+        if (
+            "*[" in block.text
+            and (match := ABBREVIATION_DEFINITION_REGEX.search(block.text))
+            and match.group("abbreviation").strip()
+            and match.group("title").strip()
+        ):
+            # The content around the definition forms new blocks
+            self.__parse_blocks(block.slice(0, match.start()).rstrip("\n"))
+            self.__parse_blocks(block.slice(match.end()).lstrip("\n"))
+            return
+
+        if "]:" in block.text:
+            for match in REFERENCE_DEFINITION_REGEX.finditer(block.text):
+                reference_id = match.group(1).strip().lower()
+                if reference_id.startswith("^"):
+                    # Footnote definitions are rendered as content
+                    continue
+
+                start, end = match.span(2)
+                start += len(match.group(2)) - len(match.group(2).lstrip("<"))
+                end = max(
+                    end - len(match.group(2)) + len(match.group(2).rstrip(">")),
+                    start,
+                )
+                self.references[reference_id] = (
+                    block.text[start:end],
+                    *block.get_source_span(start, end),
+                )
+
+                # The content around the definition forms new blocks
+                self.__parse_blocks(block.slice(0, match.start()).rstrip("\n"))
+                self.__parse_blocks(block.slice(match.end()).lstrip("\n"))
+                return
+
+        if block.text.strip():
+            self.inline_blocks.append(block)
+            self.is_first_block = False
+
+    ############################################################################
+
+    def __scan_inline_block(self, block: SourceText) -> None:
+        self.open_tags = []
+        self.stash = []
+        self.source_text = self.__stash_code_and_escapes(block)
+        text = self.source_text.text
+        self.__scan_inline(text, 0, len(text), allow_reference=True, allow_link=True)
+
+    def __stash_code_and_escapes(self, block: SourceText) -> SourceText:
+        """Replace code spans and escaped characters with placeholders."""
+        text = block.text
+        if "`" not in text and "\\" not in text:
+            return block
+
+        parts: list[SourceText | str] = []
+        position = 0
+        search_position = 0
+
+        while match := INLINE_CODE_OR_ESCAPE_REGEX.search(text, search_position):
+            start = match.start()
+
+            if (escaped := match.group("escaped")) is not None:
+                if escaped not in ESCAPED_CHARS:
+                    search_position = start + 1
+                    continue
+                end = match.end()
+                self.stash.append((escaped, f"\\{escaped}"))
+            else:
+                if (code_span := self.__find_code_span(text, start)) is None:
+                    search_position = start + 1
+                    while text.startswith("`", search_position):
+                        search_position += 1
+                    continue
+                code_start, code_end, end = code_span
+                code = text[code_start:code_end].strip()
+                self.stash.append((code, f"<code>{code}</code>"))
+
+            parts.append(block.slice(position, start))
+            parts.append(
+                SourceText.replacing(
+                    f"\x02{len(self.stash) - 1}\x03",
+                    *block.get_source_span(start, end),
+                ),
+            )
+            position = search_position = end
+
+        parts.append(block.slice(position))
+        return SourceText.concat(parts)
+
+    def __find_code_span(self, text: str, start: int) -> tuple[int, int, int] | None:
+        """Return the start and end of the code and the end of the span."""
+        length = len(text)
+
+        opening_ticks = 0
+        index = start
+        while index < length and text[index] == "`":
+            opening_ticks += 1
+            index += 1
+        code_start = index
+
+        longest_ticks = 0
+        longest_end = 0
+        while (index := text.find("`", index)) != -1:
+            ticks = 0
+            while index < length and text[index] == "`":
+                ticks += 1
+                index += 1
+
+            if ticks == opening_ticks:
+                return code_start, index - ticks, index
+
+            if ticks > longest_ticks:
+                longest_ticks = ticks
+                longest_end = index
+
+        if longest_ticks:
+            # No closing span of the same length, so fall back to the longest
+            # one like Python-Markdown does
+            code_start -= opening_ticks - longest_ticks
+            code_end = longest_end - longest_ticks
+            return code_start, code_end, code_end + code_start - start
+
+        return None
+
+    def __restore(self, text: str, *, is_html: bool) -> str:
+        if "\x02" not in text:
+            return text
+
+        return PLACEHOLDER_REGEX.sub(
+            lambda match: self.stash[int(match.group(1))][is_html],
+            text,
+        )
+
+    def __scan_inline(
+        self,
+        text: str,
+        start: int,
+        end: int,
+        *,
+        allow_reference: bool,
+        allow_link: bool,
+    ) -> None:
+        position = start
+
+        while match := INLINE_TOKEN_REGEX.search(text, position, end):
+            if match.group() == "<":
+                position = self.__scan_inline_html(text, match.start(), end)
+                continue
+
+            label_start = match.end()
+            label_end, is_closed = self.__find_label_end(text, label_start, end)
+            if not is_closed:
+                position = label_start
+            elif match.group() == "![":
+                position = self.__scan_image(
+                    text,
+                    match.start(),
+                    label_start,
+                    label_end,
+                    end,
+                )
+            else:
+                position = self.__scan_link(
+                    text,
+                    match.start(),
+                    label_start,
+                    label_end,
+                    end,
+                    allow_reference=allow_reference,
+                    allow_link=allow_link,
+                )
+
+    def __scan_image(
+        self,
+        text: str,
+        start: int,
+        label_start: int,
+        label_end: int,
+        end: int,
+    ) -> int:
+        """Scan a markdown image and return the position to continue scanning from."""
+        label = text[label_start : label_end - 1]
+        kind = LinkKind.MARKDOWN_IMAGE
+
+        if label_end < end and text[label_end] == "(":
+            link_start, link_end, position, is_handled = self.__parse_link(
+                text,
+                label_end,
+                end,
+            )
+            if is_handled:
+                self.__add_markdown_link(
+                    text,
+                    link_start,
+                    link_end,
+                    kind,
+                    element_start=start,
+                    element_end=position,
+                )
+                return position
+
+        reference_match = LINK_REFERENCE_REGEX.match(text, label_end, end)
+        if reference_match and self.__add_reference_link(
+            reference_match.group(1) or label,
+            kind,
+            start,
+            reference_match.end(),
+        ):
+            return reference_match.end()
+
+        if self.__add_reference_link(label, kind, start, label_end):
+            return label_end
+
+        return label_start
+
+    def __scan_link(
+        self,
+        text: str,
+        start: int,
+        label_start: int,
+        label_end: int,
+        end: int,
+        *,
+        allow_reference: bool,
+        allow_link: bool,
+    ) -> int:
+        """
+        Scan a markdown link and return the position to continue scanning from.
+
+        Like Python-Markdown, the label of a link is scanned for images and
+        other links, but not for the kind of link it is part of.
+        """
+        label = text[label_start : label_end - 1]
+        kind = LinkKind.MARKDOWN_LINK
+
+        reference_match = LINK_REFERENCE_REGEX.match(text, label_end, end)
+        if (
+            allow_reference
+            and reference_match
+            and self.__add_reference_link(
+                reference_match.group(1) or label,
+                kind,
+                start,
+                reference_match.end(),
+            )
+        ):
+            self.__scan_inline(
+                text,
+                label_start,
+                label_end - 1,
+                allow_reference=False,
+                allow_link=allow_link,
+            )
+            return reference_match.end()
+
+        if allow_link and label_end < end and text[label_end] == "(":
+            link_start, link_end, position, is_handled = self.__parse_link(
+                text,
+                label_end,
+                end,
+            )
+            if is_handled:
+                self.__add_markdown_link(
+                    text,
+                    link_start,
+                    link_end,
+                    kind,
+                    element_start=start,
+                    element_end=position,
+                )
+                self.__scan_inline(
+                    text,
+                    label_start,
+                    label_end - 1,
+                    allow_reference=allow_reference,
+                    allow_link=False,
+                )
+                return position
+
+        if self.__add_reference_link(label, kind, start, label_end):
+            self.__scan_inline(
+                text,
+                label_start,
+                label_end - 1,
+                allow_reference=allow_reference,
+                allow_link=False,
+            )
+            return label_end
+
+        return label_start
+
+    def __scan_inline_html(self, text: str, start: int, end: int) -> int:
+        """Scan an inline HTML tag or comment and return the position after it."""
+        if match := INLINE_AUTOLINK_REGEX.match(text, start, end):
+            return match.end()
+
+        if not (match := INLINE_HTML_REGEX.match(text, start, end)):
+            return start + 1
+
+        if match.group().startswith("<!--"):
+            self.__handle_comment(text, start + 4, match.end() - 3)
+        elif tag_match := HTML_TOKEN_REGEX.match(text, start, match.end()):
+            self.__handle_tag(
+                text,
+                tag_match,
+                self.__parse_attributes(text, tag_match),
+                is_self_closing=bool(tag_match.group("self_closing")),
+            )
+
+        return match.end()
+
+    def __find_label_end(self, text: str, start: int, end: int) -> tuple[int, bool]:
+        """Return the position after the closing bracket of a label and whether it is closed."""
+        depth = 1
+        for index in range(start, end):
+            character = text[index]
+            if character == "]":
+                depth -= 1
+                if depth == 0:
+                    return index + 1, True
+            elif character == "[":
+                depth += 1
+
+        return end, False
+
+    def __parse_link(  # noqa: C901, PLR0912, PLR0915
+        self,
+        text: str,
+        start: int,
+        end: int,
+    ) -> tuple[int, int, int, bool]:
+        """
+        Parse the target between the parentheses of a markdown link.
+
+        Return the start and end of the target, the position after the link
+        and whether it is a link. This is a port of `LinkInlineProcessor.getLink` of
+        Python-Markdown, which handles nested parentheses and titles.
+        """
+        match = LINK_ANGLE_BRACKETS_REGEX.match(text, start, end)
+        if match and match.group(1):
+            return match.start(1) + 1, match.end(1) - 1, match.end(), True
+
+        bracket_count = 1
+        backtrack_count = 1
+        index = start_index = link_end = match.end() if match else start
+        last_bracket = -1
+
+        quote = None
+        start_quote = -1
+        exit_quote = -1
+        ignore_matches = False
+
+        alt_quote = None
+        start_alt_quote = -1
+        exit_alt_quote = -1
+
+        last = ""
+
+        for position in range(index, end):
+            character = text[position]
+            if character == "(":
+                if not ignore_matches:
+                    bracket_count += 1
+                elif backtrack_count > 0:
+                    backtrack_count -= 1
+            elif character == ")":
+                if (exit_quote != -1 and quote == last) or (
+                    exit_alt_quote != -1 and alt_quote == last
+                ):
+                    bracket_count = 0
+                elif not ignore_matches:
+                    bracket_count -= 1
+                elif backtrack_count > 0:
+                    backtrack_count -= 1
+                    if backtrack_count == 0:
+                        last_bracket = index + 1
+            elif character in {"'", '"'}:
+                if not quote:
+                    ignore_matches = True
+                    backtrack_count = bracket_count
+                    bracket_count = 1
+                    start_quote = index + 1
+                    quote = character
+                elif character != quote and not alt_quote:
+                    start_alt_quote = index + 1
+                    alt_quote = character
+                elif character == quote:
+                    exit_quote = index + 1
+                elif alt_quote and character == alt_quote:
+                    exit_alt_quote = index + 1
+
+            index += 1
+
+            if bracket_count == 0:
+                if exit_quote >= 0 and quote == last:
+                    link_end = start_quote - 1
+                elif exit_alt_quote >= 0 and alt_quote == last:
+                    link_end = start_alt_quote - 1
+                else:
+                    link_end = index - 1
+                break
+
+            if character != " ":
+                last = character
+
+        if bracket_count != 0 and backtrack_count == 0:
+            # An opening parenthesis in the title resolved the brackets
+            # before any closing one, so there is no end of the link
+            if last_bracket == -1:
+                return start, start, start, False
+
+            link_end = last_bracket - 1
+            index = last_bracket
+            bracket_count = 0
+
+        return start_index, link_end, index, bracket_count == 0
+
+    def __add_reference_link(
+        self,
+        reference_id: str,
+        kind: LinkKind,
+        element_start: int,
+        element_end: int,
+    ) -> bool:
+        """Add the target of a reference if it is defined."""
+        reference_id = WHITESPACE_REGEX.sub(" ", reference_id.lower())
+        if (reference := self.references.get(reference_id)) is None:
+            return False
+
+        link, start, end = reference
+        if not CODE_TAGS.intersection(self.open_tags):
+            # The target is in the definition, which is already mapped to the markdown
+            self.link_spans.append(
+                LinkSpan(
+                    self.__decode_markdown_link(link),
+                    kind,
+                    start,
+                    end,
+                    *self.source_text.get_source_span(element_start, element_end),
+                ),
+            )
+        return True
+
+    def __add_markdown_link(
+        self,
+        text: str,
+        start: int,
+        end: int,
+        kind: LinkKind,
+        *,
+        element_start: int,
+        element_end: int,
+    ) -> None:
+        raw_link = text[start:end]
+        start += len(raw_link) - len(raw_link.lstrip())
+        end = max(end - len(raw_link) + len(raw_link.rstrip()), start)
+        self.__add_link(
+            self.__decode_markdown_link(raw_link),
+            kind,
+            start,
+            end,
+            element_start=element_start,
+            element_end=element_end,
+        )
+
+    def __decode_markdown_link(self, link: str) -> str:
+        link = self.__restore(link, is_html=False).strip()
+        if "&" in link:
+            link = ENTITY_REGEX.sub(lambda match: html.unescape(match.group()), link)
+
+        return link
@@ -0,0 +1,144 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import hashlib
+import json
+import logging
+from dataclasses import asdict, dataclass, field, is_dataclass
+from pathlib import Path
+from typing import Any
+
+from omegaconf import DictConfig, OmegaConf
+
+from mkslides.constants import OUTPUT_MANIFEST_FILENAME, VERSION
+
+logger = logging.getLogger(__name__)
+
+
+def hash_bytes(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def hash_text(content: str) -> str:
+    return hash_bytes(content.encode("utf-8"))
+
+
+def hash_file(path: Path) -> str:
+    with path.open("rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
+
+
+def hash_config(config: DictConfig | Any) -> str:
+    if OmegaConf.is_config(config):
+        container = OmegaConf.to_container(config, resolve=True)
+    elif is_dataclass(config) and not isinstance(config, type):
+        container = asdict(config)
+    else:
+        container = config
+    return hash_text(json.dumps(container, sort_keys=True, default=str))
+
+
+@dataclass
+class DeckManifestEntry:
+    source: str
+    source_hash: str
+    config_hash: str
+    template_hash: str
+    preprocess_script_hash: str | None
+    output_hash: str
+    links: list[str] = field(default_factory=list)
+    missing_links: list[str] = field(default_factory=list)
+    fingerprints: dict[str, str] = field(default_factory=dict)
+    images: dict[str, dict[str, int]] = field(default_factory=dict)
+
+    def matches(self, other: "DeckManifestEntry") -> bool:
+        """Check if both entries were generated from the same inputs."""
+        return (
+            self.source == other.source
+            and self.source_hash == other.source_hash
+            and self.config_hash == other.config_hash
+            and self.template_hash == other.template_hash
+            and self.preprocess_script_hash == other.preprocess_script_hash
+        )
+
+
+class BuildManifest:
+    """Record of the inputs and outputs of the previous build, used for incremental builds."""
+
+    def __init__(self, output_directory_path: Path) -> None:
+        self.path = output_directory_path / OUTPUT_MANIFEST_FILENAME
+        self.decks: dict[str, DeckManifestEntry] = {}
+        self.files: set[str] = set()
+        self.index_hash: str | None = None
+        # Hashes of the generated files other than the slideshows, like the index
+        self.output_hashes: dict[str, str] = {}
+        self.fingerprint = False
+        self.precompress = False
+
+    @classmethod
+    def load(cls, output_directory_path: Path) -> "BuildManifest":
+        manifest = cls(output_directory_path)
+
+        if not manifest.path.exists():
+            logger.debug(f"No build manifest found at '{manifest.path}'")
+            return manifest
+
+        try:
+            data = json.loads(manifest.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            logger.warning(
+                f"Build manifest '{manifest.path}' could not be read, doing a full build",
+            )
+            return manifest
+
+        if data.get("version") != VERSION:
+            logger.debug(
+                f"Build manifest was written by mkslides {data.get('version')}, doing a full build",
+            )
+            return manifest
+
+        manifest.decks = {
+            destination: DeckManifestEntry(**entry)
+            for destination, entry in data["decks"].items()
+        }
+        manifest.files = set(data["files"])
+        manifest.index_hash = data["index_hash"]
+        manifest.output_hashes = data.get("output_hashes", {})
+        manifest.fingerprint = data.get("fingerprint", False)
+        manifest.precompress = data.get("precompress", False)
+
+        logger.debug(
+            f"Loaded build manifest '{manifest.path}' with {len(manifest.decks)} slideshows",
+        )
+
+        return manifest
+
+    def copy(self) -> "BuildManifest":
+        manifest = BuildManifest(self.path.parent)
+        manifest.decks = dict(self.decks)
+        manifest.files = set(self.files)
+        manifest.index_hash = self.index_hash
+        manifest.output_hashes = dict(self.output_hashes)
+        manifest.fingerprint = self.fingerprint
+        manifest.precompress = self.precompress
+
+        return manifest
+
+    def save(self) -> None:
+        data = {
+            "version": VERSION,
+            "decks": {
+                destination: asdict(entry)
+                for destination, entry in sorted(self.decks.items())
+            },
+            "files": sorted(self.files),
+            "index_hash": self.index_hash,
+            "output_hashes": dict(sorted(self.output_hashes.items())),
+            "fingerprint": self.fingerprint,
+            "precompress": self.precompress,
+        }
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(data, indent=4), encoding="utf-8")
+        logger.debug(f"Saved build manifest '{self.path}'")
@@ -3,48 +3,118 @@
 # SPDX-License-Identifier: MIT
 
 import datetime
+import html
 import json
 import logging
-import re
+import posixpath
 import shutil
 import time
-from copy import deepcopy
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import replace
 from functools import partial
 from importlib import resources
+from importlib.resources.abc import Traversable
 from pathlib import Path
 from typing import Any
 
 import frontmatter  # type: ignore[import-untyped]
-import markdown
-from bs4 import BeautifulSoup, Comment
-from emoji import emojize
 from jinja2 import Template
 from omegaconf import DictConfig, OmegaConf
 
-from mkslides.config import FRONTMATTER_ALLOWED_KEYS
+from mkslides.assetmanifest import get_asset_manifest
+from mkslides.assetstrategy import (
+    AssetStrategy,
+    install_file,
+    install_tree,
+    remove_path,
+)
+from mkslides.config import SlideConfig, SlideConfigResolver
+from mkslides.copyengine import (
+    CopyStatistics,
+    copy_files,
+    format_size,
+    write_file,
+)
+from mkslides.fingerprint import get_fingerprinted_name, install_fingerprinted_copy
+from mkslides.imageoptimizer import (
+    PICTURE_IMAGE_KINDS,
+    ImageVariant,
+    get_image_optimizer,
+    get_picture_insertions,
+    get_variant_prefix,
+    is_optimizable_image,
+)
+from mkslides.linkscanner import (
+    HTML_LINK_KINDS,
+    LinkSpan,
+    find_link_spans,
+    replace_spans,
+)
+from mkslides.manifest import (
+    BuildManifest,
+    DeckManifestEntry,
+    hash_bytes,
+    hash_config,
+    hash_file,
+    hash_text,
+)
 from mkslides.mdfiletoprocess import MdFileToProcess
 from mkslides.navtree import NavTree
+from mkslides.outputstore import OutputStore
+from mkslides.pathfilter import PathFilter
+from mkslides.precompress import (
+    precompress_directory,
+    remove_compressed_files,
+    remove_precompressed_directory,
+)
 from mkslides.preprocess import load_preprocessing_function
+from mkslides.statcache import StatCache
+from mkslides.templates import (
+    get_default_index_template,
+    get_default_slideshow_template,
+    get_local_template,
+)
+from mkslides.tracing import Tracer
+from mkslides.transformationcache import (
+    TransformationCache,
+    TransformedMarkdown,
+    get_transformation_key,
+)
+from mkslides.treeshake import install_referenced_files
 from mkslides.urltype import URLType
 from mkslides.utils import get_url_type
 
 from .constants import (
-    DEFAULT_INDEX_TEMPLATE,
-    DEFAULT_SLIDESHOW_TEMPLATE,
-    HIGHLIGHTJS_THEMES_LIST,
     HIGHLIGHTJS_THEMES_RESOURCE,
-    HTML_BACKGROUND_IMAGE_REGEX,
-    HTML_RELATIVE_LINK_REGEX,
-    LOCAL_JINJA2_ENVIRONMENT,
     MD_EXTENSION_REGEX,
-    MD_RELATIVE_LINK_REGEX,
     OUTPUT_ASSETS_DIRNAME,
+    OUTPUT_ASSETS_VERSION_STAMP_FILENAME,
+    OUTPUT_FINGERPRINTS_FILENAME,
+    REVEALJS_PAGE_FILES,
     REVEALJS_RESOURCE,
-    REVEALJS_THEMES_LIST,
 )
 
 logger = logging.getLogger(__name__)
 
+# Copy of the markup generator in a worker process, see MarkupGenerator.jobs
+_worker_markup_generator: "MarkupGenerator | None" = None
+
+
+def _initialize_worker(markup_generator: "MarkupGenerator") -> None:
+    global _worker_markup_generator  # noqa: PLW0603
+    _worker_markup_generator = markup_generator
+
+
+def _run_worker_task(
+    method: Callable[..., Any],
+    *args: Any,
+) -> tuple[Any, list[dict[str, Any]]]:
+    """Run a method in a worker process and return its result with the recorded trace events."""
+    assert _worker_markup_generator, "Worker process is not initialized"
+    result = method(_worker_markup_generator, *args)
+    return result, _worker_markup_generator.tracer.pop_events()
+
 
 class MarkupGenerator:
     def __init__(
@@ -53,121 +123,1159 @@ class MarkupGenerator:
         md_root_path: Path,
         output_directory_path: Path,
         strict: bool,
+        *,
+        incremental: bool = False,
+        asset_strategy: AssetStrategy = AssetStrategy.COPY,
+        jobs: int = 1,
+        fingerprint: bool = False,
+        tree_shake_assets: bool = False,
+        precompress: bool = False,
+        checksum: bool = False,
+        stat_cache: StatCache | None = None,
+        output_store: OutputStore | None = None,
+        tracer: Tracer | None = None,
     ) -> None:
         self.global_config = global_config
+        self.tracer = tracer or Tracer(enabled=False)
         self.md_root_path = md_root_path.resolve(strict=True)
-        self.output_directory_path = output_directory_path.resolve(strict=False)
-        logger.info(
-            f"Output directory: '{self.output_directory_path.absolute()}'",
+        self.stat_cache = stat_cache or StatCache(
+            self.md_root_path,
+            PathFilter(
+                self.md_root_path,
+                global_config.exclude,
+                use_gitignore=global_config.gitignore,
+            ),
         )
+        self.slide_config_resolver = SlideConfigResolver(global_config)
+        self.output_directory_path = output_directory_path.resolve(strict=False)
+
+        # If set, the output is kept in memory instead of written to the output directory
+        self.output_store = output_store
+        if self.output_store is not None:
+            logger.info("Output directory: in memory")
+        else:
+            logger.info(
+                f"Output directory: '{self.output_directory_path.absolute()}'",
+            )
 
         self.output_assets_path = self.output_directory_path / OUTPUT_ASSETS_DIRNAME
         self.output_revealjs_path = self.output_assets_path / "reveal-js"
         self.output_highlightjs_themes_path = (
             self.output_assets_path / "highlight-js-themes"
         )
+        self.output_assets_version_stamp_path = (
+            self.output_assets_path / OUTPUT_ASSETS_VERSION_STAMP_FILENAME
+        )
 
         self.strict = strict
+        self.incremental = incremental
+
+        # Fingerprinted copies are added next to the files they are a copy of
+        self.fingerprint = fingerprint
+        if self.fingerprint and self.output_store is not None:
+            msg = "Fingerprinted copies cannot be added to an output kept in memory"
+            raise ValueError(msg)
+        if self.fingerprint and asset_strategy == AssetStrategy.SYMLINK:
+            logger.warning(
+                "Fingerprinted copies cannot be added to symlinked assets, copying the assets instead",
+            )
+            asset_strategy = AssetStrategy.COPY
+        self.asset_strategy = asset_strategy
+
+        # Only the bundled assets the slideshows reference are installed
+        self.tree_shake_assets = tree_shake_assets
+        if self.tree_shake_assets and self.output_store is not None:
+            msg = "Bundled assets are not installed for an output kept in memory"
+            raise ValueError(msg)
+        # Tree-shaken assets installed by the last build and the strategy used for them
+        self.installed_assets: set[str] = set()
+        self.installed_asset_strategy = self.asset_strategy
+
+        # Compressed copies are added next to the compressible outputs
+        self.precompress = precompress
+        if self.precompress and self.output_store is not None:
+            msg = "Compressed copies cannot be added to an output kept in memory"
+            raise ValueError(msg)
+
+        # Copied files are compared by content instead of size and modification time
+        self.checksum = checksum
+
+        # Links to images are replaced by links to optimized variants
+        self.image_optimizer = get_image_optimizer(global_config)
+
+        # Transformed markdown of the slideshows, kept across builds
+        self.transformation_cache = TransformationCache()
+
+        self.jobs = jobs
+        if self.output_store is not None and self.jobs > 1:
+            # Worker processes cannot write to the output store of this process
+            logger.debug("Output is kept in memory, processing slideshows in 1 job")
+            self.jobs = 1
+        self.executor: ProcessPoolExecutor | None = None
+
+        self.previous_manifest = BuildManifest(self.output_directory_path)
+        self.manifest = BuildManifest(self.output_directory_path)
+
+        # Fingerprinted copies of the bundled assets referenced by the default
+        # slideshow template and of the index theme and favicon, by output key
+        self.revealjs_fingerprints: dict[str, str] = {}
+        self.index_fingerprints: dict[str, str] = {}
+
+        # Files of the last build, to rebuild only what depends on changed files
+        self.md_files: list[MdFileToProcess] = []
+        self.non_md_files: set[Path] = set()
+
+        self.__reset_build_state()
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Exclude the executor, as it cannot be sent to the worker processes."""
+        state = self.__dict__.copy()
+        state["executor"] = None
+        return state
+
+    def __reset_build_state(self) -> None:
+        """Forget the changed outputs, file hashes and copied files of the last build."""
+        # Outputs written or removed by the last build, relative to the output directory
+        self.changed_outputs: set[str] = set()
+        self.file_hashes: dict[str, str] = {}
+        self.copy_statistics = CopyStatistics()
 
     def process_markdown(self) -> None:
         """Process the markdown files and generate HTML slideshows."""
         logger.debug("Processing markdown")
         start_time = time.perf_counter()
 
-        self.__create_or_clear_output_directory()
+        with self.tracer.span("process markdown", path=self.md_root_path):
+            if self.incremental:
+                self.previous_manifest = self.__load_manifest()
+            self.manifest = BuildManifest(self.output_directory_path)
+            self.manifest.fingerprint = self.fingerprint
+            self.manifest.precompress = self.precompress
+            self.__reset_build_state()
+
+            self.__prepare_output_directory()
+            if self.fingerprint:
+                self.__fingerprint_revealjs_page_files()
+
+            if self.jobs > 1:
+                logger.debug(
+                    f"Processing slideshows using {self.jobs} worker processes",
+                )
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.jobs,
+                    initializer=_initialize_worker,
+                    initargs=(self,),
+                )
+
+            try:
+                if self.md_root_path.is_file():
+                    assert self.md_root_path.suffix == ".md", (
+                        "md_root_path must be a markdown file"
+                    )
+                    self.__process_markdown_file()
+                else:
+                    self.__process_markdown_directory()
+            finally:
+                if self.executor:
+                    self.executor.shutdown(cancel_futures=True)
+                    self.executor = None
+
+            if self.fingerprint:
+                self.__save_fingerprints()
+
+            if self.incremental:
+                self.__remove_stale_outputs()
 
-        if self.md_root_path.is_file():
-            assert self.md_root_path.suffix == ".md", (
-                "md_root_path must be a markdown file"
+            if self.precompress:
+                self.__precompress_outputs()
+
+            if self.incremental:
+                self.__save_manifest()
+
+            self.transformation_cache.evict(
+                md_file_data.transformation_key
+                for md_file_data in self.md_files
+                if md_file_data.transformation_key
             )
-            self.__process_markdown_file()
-        else:
-            self.__process_markdown_directory()
 
+        self.__log_copy_statistics()
         end_time = time.perf_counter()
         logger.info(
             f"Finished processing markdown in {end_time - start_time:.2f} seconds",
         )
 
-    def __create_or_clear_output_directory(self) -> None:
-        """Clear or create the output directory and copy reveal.js."""
-        if self.output_directory_path.exists():
-            shutil.rmtree(self.output_directory_path)
-            logger.debug("Output directory already exists, deleted")
+    def process_changes(self, changed_paths: set[Path]) -> None:
+        """
+        Rebuild only the outputs that depend on the changed files.
+
+        Changed slideshows are rendered again, changed files copied again and
+        the index is regenerated when a title changes. Anything else, like
+        added or removed files or changed templates, results in a full
+        incremental build.
+        """
+        changes = self.__classify_changes(changed_paths)
+        if changes is None:
+            self.process_markdown()
+            return
+
+        start_time = time.perf_counter()
+        with self.tracer.span("process changes", paths=sorted(changed_paths)):
+            changed_md_files, changed_non_md_files = changes
+
+            self.previous_manifest = self.manifest
+            self.manifest = self.manifest.copy()
+            self.__reset_build_state()
+
+            for path in changed_non_md_files:
+                self.__copy(
+                    path,
+                    self.output_directory_path / path.relative_to(self.md_root_path),
+                )
+
+            md_files = [
+                self.load_md_file(
+                    md_file_data.source_path,
+                    md_file_data.destination_path,
+                )
+                for md_file_data in changed_md_files
+            ]
+            self.__install_bundled_assets(md_files)
+            for md_file_data in md_files:
+                if md_file_data.manifest_entry:
+                    self.manifest.decks[self.__get_manifest_key(md_file_data)] = (
+                        md_file_data.manifest_entry
+                    )
+
+            self.__optimize_images(md_files)
+            md_files = self.__handle_relative_links(md_files)
+            self.__render_slideshows(md_files)
+
+            indices = {
+                md_file_data.source_path: index
+                for index, md_file_data in enumerate(self.md_files)
+            }
+            is_index_outdated = False
+            for previous_md_file_data, md_file_data in zip(
+                changed_md_files,
+                md_files,
+                strict=True,
+            ):
+                self.md_files[indices[md_file_data.source_path]] = md_file_data
+                if (
+                    md_file_data.slide_config.slides.title
+                    != previous_md_file_data.slide_config.slides.title
+                ):
+                    is_index_outdated = True
+
+            if is_index_outdated and len(self.md_files) != 1:
+                self.__generate_index(self.md_files)
+
+            if self.fingerprint:
+                self.__save_fingerprints()
+
+            if self.precompress:
+                self.__precompress_outputs()
+
+            self.__save_manifest()
+
+        self.__log_copy_statistics()
+        end_time = time.perf_counter()
+        logger.info(
+            f"Rebuilt {len(md_files)} slideshows and copied {len(changed_non_md_files)} files in {(end_time - start_time) * 1000:.0f} ms",
+        )
+
+    def get_output_dependencies(self) -> dict[str, set[str]]:
+        """Get the outputs each slideshow of the last build depends on, like linked files and local themes."""
+        dependencies = {}
+        for md_file_data in self.md_files:
+            output_key = self.__get_output_key(md_file_data.destination_path)
+            slides = md_file_data.slide_config.slides
+
+            links = set(md_file_data.relative_links)
+            links.update(
+                url
+                for url in (slides.theme, slides.highlight_theme, slides.favicon)
+                if url and get_url_type(url) == URLType.RELATIVE
+            )
+
+            dependencies[output_key] = {
+                posixpath.normpath(
+                    posixpath.join(
+                        posixpath.dirname(output_key),
+                        MD_EXTENSION_REGEX.sub(".html", link),
+                    ),
+                )
+                for link in links
+            }
+
+        return dependencies
+
+    def __classify_changes(
+        self,
+        changed_paths: set[Path],
+    ) -> tuple[list[MdFileToProcess], list[Path]] | None:
+        """Split the changed paths in slideshows and other files, or return None if everything must be rebuilt."""
+        if not self.incremental or not self.md_files or self.md_root_path.is_file():
+            return None
+
+        md_files_by_source_path = {
+            md_file_data.source_path: md_file_data for md_file_data in self.md_files
+        }
+        dependency_paths = self.__get_dependency_paths()
+
+        changed_md_files: list[MdFileToProcess] = []
+        changed_non_md_files: list[Path] = []
+        for changed_path in sorted(changed_paths):
+            path = changed_path.resolve()
+            if path in md_files_by_source_path and self.stat_cache.is_file(path):
+                changed_md_files.append(md_files_by_source_path[path])
+            elif (
+                path in self.non_md_files
+                and path not in dependency_paths
+                and self.stat_cache.is_file(path)
+            ):
+                changed_non_md_files.append(path)
+            else:
+                logger.debug(
+                    f"Change of '{changed_path}' affects the whole build, rebuilding everything",
+                )
+                return None
+
+        return changed_md_files, changed_non_md_files
+
+    def __get_dependency_paths(self) -> set[Path]:
+        """Get the paths of the templates, preprocess scripts and .gitignore files used by the last build."""
+        template_configs = {
+            template_config
+            for md_file_data in self.md_files
+            if (template_config := md_file_data.slide_config.slides.template)
+        }
+        if index_template_config := self.global_config.index.template:
+            template_configs.add(index_template_config)
+
+        preprocess_scripts = {
+            preprocess_script
+            for md_file_data in self.md_files
+            if (preprocess_script := md_file_data.slide_config.slides.preprocess_script)
+        }
+
+        dependency_paths = {
+            Path(preprocess_script).resolve()
+            for preprocess_script in preprocess_scripts
+        }
+        for template_config in template_configs:
+            template = get_local_template(template_config)
+            if template.filename:
+                dependency_paths.add(Path(template.filename).resolve())
+
+        if path_filter := self.stat_cache.path_filter:
+            dependency_paths.update(
+                path for path in self.non_md_files if path_filter.is_gitignore(path)
+            )
+
+        # A changed image gets other names for its optimized variants
+        dependency_paths.update(
+            source_path
+            for md_file_data in self.md_files
+            for link in md_file_data.images
+            if (source_path := self.__get_image_source_path(md_file_data, link))
+        )
+
+        return dependency_paths
+
+    def __load_manifest(self) -> BuildManifest:
+        if self.output_store is not None:
+            return self.output_store.manifest or BuildManifest(
+                self.output_directory_path,
+            )
+
+        manifest = BuildManifest.load(self.output_directory_path)
+        if manifest.precompress and not self.precompress:
+            logger.debug(
+                "Previous build was done with compressed copies, removing them",
+            )
+            remove_precompressed_directory(self.output_directory_path)
+
+        if manifest.decks and manifest.fingerprint != self.fingerprint:
+            logger.debug(
+                "Previous build was done with different fingerprinting, doing a full build",
+            )
+            # Nothing is reused, but the outputs are kept so the ones that are
+            # no longer generated, like the fingerprinted copies, are removed
+            stale_manifest = BuildManifest(self.output_directory_path)
+            stale_manifest.files = set(manifest.decks) | manifest.files
+            return stale_manifest
+
+        return manifest
+
+    def __save_manifest(self) -> None:
+        if self.output_store is not None:
+            self.output_store.manifest = self.manifest
+        else:
+            self.manifest.save()
+
+    def __prepare_output_directory(self) -> None:
+        """Create or clear the output directory and install the bundled assets, unless they are up to date."""
+        are_assets_up_to_date = self.__are_assets_up_to_date()
+        self.__create_or_clear_output_directory(keep_assets=are_assets_up_to_date)
+        if are_assets_up_to_date:
+            logger.debug(
+                f"Assets in '{self.output_assets_path}' are up to date, skipping installation",
+            )
+            return
+
+        self.installed_asset_strategy = self.__install_assets()
+
+    def __create_or_clear_output_directory(self, *, keep_assets: bool) -> None:
+        """Clear or create the output directory, keeping the installed bundled assets if requested."""
+        if self.output_store is not None:
+            if not self.incremental:
+                self.output_store.clear()
+            return
+
+        if self.output_directory_path.exists() and not self.incremental:
+            for path in self.output_directory_path.iterdir():
+                if keep_assets and path == self.output_assets_path:
+                    continue
+                remove_path(path)
+            logger.debug("Output directory already exists, cleared")
 
         self.output_directory_path.mkdir(parents=True, exist_ok=True)
         logger.debug("Output directory created")
 
-        with resources.as_file(REVEALJS_RESOURCE) as revealjs_path:
-            self.__copy(revealjs_path, self.output_revealjs_path)
+    def __get_assets_version_stamp(self) -> dict[str, str | bool]:
+        """Get the version stamp of the bundled assets this build installs."""
+        asset_manifest = get_asset_manifest()
+        return {
+            "revealjs_version": asset_manifest.revealjs_version,
+            "highlightjs_themes_version": asset_manifest.highlightjs_themes_version,
+            "asset_strategy": self.asset_strategy.value,
+            "precompress": self.precompress,
+        }
+
+    def __are_assets_up_to_date(self) -> bool:
+        """Check if the bundled assets installed by a previous build can be kept."""
+        # Tree-shaken assets are installed again, as other themes may be used
+        return (
+            self.output_store is None
+            and not self.tree_shake_assets
+            and self.__read_assets_version_stamp() == self.__get_assets_version_stamp()
+        )
+
+    def __install_assets(self) -> AssetStrategy:
+        """Install reveal.js and the highlight.js themes and return the strategy they were installed with."""
+        if self.output_store is not None:
+            # The bundled assets are served from the package instead
+            with self.tracer.span("install assets"):
+                self.output_store.add_tree(
+                    self.__get_output_key(self.output_revealjs_path),
+                    REVEALJS_RESOURCE,
+                )
+                self.output_store.add_tree(
+                    self.__get_output_key(self.output_highlightjs_themes_path),
+                    HIGHLIGHTJS_THEMES_RESOURCE,
+                )
+            return self.asset_strategy
+
+        asset_strategy = self.asset_strategy
+        if asset_strategy == AssetStrategy.SYMLINK and not isinstance(
+            REVEALJS_RESOURCE,
+            Path,
+        ):
+            logger.warning(
+                "Bundled assets are not available on the filesystem and cannot be symlinked, copying them instead",
+            )
+            asset_strategy = AssetStrategy.COPY
+
+        if self.tree_shake_assets:
+            # The themes are installed when a slideshow uses them, see __install_asset
+            if self.output_assets_path.exists():
+                remove_path(self.output_assets_path)
+            self.installed_assets = set()
+            with self.tracer.span("install assets", strategy=asset_strategy.value):
+                for revealjs_file in REVEALJS_PAGE_FILES:
+                    self.__install_asset(
+                        self.output_revealjs_path / revealjs_file,
+                        asset_strategy,
+                    )
+            return asset_strategy
+
+        with (
+            self.tracer.span("install assets", strategy=asset_strategy.value),
+            resources.as_file(REVEALJS_RESOURCE) as revealjs_path,
+            resources.as_file(HIGHLIGHTJS_THEMES_RESOURCE) as highlightjs_themes_path,
+        ):
+            install_tree(revealjs_path, self.output_revealjs_path, asset_strategy)
+            install_tree(
+                highlightjs_themes_path,
+                self.output_highlightjs_themes_path,
+                asset_strategy,
+            )
+
+        self.output_assets_version_stamp_path.write_text(
+            json.dumps(self.__get_assets_version_stamp(), indent=4),
+            encoding="utf-8",
+        )
+        return asset_strategy
+
+    def __install_asset(
+        self,
+        output_path: Path,
+        asset_strategy: AssetStrategy | None = None,
+    ) -> None:
+        """
+        Install a file of the bundled assets with the files it references, if the assets are tree-shaken.
+
+        The file is installed with the given strategy, or the strategy the
+        other bundled assets of this build were installed with.
+        """
+        output_key = self.__get_output_key(output_path)
+        if not self.tree_shake_assets or output_key in self.installed_assets:
+            return
+
+        self.installed_assets.add(output_key)
+        if output_path.is_relative_to(self.output_revealjs_path):
+            resource = REVEALJS_RESOURCE
+            output_root_path = self.output_revealjs_path
+        else:
+            resource = HIGHLIGHTJS_THEMES_RESOURCE
+            output_root_path = self.output_highlightjs_themes_path
+
+        with resources.as_file(resource) as source_root_path:
+            install_referenced_files(
+                source_root_path,
+                output_root_path,
+                output_path.relative_to(output_root_path).as_posix(),
+                asset_strategy or self.installed_asset_strategy,
+            )
+
+    def __get_bundled_resource(self, output_path: Path) -> Traversable | None:
+        """Get the bundled file installed at an output path, or None if it is not below the installed assets."""
+        for output_root_path, resource in (
+            (self.output_revealjs_path, REVEALJS_RESOURCE),
+            (self.output_highlightjs_themes_path, HIGHLIGHTJS_THEMES_RESOURCE),
+        ):
+            if output_path.is_relative_to(output_root_path):
+                return resource.joinpath(
+                    output_path.relative_to(output_root_path).as_posix(),
+                )
+
+        return None
+
+    def __install_bundled_assets(self, md_files: list[MdFileToProcess]) -> None:
+        """Install the bundled themes the slideshows use, which are only installed if the assets are tree-shaken."""
+        for md_file_data in md_files:
+            for output_key in sorted(md_file_data.bundled_assets):
+                self.__install_asset(self.output_directory_path / output_key)
+
+    def __read_assets_version_stamp(self) -> dict[str, str | bool] | None:
+        """Read the version stamp of the assets installed by a previous build."""
+        try:
+            version_stamp = json.loads(
+                self.output_assets_version_stamp_path.read_text(encoding="utf-8"),
+            )
+        except (OSError, ValueError):
+            return None
+
+        if not (
+            self.output_revealjs_path.exists()
+            and self.output_highlightjs_themes_path.exists()
+        ):
+            return None
 
-        with resources.as_file(HIGHLIGHTJS_THEMES_RESOURCE) as highlightjs_themes_path:
-            self.__copy(highlightjs_themes_path, self.output_highlightjs_themes_path)
+        return version_stamp
 
     def scan_files(self) -> tuple[list[MdFileToProcess], list[Path]]:
         """Scan the markdown directory for markdown files and other files."""
-        md_files: list[MdFileToProcess] = []
+        md_source_paths: list[Path] = []
         non_md_files: list[Path] = []
 
-        for file in self.md_root_path.rglob("*"):
-            if file.is_file():
-                resolved_file = file.resolve(strict=True)
-                if resolved_file.suffix.lower() == ".md":
-                    destination_path = (
-                        self.output_directory_path
-                        / resolved_file.relative_to(self.md_root_path).with_suffix(
-                            ".html",
-                        )
-                    )
+        with self.tracer.span("scan", path=self.md_root_path):
+            for file in self.stat_cache.files():
+                if file.suffix.lower() == ".md":
+                    md_source_paths.append(file)
+                else:
+                    non_md_files.append(file)
 
-                    md_files.append(
-                        self.__create_md_file_to_process(
-                            resolved_file,
-                            destination_path,
-                        ),
-                    )
+            # Sorted so the output and error reporting do not depend on the walk order
+            md_source_paths.sort()
+            non_md_files.sort()
 
-                else:
-                    non_md_files.append(resolved_file)
+        destination_paths: list[Path] = []
+        for source_path in md_source_paths:
+            # A single markdown file is always rendered as the index page
+            if len(md_source_paths) == 1:
+                destination_path = self.output_directory_path / "index.html"
+            else:
+                relative_source_path = source_path.relative_to(self.md_root_path)
+                destination_path = (
+                    self.output_directory_path
+                    / relative_source_path.with_suffix(".html")
+                )
+            destination_paths.append(destination_path)
+
+        md_files = self.__map_decks(
+            MarkupGenerator.load_md_file,
+            md_source_paths,
+            destination_paths,
+        )
+        self.__install_bundled_assets(md_files)
 
         return md_files, non_md_files
 
-    def __create_md_file_to_process(
+    def __map_decks[T](
+        self,
+        method: Callable[..., T],
+        *iterables: Iterable[Any],
+    ) -> list[T]:
+        """Apply a per-slideshow method to all items, in the worker processes if multiple jobs are used."""
+        if self.executor is None:
+            return list(map(partial(method, self), *iterables))
+
+        items = [list(iterable) for iterable in iterables]
+        chunksize = max(1, len(items[0]) // (self.jobs * 4))
+
+        # map() yields the results in order and raises the first error in order,
+        # so the output and error reporting do not depend on the scheduling.
+        results = []
+        for result, events in self.executor.map(
+            partial(_run_worker_task, method),
+            *items,
+            chunksize=chunksize,
+        ):
+            results.append(result)
+            self.tracer.add_events(events)
+
+        return results
+
+    def load_md_file(
         self,
         source_path: Path,
         destination_path: Path,
     ) -> MdFileToProcess:
         """Create an MdFileToProcess instance from a markdown file."""
-        content = source_path.read_text(encoding="utf-8-sig")
-        frontmatter_metadata, markdown_content = frontmatter.parse(content)
+        with self.tracer.span("read", deck=source_path):
+            content = source_path.read_text(encoding="utf-8-sig")
+
+        transformation_key = get_transformation_key(content)
+        with self.tracer.span("read transformation cache", deck=source_path):
+            transformed_markdown = self.transformation_cache.get(transformation_key)
+
+        if transformed_markdown is None:
+            frontmatter_metadata, markdown_content = self.__parse_frontmatter(
+                source_path,
+                content,
+            )
+        else:
+            frontmatter_metadata = transformed_markdown.frontmatter_metadata
+            markdown_content = transformed_markdown.markdown_content
 
+        # The bundled themes are installed by the main process, as this runs in
+        # the worker processes if multiple jobs are used
+        bundled_assets: set[str] = set()
         slide_config = self.__generate_slide_config(
             source_path,
             destination_path,
             frontmatter_metadata,
+            bundled_assets,
         )
         assert slide_config
 
-        markdown_content = emojize(markdown_content, language="alias")
+        fingerprints: dict[str, str] = {}
+        if self.fingerprint:
+            slides = slide_config.slides
+            slides = replace(
+                slides,
+                theme=self.__fingerprint_url(
+                    slides.theme,
+                    destination_path,
+                    fingerprints,
+                ),
+                highlight_theme=self.__fingerprint_url(
+                    slides.highlight_theme,
+                    destination_path,
+                    fingerprints,
+                ),
+                favicon=slides.favicon
+                and self.__fingerprint_url(
+                    slides.favicon,
+                    destination_path,
+                    fingerprints,
+                ),
+            )
+            slide_config = replace(slide_config, slides=slides)
 
-        if preprocess_script := slide_config.slides.preprocess_script:
+        md_file_data = MdFileToProcess(
+            source_path=source_path,
+            destination_path=destination_path,
+            slide_config=slide_config,
+            markdown_content=markdown_content,
+            fingerprints=fingerprints,
+            bundled_assets=bundled_assets,
+            transformation_key=transformation_key,
+        )
+
+        if self.incremental:
+            manifest_entry = self.__create_manifest_entry(md_file_data, content)
+            md_file_data.manifest_entry = manifest_entry
+            if self.__is_up_to_date(md_file_data, manifest_entry):
+                md_file_data.is_up_to_date = True
+                logger.debug(f"Slideshow '{destination_path}' is up to date")
+                return md_file_data
+
+        preprocess_script = slide_config.slides.preprocess_script
+        preprocess_script_hash = (
+            self.__get_file_hash(Path(preprocess_script)) if preprocess_script else None
+        )
+        if transformed_markdown is not None:
+            if (
+                transformed_markdown.preprocess_script == preprocess_script
+                and transformed_markdown.preprocess_script_hash
+                == preprocess_script_hash
+            ):
+                logger.debug(f"Transformed markdown of '{source_path}' found in cache")
+                md_file_data.link_spans = list(transformed_markdown.link_spans)
+                md_file_data.relative_links = {
+                    link_span.link for link_span in md_file_data.link_spans
+                }
+                return md_file_data
+
+            # Transformed by another preprocess script, so transformed again
+            _, markdown_content = self.__parse_frontmatter(source_path, content)
+
+        md_file_data.markdown_content = self.__transform_markdown(
+            source_path,
+            markdown_content,
+            preprocess_script,
+        )
+        with self.tracer.span("find links", deck=source_path):
+            md_file_data.link_spans = self.__find_relative_link_spans(
+                md_file_data.markdown_content,
+            )
+        md_file_data.relative_links = {
+            link_span.link for link_span in md_file_data.link_spans
+        }
+
+        self.transformation_cache.put(
+            transformation_key,
+            TransformedMarkdown(
+                frontmatter_metadata=frontmatter_metadata,
+                markdown_content=md_file_data.markdown_content,
+                link_spans=tuple(md_file_data.link_spans),
+                preprocess_script=preprocess_script,
+                preprocess_script_hash=preprocess_script_hash,
+            ),
+        )
+
+        return md_file_data
+
+    def __parse_frontmatter(
+        self,
+        source_path: Path,
+        content: str,
+    ) -> tuple[dict[str, object], str]:
+        with self.tracer.span("parse frontmatter", deck=source_path):
+            return frontmatter.parse(content)
+
+    def __transform_markdown(
+        self,
+        source_path: Path,
+        markdown_content: str,
+        preprocess_script: str | None,
+    ) -> str:
+        """Replace the emoji aliases in the markdown and apply the preprocess script."""
+        with self.tracer.span("emojize", deck=source_path):
+            # Loading the emoji data is slow, and only needed for outdated slideshows
+            from emoji import emojize  # noqa: PLC0415
+
+            markdown_content = emojize(markdown_content, language="alias")
+
+        if preprocess_script:
             preprocess_function = load_preprocessing_function(preprocess_script)
             if not preprocess_function:
                 msg = (
                     f"Preprocessing function '{preprocess_script}' could not be loaded"
                 )
                 raise ImportError(msg)
-            markdown_content = preprocess_function(markdown_content)
+            with self.tracer.span(
+                "preprocess",
+                deck=source_path,
+                script=preprocess_script,
+            ):
+                markdown_content = preprocess_function(markdown_content)
             logger.debug(
                 f"Applied preprocessing function '{preprocess_script}' to markdown content of '{source_path}'",
             )
 
-        return MdFileToProcess(
-            source_path=source_path,
-            destination_path=destination_path,
-            slide_config=slide_config,
-            markdown_content=markdown_content,
+        return markdown_content
+
+    def __create_manifest_entry(
+        self,
+        md_file_data: MdFileToProcess,
+        content: str,
+    ) -> DeckManifestEntry:
+        """Create the build manifest entry with the inputs of a markdown file."""
+        slide_config = md_file_data.slide_config
+        template = self.__get_slideshow_template(slide_config)
+
+        preprocess_script_hash = None
+        if preprocess_script := slide_config.slides.preprocess_script:
+            preprocess_script_hash = self.__get_file_hash(Path(preprocess_script))
+
+        config_hash = hash_config(slide_config)
+        if self.image_optimizer is not None:
+            config_hash = hash_text(config_hash + self.image_optimizer.settings_hash)
+
+        manifest_entry = DeckManifestEntry(
+            source=self.__get_source_key(md_file_data),
+            source_hash=hash_text(content),
+            config_hash=config_hash,
+            template_hash=self.__get_template_hash(template),
+            preprocess_script_hash=preprocess_script_hash,
+            output_hash="",
+        )
+
+        return manifest_entry
+
+    def __is_up_to_date(
+        self,
+        md_file_data: MdFileToProcess,
+        manifest_entry: DeckManifestEntry,
+    ) -> bool:
+        """Check if the output of the previous build can be reused for this markdown file."""
+        previous_entry = self.previous_manifest.decks.get(
+            self.__get_manifest_key(md_file_data),
+        )
+        if previous_entry is None or not previous_entry.matches(manifest_entry):
+            return False
+
+        if self.__get_output_hash(md_file_data.destination_path) != (
+            previous_entry.output_hash
+        ):
+            return False
+
+        # Links are only checked for existence, so a removed or added target
+        # invalidates the output, e.g. a .md link is only rewritten if it exists
+        missing_links = set(previous_entry.missing_links)
+        if not all(
+            self.stat_cache.exists(md_file_data.source_path.parent / link)
+            == (link not in missing_links)
+            for link in previous_entry.links
+        ):
+            return False
+
+        # A changed file is referenced by another fingerprinted name
+        if not all(
+            self.__is_fingerprint_current(output_key, fingerprinted_output_key)
+            for output_key, fingerprinted_output_key in previous_entry.fingerprints.items()
+        ):
+            return False
+
+        # A changed image is linked by the other names of its optimized variants
+        if not all(
+            self.__is_image_current(md_file_data, link, urls)
+            for link, urls in previous_entry.images.items()
+        ):
+            return False
+
+        manifest_entry.output_hash = previous_entry.output_hash
+        manifest_entry.links = previous_entry.links
+        manifest_entry.missing_links = previous_entry.missing_links
+        manifest_entry.fingerprints = previous_entry.fingerprints
+        manifest_entry.images = previous_entry.images
+        md_file_data.relative_links = set(previous_entry.links)
+        md_file_data.missing_links = missing_links
+        md_file_data.fingerprints = dict(previous_entry.fingerprints)
+        md_file_data.images = dict(previous_entry.images)
+
+        return True
+
+    def __get_manifest_key(self, md_file_data: MdFileToProcess) -> str:
+        return self.__get_output_key(md_file_data.destination_path)
+
+    def __get_source_key(self, md_file_data: MdFileToProcess) -> str:
+        """Get the path of a markdown file relative to the input, so the manifest in the site dir does not reveal where the input is."""
+        root_path = (
+            self.md_root_path.parent
+            if self.md_root_path.is_file()
+            else self.md_root_path
+        )
+        return md_file_data.source_path.relative_to(root_path).as_posix()
+
+    def __get_output_key(self, destination_path: Path) -> str:
+        return destination_path.relative_to(self.output_directory_path).as_posix()
+
+    def __get_output_hash(self, destination_path: Path) -> str | None:
+        """Get the hash of an output of the previous build, or None if it does not exist."""
+        if self.output_store is not None:
+            return self.output_store.hash(self.__get_output_key(destination_path))
+
+        if not destination_path.exists():
+            return None
+
+        return hash_file(destination_path)
+
+    def __get_file_hash(self, path: Path) -> str:
+        key = str(path)
+        if key not in self.file_hashes:
+            self.file_hashes[key] = hash_file(path)
+
+        return self.file_hashes[key]
+
+    def __get_template_hash(self, template: Template) -> str:
+        assert template.filename, f"Template '{template.name}' has no filename"
+        return self.__get_file_hash(Path(template.filename))
+
+    def __get_fingerprinted_path(self, output_path: Path) -> Path | None:
+        """Get the fingerprinted path of an output file, or None if it is not a file of the bundled assets or copied from the markdown directory."""
+        if output_path.is_relative_to(self.output_assets_path):
+            # The bundled file is fingerprinted, as tree-shaken assets are only
+            # installed once the slideshows using them are loaded
+            resource = self.__get_bundled_resource(output_path)
+            if resource is None or not resource.is_file():
+                return None
+            with resources.as_file(resource) as source_path:
+                return self.__install_fingerprinted_copy(output_path, source_path)
+
+        if not self.md_root_path.is_dir():
+            return None
+
+        source_path = self.md_root_path / output_path.relative_to(
+            self.output_directory_path,
+        )
+        if not self.stat_cache.is_file(source_path):
+            return None
+
+        return self.__install_fingerprinted_copy(output_path, source_path)
+
+    def __install_fingerprinted_copy(
+        self,
+        output_path: Path,
+        source_path: Path,
+    ) -> Path:
+        """Install the fingerprinted copy of an output file with the given source and return its path."""
+        fingerprinted_name = get_fingerprinted_name(
+            output_path.name,
+            self.__get_file_hash(source_path),
+        )
+        fingerprinted_path = output_path.with_name(fingerprinted_name)
+        # The copy is not rewritten, so the relative `url()`s in a CSS file keep
+        # referencing the fonts and images next to it by their original names
+        install_fingerprinted_copy(source_path, fingerprinted_path)
+
+        return fingerprinted_path
+
+    def __fingerprint_url(
+        self,
+        url: str,
+        destination_path: Path,
+        fingerprints: dict[str, str],
+    ) -> str:
+        """Replace a relative URL in the given output file with the URL of its fingerprinted copy, and add it to the fingerprints."""
+        if get_url_type(url) != URLType.RELATIVE:
+            return url
+
+        output_path = Path(
+            posixpath.normpath((destination_path.parent / url).as_posix()),
+        )
+        if not output_path.is_relative_to(self.output_directory_path):
+            return url
+
+        fingerprinted_path = self.__get_fingerprinted_path(output_path)
+        if fingerprinted_path is None:
+            return url
+
+        fingerprints[self.__get_output_key(output_path)] = self.__get_output_key(
+            fingerprinted_path,
+        )
+        return url.removesuffix(output_path.name) + fingerprinted_path.name
+
+    def __is_fingerprint_current(
+        self,
+        output_key: str,
+        fingerprinted_output_key: str,
+    ) -> bool:
+        fingerprinted_path = self.__get_fingerprinted_path(
+            self.output_directory_path / output_key,
         )
+        return (
+            fingerprinted_path is not None
+            and self.__get_output_key(fingerprinted_path) == fingerprinted_output_key
+        )
+
+    def __fingerprint_revealjs_page_files(self) -> None:
+        """Fingerprint the bundled reveal.js files referenced by the default slideshow template."""
+        self.revealjs_fingerprints = {}
+        for revealjs_file in REVEALJS_PAGE_FILES:
+            output_path = self.output_revealjs_path / revealjs_file
+            fingerprinted_path = self.__get_fingerprinted_path(output_path)
+            assert fingerprinted_path, f"Bundled file '{output_path}' is not found"
+            self.revealjs_fingerprints[self.__get_output_key(output_path)] = (
+                self.__get_output_key(fingerprinted_path)
+            )
+
+    def __save_fingerprints(self) -> None:
+        """Write the mapping of the fingerprinted outputs to their fingerprinted copies."""
+        fingerprints = dict(self.revealjs_fingerprints)
+        for md_file_data in self.md_files:
+            fingerprints.update(md_file_data.fingerprints)
+        fingerprints.update(self.index_fingerprints)
+
+        self.manifest.files.update(fingerprints.values())
+        self.manifest.files.add(OUTPUT_FINGERPRINTS_FILENAME)
+        self.__create_or_overwrite_file(
+            self.output_directory_path / OUTPUT_FINGERPRINTS_FILENAME,
+            json.dumps(dict(sorted(fingerprints.items())), indent=4) + "\n",
+        )
+
+    def __precompress_outputs(self) -> None:
+        """Write the gzip and brotli compressed copies of the compressible outputs, for servers that serve precompressed files."""
+        with self.tracer.span("precompress", path=self.output_directory_path):
+            written_count = precompress_directory(self.output_directory_path)
+        logger.info(f"Wrote {written_count} compressed copies")
+
+    def __optimize_images(self, md_files: list[MdFileToProcess]) -> None:
+        """Optimize the images the outdated slideshows show, and record the variants that are offered in their place."""
+        if self.image_optimizer is None or self.md_root_path.is_file():
+            return
+
+        image_links = []
+        for md_file_data in md_files:
+            if md_file_data.is_up_to_date:
+                continue
+
+            picture_links = {
+                link_span.link
+                for link_span in md_file_data.link_spans
+                if link_span.kind in PICTURE_IMAGE_KINDS
+            }
+            links = {
+                link: source_path
+                for link in picture_links
+                if is_optimizable_image(link)
+                and (source_path := self.__get_image_source_path(md_file_data, link))
+            }
+            image_links.append((md_file_data, links))
+
+        source_paths = sorted(
+            {source_path for _, links in image_links for source_path in links.values()},
+        )
+        keys = [
+            self.image_optimizer.get_key(self.__get_file_hash(source_path))
+            for source_path in source_paths
+        ]
+        with (
+            self.tracer.span("optimize images", count=len(source_paths)),
+            ThreadPoolExecutor() as executor,
+        ):
+            results = list(
+                executor.map(self.__optimize_image, source_paths, keys),
+            )
+
+        # Names of the installed variants with their width, from the largest to the smallest
+        variant_names: dict[Path, dict[str, int]] = {}
+        for source_path, key, variants in zip(source_paths, keys, results, strict=True):
+            output_path = self.output_directory_path / source_path.relative_to(
+                self.md_root_path,
+            )
+            prefix = get_variant_prefix(output_path.name, key)
+            variant_names[source_path] = {}
+            for variant in variants:
+                variant_output_path = output_path.with_name(
+                    prefix + variant.path.name,
+                )
+                self.__install_image_variant(variant.path, variant_output_path)
+                variant_names[source_path][variant_output_path.name] = variant.width
+
+        for md_file_data, links in image_links:
+            md_file_data.images = {
+                link: {
+                    posixpath.join(posixpath.dirname(link), name): width
+                    for name, width in variant_names[source_path].items()
+                }
+                for link, source_path in links.items()
+                if variant_names[source_path]
+            }
+
+        for md_file_data in md_files:
+            for urls in md_file_data.images.values():
+                self.manifest.files.update(
+                    self.__get_output_key(
+                        self.__get_linked_output_path(md_file_data, url),
+                    )
+                    for url in urls
+                )
+
+    def __optimize_image(self, source_path: Path, key: str) -> list[ImageVariant]:
+        assert self.image_optimizer
+        try:
+            return self.image_optimizer.optimize(source_path, key)
+        except OSError as error:
+            # E.g. an image format Pillow cannot decode
+            logger.warning(
+                f"Image '{source_path}' could not be optimized, linking the original instead: {error}",
+            )
+            return []
+
+    def __get_image_source_path(
+        self,
+        md_file_data: MdFileToProcess,
+        link: str,
+    ) -> Path | None:
+        """Get the path of a linked image in the markdown directory, or None if it is not found there."""
+        source_path = Path(
+            posixpath.normpath((md_file_data.source_path.parent / link).as_posix()),
+        )
+        if source_path.is_relative_to(self.md_root_path) and self.stat_cache.is_file(
+            source_path,
+        ):
+            return source_path
+
+        return None
+
+    def __get_linked_output_path(
+        self,
+        md_file_data: MdFileToProcess,
+        url: str,
+    ) -> Path:
+        return Path(
+            posixpath.normpath((md_file_data.destination_path.parent / url).as_posix()),
+        )
+
+    def __is_image_current(
+        self,
+        md_file_data: MdFileToProcess,
+        link: str,
+        urls: dict[str, int],
+    ) -> bool:
+        """Check if the optimized variants of a linked image are named after its current content and are installed."""
+        source_path = self.__get_image_source_path(md_file_data, link)
+        if self.image_optimizer is None or source_path is None:
+            return False
+
+        prefix = get_variant_prefix(
+            source_path.name,
+            self.image_optimizer.get_key(self.__get_file_hash(source_path)),
+        )
+        return all(
+            posixpath.basename(url).startswith(prefix)
+            and self.__get_output_hash(
+                self.__get_linked_output_path(md_file_data, url),
+            )
+            is not None
+            for url in urls
+        )
+
+    def __install_image_variant(self, variant_path: Path, output_path: Path) -> None:
+        if self.output_store is not None:
+            self.output_store.add_file(self.__get_output_key(output_path), variant_path)
+        elif not output_path.exists():
+            # The variant names are content-addressed, an existing file is up to date
+            install_file(variant_path, output_path, AssetStrategy.COPY)
+        else:
+            return
+
+        self.changed_outputs.add(self.__get_output_key(output_path))
 
     def __process_markdown_file(self) -> None:
         """Process the detected markdown file."""
@@ -178,10 +1286,8 @@ class MarkupGenerator:
         )
 
         destination_path = self.output_directory_path / "index.html"
-        md_file_data = self.__create_md_file_to_process(
-            self.md_root_path,
-            destination_path,
-        )
+        md_file_data = self.load_md_file(self.md_root_path, destination_path)
+        self.__install_bundled_assets([md_file_data])
 
         self.__process_detected_markdown_files([md_file_data])
 
@@ -202,104 +1308,147 @@ class MarkupGenerator:
     ) -> None:
         """Process the detected markdown files and copy non-markdown files."""
         if non_md_files:
-            for file in non_md_files:
-                destination_path = self.output_directory_path / file.relative_to(
-                    self.md_root_path,
+            destination_paths = [
+                self.output_directory_path / file.relative_to(self.md_root_path)
+                for file in non_md_files
+            ]
+            self.__copy_files(list(zip(non_md_files, destination_paths, strict=True)))
+            self.manifest.files.update(
+                self.__get_output_key(destination_path)
+                for destination_path in destination_paths
+            )
+
+        for md_file_data in md_files:
+            if md_file_data.manifest_entry:
+                self.manifest.decks[self.__get_manifest_key(md_file_data)] = (
+                    md_file_data.manifest_entry
                 )
-                self.__copy(file, destination_path)
 
-        self.__handle_relative_links(md_files)
+        self.__optimize_images(md_files)
+        md_files = self.__handle_relative_links(md_files)
+        self.md_files = md_files
+        self.non_md_files = set(non_md_files or [])
 
-        templates = self.__load_templates(md_files)
+        self.__render_slideshows(md_files)
 
-        if len(md_files) == 1:
-            md_files[0].destination_path = self.output_directory_path / "index.html"
-        else:
+        if len(md_files) != 1:
             self.__generate_index(md_files)
 
-        self.__render_slideshows(md_files, templates)
+    def __render_slideshows(self, md_files: list[MdFileToProcess]) -> None:
+        """Render all outdated markdown files to HTML slideshows."""
+        outdated_md_files = [
+            md_file_data for md_file_data in md_files if not md_file_data.is_up_to_date
+        ]
+        output_hashes = self.__map_decks(
+            MarkupGenerator.render_slideshow,
+            outdated_md_files,
+        )
 
-    def __render_slideshows(
-        self,
-        md_files: list[MdFileToProcess],
-        templates: dict[str, Template],
-    ) -> None:
-        """Render all markdown files to HTML slideshows."""
-        for md_file_data in md_files:
-            slide_config = md_file_data.slide_config
+        for md_file_data, output_hash in zip(
+            outdated_md_files,
+            output_hashes,
+            strict=True,
+        ):
+            if manifest_entry := md_file_data.manifest_entry:
+                manifest_entry.output_hash = output_hash
+                manifest_entry.links = sorted(md_file_data.relative_links)
+                manifest_entry.missing_links = sorted(md_file_data.missing_links)
+                manifest_entry.fingerprints = dict(
+                    sorted(md_file_data.fingerprints.items()),
+                )
+                manifest_entry.images = dict(sorted(md_file_data.images.items()))
 
-            slideshow_template = None
-            if template_config := slide_config.slides.template:
-                slideshow_template = templates[template_config]
-            else:
-                slideshow_template = DEFAULT_SLIDESHOW_TEMPLATE
+    def render_slideshow(self, md_file_data: MdFileToProcess) -> str:
+        """Render a markdown file to an HTML slideshow and return the hash of the output."""
+        slide_config = md_file_data.slide_config
+        slideshow_template = self.__get_slideshow_template(slide_config)
 
-            revealjs_path = self.output_revealjs_path.relative_to(
-                md_file_data.destination_path.parent,
-                walk_up=True,
+        revealjs_path = self.output_revealjs_path.relative_to(
+            md_file_data.destination_path.parent,
+            walk_up=True,
+        )
+
+        # URLs of the reveal.js files referenced by the default template
+        revealjs_urls = {}
+        for revealjs_file in REVEALJS_PAGE_FILES:
+            output_key = self.__get_output_key(
+                self.output_revealjs_path / revealjs_file,
+            )
+            output_key = self.revealjs_fingerprints.get(output_key, output_key)
+            revealjs_urls[revealjs_file] = str(
+                (self.output_directory_path / output_key).relative_to(
+                    md_file_data.destination_path.parent,
+                    walk_up=True,
+                ),
             )
 
-            # https://revealjs.com/markdown/#external-markdown
-            markdown_data_options = {
-                key: value
-                for key, value in {
-                    "data-separator": slide_config.slides.separator,
-                    "data-separator-vertical": slide_config.slides.separator_vertical,
-                    "data-separator-notes": slide_config.slides.separator_notes,
-                    "data-charset": slide_config.slides.charset,
-                }.items()
-                if value
-            }
+        # https://revealjs.com/markdown/#external-markdown
+        markdown_data_options = {
+            key: value
+            for key, value in {
+                "data-separator": slide_config.slides.separator,
+                "data-separator-vertical": slide_config.slides.separator_vertical,
+                "data-separator-notes": slide_config.slides.separator_notes,
+                "data-charset": slide_config.slides.charset,
+            }.items()
+            if value
+        }
 
+        # The slides are rendered by the reveal.js markdown plugin in the browser,
+        # unless they are pre-rendered here
+        rendered_slides = None
+        if slide_config.slides.prerender:
+            with self.tracer.span("prerender", deck=md_file_data.source_path):
+                from mkslides.prerender import prerender_slides  # noqa: PLC0415
+
+                rendered_slides = prerender_slides(
+                    md_file_data.markdown_content,
+                    separator=slide_config.slides.separator,
+                    separator_vertical=slide_config.slides.separator_vertical,
+                    separator_notes=slide_config.slides.separator_notes,
+                )
+
+        with self.tracer.span("render", deck=md_file_data.source_path):
             markup = slideshow_template.render(
                 favicon=slide_config.slides.favicon,
                 theme=slide_config.slides.theme,
                 highlight_theme=slide_config.slides.highlight_theme,
                 revealjs_path=revealjs_path,
+                revealjs_urls=revealjs_urls,
                 markdown_data_options=markdown_data_options,
                 markdown=md_file_data.markdown_content,
-                revealjs_config=OmegaConf.to_container(slide_config.revealjs),
+                rendered_slides=rendered_slides,
+                revealjs_config=slide_config.revealjs,
                 plugins=slide_config.plugins,
             )
 
-            self.__create_or_overwrite_file(
-                md_file_data.destination_path,
-                markup,
-            )
-
-    def __load_templates(
-        self,
-        md_files: list[MdFileToProcess],
-    ) -> dict[str, Template]:
-        """Load Jinja2 templates from the markdown files."""
-        templates: dict[str, Template] = {}
+        return self.__create_or_overwrite_file(
+            md_file_data.destination_path,
+            markup,
+        )
 
-        for md_file_data in md_files:
-            template = md_file_data.slide_config.slides.template
-            if template and template not in templates:
-                templates[template] = LOCAL_JINJA2_ENVIRONMENT.get_template(template)
-                logger.debug(f"Loaded custom template '{template}'")
+    def __get_slideshow_template(self, slide_config: SlideConfig) -> Template:
+        """Get the Jinja2 template to render a slideshow with."""
+        if template_config := slide_config.slides.template:
+            # The environment caches the template and reloads it when it changes
+            return get_local_template(template_config)
 
-        return templates
+        return get_default_slideshow_template()
 
     def __generate_theme_url(
         self,
         destination_path: Path,
-        slide_config: DictConfig,
+        slide_config: SlideConfig,
         frontmatter_metadata: dict[str, object],
-    ) -> str | None:
-        """Generate the reveal.js theme URL."""
+        bundled_assets: set[str],
+    ) -> str:
+        """Generate the reveal.js theme URL, and add a bundled theme to the bundled assets."""
         theme = slide_config.slides.theme
 
-        if theme is None:
-            return None
-
-        if theme in REVEALJS_THEMES_LIST:
-            return str(
-                (
-                    self.output_revealjs_path / "dist" / "theme" / f"{theme}.css"
-                ).relative_to(destination_path.parent, walk_up=True),
-            )
+        if theme in get_asset_manifest().revealjs_themes:
+            theme_path = self.output_revealjs_path / "dist" / "theme" / f"{theme}.css"
+            bundled_assets.add(self.__get_output_key(theme_path))
+            return str(theme_path.relative_to(destination_path.parent, walk_up=True))
 
         if get_url_type(theme) != URLType.RELATIVE or (
             "slides" in frontmatter_metadata
@@ -318,20 +1467,23 @@ class MarkupGenerator:
     def __generate_highlight_theme_url(
         self,
         destination_path: Path,
-        slide_config: DictConfig,
+        slide_config: SlideConfig,
         frontmatter_metadata: dict[str, object],
-    ) -> str | None:
-        """Generate the highlight.js theme URL."""
+        bundled_assets: set[str],
+    ) -> str:
+        """Generate the highlight.js theme URL, and add a bundled theme to the bundled assets."""
         highlight_theme = slide_config.slides.highlight_theme
 
-        if highlight_theme is None:
-            return None
-
-        if highlight_theme in HIGHLIGHTJS_THEMES_LIST:
+        if highlight_theme in get_asset_manifest().highlightjs_themes:
+            highlight_theme_path = (
+                self.output_highlightjs_themes_path / f"{highlight_theme}.css"
+            )
+            bundled_assets.add(self.__get_output_key(highlight_theme_path))
             return str(
-                (
-                    self.output_highlightjs_themes_path / f"{highlight_theme}.css"
-                ).relative_to(destination_path.parent, walk_up=True),
+                highlight_theme_path.relative_to(
+                    destination_path.parent,
+                    walk_up=True,
+                ),
             )
 
         if get_url_type(highlight_theme) != URLType.RELATIVE or (
@@ -351,7 +1503,7 @@ class MarkupGenerator:
     def __generate_favicon_url(
         self,
         destination_path: Path,
-        slide_config: DictConfig,
+        slide_config: SlideConfig,
         frontmatter_metadata: dict[str, object],
     ) -> str | None:
         favicon = slide_config.slides.favicon
@@ -376,13 +1528,13 @@ class MarkupGenerator:
     def __generate_preprocess_script_absolute_path(
         self,
         source_path: Path,
-        slide_config: DictConfig,
+        slide_config: SlideConfig,
         frontmatter_metadata: dict[str, object],
     ) -> str | None:
         """Generate the absolute path for the preprocess script if it is a relative URL."""
         preprocess_script = slide_config.slides.preprocess_script
 
-        if slide_config.slides.preprocess_script is None:
+        if preprocess_script is None:
             return None
 
         if get_url_type(preprocess_script) != URLType.RELATIVE:
@@ -408,182 +1560,368 @@ class MarkupGenerator:
         source_path: Path,
         destination_path: Path,
         frontmatter_metadata: dict[str, object],
-    ) -> DictConfig:
-        """Generate the slide configuration by merging the metadata retrieved from the frontmatter of the markdown and the global configuration."""
-        slide_config: DictConfig = deepcopy(self.global_config)
-
-        if frontmatter_metadata:
-            for key in FRONTMATTER_ALLOWED_KEYS:
-                if key in frontmatter_metadata:
-                    OmegaConf.update(slide_config, key, frontmatter_metadata[key])
-
-        slide_config.slides.theme = self.__generate_theme_url(
-            destination_path,
-            slide_config,
-            frontmatter_metadata,
-        )
-
-        slide_config.slides.highlight_theme = self.__generate_highlight_theme_url(
-            destination_path,
-            slide_config,
-            frontmatter_metadata,
-        )
-
-        slide_config.slides.favicon = self.__generate_favicon_url(
-            destination_path,
-            slide_config,
-            frontmatter_metadata,
-        )
-
-        slide_config.slides.preprocess_script = (
-            self.__generate_preprocess_script_absolute_path(
+        bundled_assets: set[str],
+    ) -> SlideConfig:
+        """Generate the slide configuration by applying the metadata retrieved from the frontmatter of the markdown to the global configuration."""
+        slide_config = self.slide_config_resolver.resolve(frontmatter_metadata)
+
+        slides = replace(
+            slide_config.slides,
+            theme=self.__generate_theme_url(
+                destination_path,
+                slide_config,
+                frontmatter_metadata,
+                bundled_assets,
+            ),
+            highlight_theme=self.__generate_highlight_theme_url(
+                destination_path,
+                slide_config,
+                frontmatter_metadata,
+                bundled_assets,
+            ),
+            favicon=self.__generate_favicon_url(
+                destination_path,
+                slide_config,
+                frontmatter_metadata,
+            ),
+            preprocess_script=self.__generate_preprocess_script_absolute_path(
                 source_path,
                 slide_config,
                 frontmatter_metadata,
-            )
+            ),
         )
 
-        return slide_config
+        return replace(slide_config, slides=slides)
 
     def __generate_index(self, md_files: list[MdFileToProcess]) -> None:
         """Generate an index.html file in the output directory."""
-        logger.debug("Generating index")
-
-        navtree = NavTree(self.md_root_path, self.output_directory_path)
-        if self.global_config.index.nav:
-            nav_from_config = OmegaConf.to_container(self.global_config.index.nav)
-            assert isinstance(nav_from_config, list), "nav must be a list"
-            logger.debug("Generating navigation tree from config")
-            navtree.from_config_json(nav_from_config)
-            navtree.validate_with_md_files(md_files, strict=self.strict)
-        else:
-            logger.debug("Generating navigation tree from markdown files")
-            navtree.from_md_files(md_files)
+        with self.tracer.span("generate index", deck_count=len(md_files)):
+            logger.debug("Generating index")
+
+            navtree = NavTree(self.md_root_path, self.output_directory_path)
+            if self.global_config.index.nav:
+                nav_from_config = OmegaConf.to_container(self.global_config.index.nav)
+                assert isinstance(nav_from_config, list), "nav must be a list"
+                logger.debug("Generating navigation tree from config")
+                navtree.from_config_json(nav_from_config)
+                navtree.validate_with_md_files(md_files, strict=self.strict)
+            else:
+                logger.debug("Generating navigation tree from markdown files")
+                navtree.from_md_files(md_files)
 
-        logger.debug(
-            f"Generated navigation tree with input root path {navtree.input_root_path.absolute()} and output root path {navtree.output_root_path.absolute()}",
-        )
+            logger.debug(
+                f"Generated navigation tree with input root path {navtree.input_root_path.absolute()} and output root path {navtree.output_root_path.absolute()}",
+            )
 
-        if logger.isEnabledFor(logging.DEBUG):
-            navtree_json = json.dumps(json.loads(navtree.to_json()), indent=4)
-            logger.debug(f"Navigation tree:\n\n{navtree_json}\n")
+            if logger.isEnabledFor(logging.DEBUG):
+                navtree_json = json.dumps(json.loads(navtree.to_json()), indent=4)
+                logger.debug(f"Navigation tree:\n\n{navtree_json}\n")
 
-        # Refresh the templates here, so they have effect when live reloading
-        index_template = None
-        if template_config := self.global_config.index.template:
-            index_template = LOCAL_JINJA2_ENVIRONMENT.get_template(template_config)
-        else:
-            index_template = DEFAULT_INDEX_TEMPLATE
+            # Refresh the templates here, so they have effect when live reloading
+            index_template = None
+            if template_config := self.global_config.index.template:
+                index_template = get_local_template(template_config)
+            else:
+                index_template = get_default_index_template()
+
+            index_path = self.output_directory_path / "index.html"
+
+            favicon = self.global_config.index.favicon
+            theme = self.global_config.index.theme
+            self.index_fingerprints = {}
+            if self.fingerprint:
+                if favicon:
+                    favicon = self.__fingerprint_url(
+                        favicon,
+                        index_path,
+                        self.index_fingerprints,
+                    )
+                if theme:
+                    theme = self.__fingerprint_url(
+                        theme,
+                        index_path,
+                        self.index_fingerprints,
+                    )
 
-        content = index_template.render(
-            favicon=self.global_config.index.favicon,
-            title=self.global_config.index.title,
-            theme=self.global_config.index.theme,
-            navtree=navtree,
-            build_datetime=datetime.datetime.now(tz=datetime.UTC),
-            enable_footer=self.global_config.index.enable_footer,
-        )
-        self.__create_or_overwrite_file(
-            self.output_directory_path / "index.html",
-            content,
+            if self.incremental:
+                self.manifest.index_hash = hash_text(
+                    navtree.to_json()
+                    + hash_config(self.global_config.index)
+                    + hash_config(self.index_fingerprints)
+                    + self.__get_template_hash(index_template),
+                )
+                if (
+                    self.manifest.index_hash == self.previous_manifest.index_hash
+                    and self.__get_output_hash(index_path) is not None
+                ):
+                    logger.debug("Navigation tree is unchanged, index is up to date")
+                    if index_hash := self.previous_manifest.output_hashes.get(
+                        "index.html",
+                    ):
+                        self.manifest.output_hashes["index.html"] = index_hash
+                    return
+
+            content = index_template.render(
+                favicon=favicon,
+                title=self.global_config.index.title,
+                theme=theme,
+                navtree=navtree,
+                build_datetime=datetime.datetime.now(tz=datetime.UTC),
+                enable_footer=self.global_config.index.enable_footer,
+            )
+            self.__create_or_overwrite_file(index_path, content)
+
+    def __remove_stale_outputs(self) -> None:
+        """Remove outputs of the previous build whose sources no longer exist."""
+        current_outputs = set(self.manifest.decks) | self.manifest.files
+        if self.manifest.index_hash is not None:
+            current_outputs.add("index.html")
+
+        previous_outputs = (
+            set(self.previous_manifest.decks) | self.previous_manifest.files
         )
 
-    def __create_or_overwrite_file(self, destination_path: Path, content: Any) -> None:
-        """Create or overwrite a file with the given content."""
-        is_overwrite = destination_path.exists()
+        for relative_path in sorted(previous_outputs - current_outputs):
+            self.changed_outputs.add(relative_path)
+            if self.output_store is not None:
+                self.output_store.remove(relative_path)
+                logger.debug(f"Removed stale output '{relative_path}'")
+                continue
+
+            stale_path = self.output_directory_path / relative_path
+            if not stale_path.is_file():
+                continue
+
+            stale_path.unlink()
+            remove_compressed_files(stale_path)
+            logger.debug(f"Removed stale file '{stale_path}'")
+
+            # Clean up directories that became empty
+            parent_path = stale_path.parent
+            while parent_path != self.output_directory_path and not any(
+                parent_path.iterdir(),
+            ):
+                parent_path.rmdir()
+                logger.debug(f"Removed empty directory '{parent_path}'")
+                parent_path = parent_path.parent
+
+    def __create_or_overwrite_file(self, destination_path: Path, content: str) -> str:
+        """
+        Create or overwrite a file with the given content and return the hash of the content.
+
+        A file that is identical to the one of the previous build is left
+        untouched, so its modification time is kept. The hash of the previous
+        content is taken from the build manifest instead of reading the file.
+        """
+        with self.tracer.span("write", path=destination_path):
+            relative_path = self.__get_output_key(destination_path)
+            encoded_content = content.encode("utf-8")
+            content_hash = hash_bytes(encoded_content)
+            if relative_path not in self.manifest.decks:
+                self.manifest.output_hashes[relative_path] = content_hash
+
+            if self.__is_output_unchanged(relative_path, encoded_content, content_hash):
+                logger.debug(f"File '{destination_path}' is unchanged, not overwritten")
+                return content_hash
+
+            self.changed_outputs.add(relative_path)
+            if self.output_store is not None:
+                self.output_store.write(relative_path, encoded_content)
+                logger.debug(f"Stored file '{destination_path}' in memory")
+                return content_hash
+
+            is_overwrite = destination_path.exists()
+            write_file(destination_path, encoded_content)
+
+            action = "Overwritten" if is_overwrite else "Created"
+            logger.debug(f"{action} file '{destination_path}'")
+            return content_hash
+
+    def __is_output_unchanged(
+        self,
+        relative_path: str,
+        content: bytes,
+        content_hash: str,
+    ) -> bool:
+        """Check if the previous build generated the same content, and the file is still there."""
+        if previous_entry := self.previous_manifest.decks.get(relative_path):
+            previous_hash: str | None = previous_entry.output_hash
+        else:
+            previous_hash = self.previous_manifest.output_hashes.get(relative_path)
+        if previous_hash != content_hash:
+            return False
 
-        destination_path.parent.mkdir(parents=True, exist_ok=True)
-        destination_path.write_text(content, encoding="utf-8")
+        if self.output_store is not None:
+            return self.output_store.exists(relative_path)
 
-        action = "Overwritten" if is_overwrite else "Created"
-        logger.debug(f"{action} file '{destination_path}'")
+        try:
+            return (self.output_directory_path / relative_path).stat().st_size == len(
+                content,
+            )
+        except OSError:
+            return False
 
     def __copy(self, source_path: Path, destination_path: Path) -> None:
         """Copy a file or directory from the source path to the destination path."""
-        is_overwrite = destination_path.exists()
-        is_directory = source_path.is_dir()
+        is_directory = self.stat_cache.is_dir(source_path)
+        if self.output_store is None and not is_directory:
+            self.__copy_files([(source_path, destination_path)])
+            return
+
+        with self.tracer.span("copy", path=source_path):
+            relative_path = self.__get_output_key(destination_path)
+            self.changed_outputs.add(relative_path)
+
+            if self.output_store is not None:
+                if is_directory:
+                    self.output_store.add_tree(relative_path, source_path)
+                else:
+                    self.output_store.add_file(relative_path, source_path)
+                logger.debug(
+                    f"Added '{source_path.absolute()}' to the output in memory",
+                )
+                return
 
-        destination_path.parent.mkdir(parents=True, exist_ok=True)
+            is_overwrite = destination_path.exists()
 
-        if is_directory:
+            destination_path.parent.mkdir(parents=True, exist_ok=True)
             shutil.copytree(source_path, destination_path, dirs_exist_ok=True)
-        else:
-            shutil.copy(source_path, destination_path)
 
-        action = "Overwritten" if is_overwrite else "Copied"
-        file_or_directory = "directory" if is_directory else "file"
-        logger.debug(
-            f"{action} {file_or_directory} '{source_path.absolute()}' to '{destination_path.absolute()}'",
+            action = "Overwritten" if is_overwrite else "Copied"
+            logger.debug(
+                f"{action} directory '{source_path.absolute()}' to '{destination_path.absolute()}'",
+            )
+
+    def __copy_files(self, files: list[tuple[Path, Path]]) -> None:
+        """Copy files from their source to their destination path, skipping those that are already copied."""
+        if self.output_store is not None:
+            for source_path, destination_path in files:
+                self.__copy(source_path, destination_path)
+            return
+
+        with self.tracer.span("copy", count=len(files)):
+            copied_paths, statistics = copy_files(files, checksum=self.checksum)
+
+        self.changed_outputs.update(
+            self.__get_output_key(destination_path) for destination_path in copied_paths
         )
+        self.copy_statistics.update(statistics)
+
+    def __log_copy_statistics(self) -> None:
+        statistics = self.copy_statistics
+        if statistics.copied_files or statistics.skipped_files:
+            logger.info(
+                f"Copied {statistics.copied_files} files ({format_size(statistics.copied_bytes)}), skipped {statistics.skipped_files} unchanged files ({format_size(statistics.skipped_bytes)})",
+            )
 
     def __handle_relative_links(
         self,
-        md_file_data: list[MdFileToProcess],
-    ) -> None:
+        md_files: list[MdFileToProcess],
+    ) -> list[MdFileToProcess]:
         """Check if all relative link targets are present and normalize .md links."""
-        for md_file in md_file_data:
-            content = md_file.markdown_content
+        outdated_indices = [
+            index
+            for index, md_file_data in enumerate(md_files)
+            if not md_file_data.is_up_to_date
+        ]
+        results = self.__map_decks(
+            MarkupGenerator.check_relative_links,
+            [md_files[index] for index in outdated_indices],
+        )
 
-            for link in self.__find_all_relative_links(content):
-                link_path = md_file.source_path.parent / link
-                relative_source_path = md_file.source_path.relative_to(
-                    self.md_root_path,
-                )
+        # Warnings are logged here so they are reported in a deterministic order
+        md_files = md_files.copy()
+        for index, (md_file_data, warnings) in zip(
+            outdated_indices,
+            results,
+            strict=True,
+        ):
+            for warning in warnings:
+                logger.warning(warning)
+            md_files[index] = md_file_data
+
+        return md_files
+
+    def check_relative_links(
+        self,
+        md_file_data: MdFileToProcess,
+    ) -> tuple[MdFileToProcess, list[str]]:
+        """Check if all relative link targets of a markdown file are present and normalize its .md links."""
+        content = md_file_data.markdown_content
+        relative_source_path = md_file_data.source_path.relative_to(
+            self.md_root_path,
+        )
 
-                if not link_path.exists():
+        warnings = []
+        link_replacements = {}
+        with self.tracer.span("check links", deck=md_file_data.source_path):
+            for link in sorted(md_file_data.relative_links):
+                link_path = md_file_data.source_path.parent / link
+
+                if not self.stat_cache.exists(link_path):
+                    md_file_data.missing_links.add(link)
                     msg = f"File '{relative_source_path}' contains a link '{link}', but the target is not found among slide files."
                     if self.strict:
                         raise FileNotFoundError(msg)
-                    logger.warning(msg)
+                    warnings.append(msg)
                 elif link.lower().endswith(".md"):
-                    content = self.__replace_md_link_target(content, link)
-
-            md_file.markdown_content = content
-
-    def __find_all_relative_links(self, markdown_content: str) -> set[str]:
-        """Find all relative links in the given markdown content."""
-        html_content = markdown.markdown(markdown_content, extensions=["extra"])
-        soup = BeautifulSoup(html_content, "html.parser")
-
-        found_links = set()
-
-        for link in soup.find_all("a", href=True):
-            if not link.find_parents(["code", "pre"]):
-                found_links.add(link["href"])
-
-        for link in soup.find_all("img", src=True):
-            if not link.find_parents(["code", "pre"]):
-                found_links.add(link["src"])
-
-        for link in soup.find_all("source", src=True):
-            if not link.find_parents(["code", "pre"]):
-                found_links.add(link["src"])
-
-        for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
-            if match := HTML_BACKGROUND_IMAGE_REGEX.search(comment):
-                found_links.add(match.group("location"))
-
-        relative_links = {
-            link for link in found_links if get_url_type(link) == URLType.RELATIVE
-        }
-
-        return relative_links
+                    link_replacements[link] = MD_EXTENSION_REGEX.sub(".html", link)
+                elif self.fingerprint:
+                    fingerprinted_link = self.__fingerprint_url(
+                        link,
+                        md_file_data.destination_path,
+                        md_file_data.fingerprints,
+                    )
+                    if fingerprinted_link != link:
+                        link_replacements[link] = fingerprinted_link
 
-    def __replace_md_link_target(self, content: str, link: str) -> str:
-        """Replace a specific .md link target with .html in markdown and HTML links."""
+        # Images with optimized variants keep the original as the fallback
+        picture_insertions = get_picture_insertions(
+            content,
+            md_file_data.link_spans,
+            md_file_data.images,
+        )
 
-        def _replacer(match: re.Match, *, link: str) -> str:
-            matched_location = match.group("location")
+        if link_replacements or picture_insertions:
+            with self.tracer.span("rewrite links", deck=md_file_data.source_path):
+                content = replace_spans(
+                    content,
+                    [
+                        *self.__get_link_replacements(
+                            md_file_data.link_spans,
+                            link_replacements,
+                        ),
+                        *picture_insertions,
+                    ],
+                )
 
-            # Only touch matches that correspond exactly to this link
-            if matched_location != link:
-                return match.group(0)
+        md_file_data.markdown_content = content
 
-            new_location = MD_EXTENSION_REGEX.sub(".html", matched_location)
-            return match.group(0).replace(matched_location, new_location)
+        return md_file_data, warnings
 
-        for regex in (MD_RELATIVE_LINK_REGEX, HTML_RELATIVE_LINK_REGEX):
-            bound_replacer = partial(_replacer, link=link)
-            content = regex.sub(bound_replacer, content)
+    def __find_relative_link_spans(self, markdown_content: str) -> list[LinkSpan]:
+        """Find all relative links in the given markdown content, with the positions of their targets."""
+        return [
+            link_span
+            for link_span in find_link_spans(markdown_content)
+            if get_url_type(link_span.link) == URLType.RELATIVE
+        ]
 
-        return content
+    def __get_link_replacements(
+        self,
+        link_spans: list[LinkSpan],
+        link_replacements: dict[str, str],
+    ) -> list[tuple[int, int, str]]:
+        """Get the replacements of the targets of the given links at the positions the link scanner found them, e.g. .md with .html."""
+        replacements = []
+        for link_span in link_spans:
+            new_link = link_replacements.get(link_span.link)
+            if new_link is None:
+                continue
+
+            if link_span.kind in HTML_LINK_KINDS:
+                # Attribute values are unescaped by the scanner
+                new_link = html.escape(new_link)
+            replacements.append((link_span.start, link_span.end, new_link))
+
+        return replacements
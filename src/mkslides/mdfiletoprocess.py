@@ -5,12 +5,23 @@
 from dataclasses import dataclass, field
 from pathlib import Path
 
-from omegaconf import DictConfig
+from mkslides.config import SlideConfig
+from mkslides.linkscanner import LinkSpan
+from mkslides.manifest import DeckManifestEntry
 
 
 @dataclass(unsafe_hash=True)
 class MdFileToProcess:
     source_path: Path
     destination_path: Path
-    slide_config: DictConfig = field(hash=False)
+    slide_config: SlideConfig = field(hash=False)
     markdown_content: str = field(hash=False)
+    relative_links: set[str] = field(default_factory=set, hash=False)
+    link_spans: list[LinkSpan] = field(default_factory=list, hash=False)
+    missing_links: set[str] = field(default_factory=set, hash=False)
+    fingerprints: dict[str, str] = field(default_factory=dict, hash=False)
+    bundled_assets: set[str] = field(default_factory=set, hash=False)
+    images: dict[str, dict[str, int]] = field(default_factory=dict, hash=False)
+    is_up_to_date: bool = field(default=False, hash=False)
+    manifest_entry: DeckManifestEntry | None = field(default=None, hash=False)
+    transformation_key: str | None = field(default=None, hash=False)
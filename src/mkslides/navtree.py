@@ -2,15 +2,45 @@
 #
 # SPDX-License-Identifier: MIT
 
+import bisect
+import json
 import logging
+import os
+from operator import attrgetter
 from pathlib import Path
-
-from treelib import Tree
+from typing import Any
 
 from mkslides.mdfiletoprocess import MdFileToProcess
 
 logger = logging.getLogger(__name__)
 
+ROOT_NODE_ID = "root"
+
+
+class NavNode:
+    """Node of the navigation tree, with its children sorted by identifier."""
+
+    __slots__ = ("children", "data", "identifier")
+
+    def __init__(self, identifier: str, data: str | None = None) -> None:
+        self.identifier = identifier
+        self.data = data
+        self.children: list[NavNode] = []
+
+    def is_leaf(self) -> bool:
+        return not self.children
+
+    def to_dict(self) -> dict[str, Any]:
+        if self.is_leaf():
+            return {self.identifier: {"data": self.data}}
+
+        return {
+            self.identifier: {
+                "children": [child.to_dict() for child in self.children],
+                "data": self.data,
+            },
+        }
+
 
 class NavTree:
     def __init__(self, input_root_path: Path, output_root_path: Path) -> None:
@@ -18,8 +48,8 @@ class NavTree:
         self.output_root_path = output_root_path
 
         # Relative path as str is the index, title as str the data.
-        self.tree = Tree()
-        self.tree.create_node(identifier="root")
+        self.root = NavNode(ROOT_NODE_ID)
+        self.nodes = {ROOT_NODE_ID: self.root}
 
     def from_md_files(self, md_files: list[MdFileToProcess]) -> None:
         for md_file in md_files:
@@ -28,29 +58,21 @@ class NavTree:
             )
             parts = relative_source_path.parts
 
-            current_relative_source_path = Path()
-            parent_node_id = str(self.tree.root)
-            for part in parts:
-                current_relative_source_path /= part
-
-                node_id = None
-                if (self.input_root_path / current_relative_source_path).is_dir():
-                    node_id = str(current_relative_source_path)
-                else:
-                    node_id = str(current_relative_source_path.with_suffix(".html"))
+            parent_node_id = ROOT_NODE_ID
+            for depth, part in enumerate(parts, start=1):
+                # All parts are directories, except the last one which is the markdown file
+                node_id = os.path.join(*parts[:depth])  # noqa: PTH118
+                if depth == len(parts):
+                    node_id = os.path.splitext(node_id)[0] + ".html"  # noqa: PTH122
 
                 node_data = None
                 if md_file.slide_config.slides.title:
                     node_data = md_file.slide_config.slides.title
                 else:
-                    node_data = current_relative_source_path.stem
+                    node_data = os.path.splitext(part)[0]  # noqa: PTH122
 
-                if node_id not in self.tree:
-                    self.tree.create_node(
-                        identifier=node_id,
-                        parent=parent_node_id,
-                        data=node_data,
-                    )
+                if node_id not in self.nodes:
+                    self.__create_node(node_id, parent_node_id, node_data)
 
                 parent_node_id = node_id
 
@@ -58,11 +80,7 @@ class NavTree:
         assert isinstance(json_data, list), "json data must be a list"
 
         for item in json_data:
-            self.__node_from_config_json(
-                item,
-                self.output_root_path,
-                str(self.tree.root),
-            )
+            self.__node_from_config_json(item, self.output_root_path, ROOT_NODE_ID)
 
     def __node_from_config_json(
         self,
@@ -79,11 +97,7 @@ class NavTree:
             node_id = str(destination_path.relative_to(self.output_root_path))
             node_data = destination_path.stem
 
-            self.tree.create_node(
-                identifier=node_id,
-                parent=parent_node_id,
-                data=node_data,
-            )
+            self.__create_node(node_id, parent_node_id, node_data)
 
         # category or leaf node with custom file name
         elif isinstance(json_data, dict):
@@ -100,11 +114,7 @@ class NavTree:
                 node_id = str(destination_path.relative_to(self.output_root_path))
                 node_data = title
 
-                self.tree.create_node(
-                    identifier=node_id,
-                    parent=parent_node_id,
-                    data=node_data,
-                )
+                self.__create_node(node_id, parent_node_id, node_data)
 
             # category node
             #
@@ -116,11 +126,7 @@ class NavTree:
                 node_id = str(f"{destination_path.relative_to(self.output_root_path)}")
                 node_data = title
 
-                self.tree.create_node(
-                    identifier=node_id,
-                    parent=parent_node_id,
-                    data=node_data,
-                )
+                self.__create_node(node_id, parent_node_id, node_data)
 
                 for item in content:
                     self.__node_from_config_json(item, destination_path, node_id)
@@ -136,31 +142,45 @@ class NavTree:
 
             raise TypeError(msg)
 
+    def __create_node(self, node_id: str, parent_node_id: str, data: str) -> None:
+        if node_id in self.nodes:
+            msg = f"'{node_id}' is included more than once in the navigation tree"
+            raise ValueError(msg)
+
+        node = NavNode(node_id, data)
+        self.nodes[node_id] = node
+
+        # The children are kept sorted, so they are not sorted again when rendering
+        bisect.insort(
+            self.nodes[parent_node_id].children,
+            node,
+            key=attrgetter("identifier"),
+        )
+
     def is_node_leaf(self, node_id: str) -> bool:
-        return self.tree[node_id].is_leaf(self.tree.identifier)
+        return self.nodes[node_id].is_leaf()
 
-    def get_node_children(self, node_id: str) -> list:
-        return sorted(self.tree.children(node_id), key=lambda n: n.identifier)
+    def get_node_children(self, node_id: str) -> list[NavNode]:
+        return self.nodes[node_id].children
 
     def to_json(self) -> str:
-        if not self.tree:
-            return "{}"
-
-        return self.tree.to_json(with_data=True)
+        return json.dumps(self.root.to_dict())
 
     def validate_with_md_files(
         self,
         md_files: list[MdFileToProcess],
         strict: bool,
     ) -> None:
-        md_file_relative_destination_paths = [
+        md_file_relative_destination_paths = {
             str(md_file.destination_path.relative_to(self.output_root_path))
             for md_file in md_files
-        ]
+        }
 
         files_not_in_navtree = []
-        for md_file_relative_destination_path in md_file_relative_destination_paths:
-            if md_file_relative_destination_path not in self.tree:
+        for md_file_relative_destination_path in sorted(
+            md_file_relative_destination_paths,
+        ):
+            if md_file_relative_destination_path not in self.nodes:
                 source_file_name = str(
                     Path(md_file_relative_destination_path).with_suffix(".md"),
                 )
@@ -174,11 +194,9 @@ class NavTree:
             for file_name in files_not_in_navtree:
                 logger.info(f"\t- {file_name}")
 
-        for node_id in self.tree.expand_tree():
-            node = self.tree.get_node(node_id)
-            assert node
+        for node in self.nodes.values():
             if (
-                node.is_leaf(self.tree.identifier)
+                node.is_leaf()
                 and node.identifier not in md_file_relative_destination_paths
             ):
                 source_file_name = Path(node.identifier).with_suffix(".md").name
@@ -0,0 +1,106 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import logging
+import posixpath
+from importlib.resources.abc import Traversable
+from pathlib import Path
+
+from mkslides.constants import OUTPUT_STORE_MAX_FILE_SIZE
+from mkslides.manifest import BuildManifest, hash_bytes, hash_file
+
+logger = logging.getLogger(__name__)
+
+
+class OutputStore:
+    """
+    In-memory output of a build, served directly by the development server.
+
+    Rendered pages and small files are kept in memory. Larger files and the
+    bundled asset trees are not copied, but served from their source location.
+    Paths are relative to the output directory, using forward slashes.
+    """
+
+    def __init__(self, max_file_size: int = OUTPUT_STORE_MAX_FILE_SIZE) -> None:
+        self.max_file_size = max_file_size
+
+        # Manifest of the last build, as it is not saved to disk
+        self.manifest: BuildManifest | None = None
+
+        self.__contents: dict[str, bytes] = {}
+        self.__source_files: dict[str, Path] = {}
+        self.__source_trees: dict[str, Path] = {}
+
+    def write(self, relative_path: str, content: bytes) -> None:
+        key = self.__get_key(relative_path)
+        self.__source_files.pop(key, None)
+        self.__contents[key] = content
+
+    def add_file(self, relative_path: str, source_path: Path) -> None:
+        """Add a file, kept in memory if it is small enough or served from the source path otherwise."""
+        key = self.__get_key(relative_path)
+        if source_path.stat().st_size <= self.max_file_size:
+            self.write(key, source_path.read_bytes())
+        else:
+            self.__contents.pop(key, None)
+            self.__source_files[key] = source_path.resolve()
+
+    def add_tree(self, relative_path: str, source_path: Traversable) -> None:
+        """Add a directory tree, served from the source path if it is on the filesystem or kept in memory otherwise."""
+        key = self.__get_key(relative_path)
+        if isinstance(source_path, Path):
+            self.__source_trees[key] = source_path.resolve()
+            return
+
+        for child in source_path.iterdir():
+            child_relative_path = posixpath.join(key, child.name)
+            if child.is_dir():
+                self.add_tree(child_relative_path, child)
+            else:
+                self.write(child_relative_path, child.read_bytes())
+
+    def remove(self, relative_path: str) -> None:
+        key = self.__get_key(relative_path)
+        self.__contents.pop(key, None)
+        self.__source_files.pop(key, None)
+
+    def clear(self) -> None:
+        self.manifest = None
+        self.__contents.clear()
+        self.__source_files.clear()
+        self.__source_trees.clear()
+
+    def get(self, relative_path: str) -> bytes | Path | None:
+        """Get the content of a file, or the path to serve it from if it is not kept in memory."""
+        key = self.__get_key(relative_path)
+        if key == ".." or key.startswith("../"):
+            return None
+
+        if key in self.__contents:
+            return self.__contents[key]
+        if key in self.__source_files:
+            return self.__source_files[key]
+
+        for tree_key, tree_path in self.__source_trees.items():
+            if key.startswith(tree_key + "/"):
+                path = tree_path / key.removeprefix(tree_key + "/")
+                if path.is_file():
+                    return path
+
+        return None
+
+    def exists(self, relative_path: str) -> bool:
+        return self.get(relative_path) is not None
+
+    def hash(self, relative_path: str) -> str | None:
+        content = self.get(relative_path)
+        if content is None:
+            return None
+        if isinstance(content, Path):
+            return hash_file(content)
+
+        return hash_bytes(content)
+
+    def __get_key(self, relative_path: str) -> str:
+        return posixpath.normpath(relative_path.lstrip("/"))
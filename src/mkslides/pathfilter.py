@@ -0,0 +1,225 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import logging
+import os
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from mkslides.constants import DEFAULT_EXCLUDE_PATTERNS, GITIGNORE_FILENAME
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ExcludeRule:
+    regex: re.Pattern
+    is_negated: bool
+    is_directory_only: bool
+
+
+def compile_exclude_pattern(pattern: str) -> ExcludeRule | None:
+    """
+    Compile a gitignore-style pattern, or return None for blank lines and comments.
+
+    Patterns without a slash match names at any depth, other patterns are
+    relative to the directory they are defined for. A trailing slash only
+    matches directories, `*` and `?` do not match a slash, `**` matches any
+    number of directories and a leading `!` negates the pattern.
+    """
+    pattern = pattern.rstrip("\n\r")
+    if not pattern.strip() or pattern.startswith("#"):
+        return None
+
+    # Trailing spaces are ignored unless escaped
+    if not pattern.endswith("\\ "):
+        pattern = pattern.rstrip(" ")
+
+    # A leading backslash escapes a literal `!` or `#`
+    is_negated = pattern.startswith("!")
+    if is_negated or pattern.startswith(("\\!", "\\#")):
+        pattern = pattern[1:]
+
+    is_directory_only = pattern.endswith("/")
+    pattern = pattern.rstrip("/")
+    is_anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+    if not pattern:
+        return None
+
+    regex = ("" if is_anchored else "(?:.*/)?") + _translate_glob(pattern)
+
+    return ExcludeRule(re.compile(regex + r"\Z"), is_negated, is_directory_only)
+
+
+def _translate_glob(pattern: str) -> str:
+    """Translate a glob pattern to a regex matching a relative path with forward slashes."""
+    regex = ""
+    index = 0
+    while index < len(pattern):
+        if pattern.startswith("**/", index):
+            regex += "(?:.*/)?"
+            index += 3
+        elif pattern.startswith("**", index):
+            regex += ".*"
+            index += 2
+        elif pattern[index] == "*":
+            regex += "[^/]*"
+            index += 1
+        elif pattern[index] == "?":
+            regex += "[^/]"
+            index += 1
+        elif pattern[index] == "[" and (end := pattern.find("]", index + 2)) != -1:
+            character_class = pattern[index + 1 : end].replace("\\", "\\\\")
+            if character_class.startswith("!"):
+                character_class = "^" + character_class[1:]
+            regex += f"[{character_class}]"
+            index = end + 1
+        elif pattern[index] == "\\" and index + 1 < len(pattern):
+            regex += re.escape(pattern[index + 1])
+            index += 2
+        else:
+            regex += re.escape(pattern[index])
+            index += 1
+
+    return regex
+
+
+def compile_exclude_patterns(patterns: Iterable[str]) -> list[ExcludeRule]:
+    return [rule for pattern in patterns if (rule := compile_exclude_pattern(pattern))]
+
+
+class PathFilter:
+    """
+    Decide which paths below a root directory are excluded from the build.
+
+    Paths are excluded by the version control directories and the
+    gitignore-style exclude patterns, which are relative to the root directory.
+    Optionally, the `.gitignore` files in the root, its subdirectories and its
+    parents up to the root of the git repository are used as well. As with
+    git, the last matching pattern decides.
+    """
+
+    def __init__(
+        self,
+        root_path: Path,
+        exclude: Iterable[str] = (),
+        *,
+        use_gitignore: bool = False,
+    ) -> None:
+        self.root_path = root_path.resolve(strict=False)
+        self.use_gitignore = use_gitignore
+
+        self.__root_key = str(self.root_path)
+        self.__exclude_rules = compile_exclude_patterns(
+            [*DEFAULT_EXCLUDE_PATTERNS, *exclude],
+        )
+
+        # Rules of the .gitignore file in each directory, by absolute path as str
+        self.__gitignore_rules: dict[str, list[ExcludeRule]] = {}
+        self.__gitignore_parent_keys = (
+            self.__find_gitignore_parent_keys() if use_gitignore else []
+        )
+
+    def is_excluded(self, key: str, is_dir: bool) -> bool:
+        """Check if an absolute path below the root directory is excluded, assuming its parents are not."""
+        relative_path = self.__get_relative_path(self.__root_key, key)
+        if relative_path is None:
+            return False
+
+        is_excluded = self.__matches(
+            self.__exclude_rules,
+            relative_path,
+            is_dir=is_dir,
+        )
+        if is_excluded or not self.use_gitignore:
+            return is_excluded
+
+        # Deeper .gitignore files take precedence, so they are applied last
+        is_ignored = False
+        for directory_key in self.__get_gitignore_directory_keys(key):
+            rules = self.__get_gitignore_rules(directory_key)
+            relative_path = self.__get_relative_path(directory_key, key)
+            assert relative_path is not None
+            is_ignored = self.__matches(
+                rules,
+                relative_path,
+                is_dir=is_dir,
+                default=is_ignored,
+            )
+
+        return is_ignored
+
+    def is_gitignore(self, path: Path) -> bool:
+        """Check if a path is a `.gitignore` file used by this filter."""
+        return self.use_gitignore and path.name == GITIGNORE_FILENAME
+
+    def reset(self) -> None:
+        """Forget the loaded `.gitignore` files, e.g. when one of them changed."""
+        self.__gitignore_rules.clear()
+
+    def __matches(
+        self,
+        rules: list[ExcludeRule],
+        relative_path: str,
+        *,
+        is_dir: bool,
+        default: bool = False,
+    ) -> bool:
+        is_excluded = default
+        for rule in rules:
+            if (is_dir or not rule.is_directory_only) and rule.regex.match(
+                relative_path,
+            ):
+                is_excluded = not rule.is_negated
+
+        return is_excluded
+
+    def __get_relative_path(self, directory_key: str, key: str) -> str | None:
+        prefix = directory_key.rstrip(os.sep) + os.sep
+        if not key.startswith(prefix):
+            return None
+
+        return key.removeprefix(prefix).replace(os.sep, "/")
+
+    def __get_gitignore_directory_keys(self, key: str) -> list[str]:
+        """Get the directories whose .gitignore file applies to a path, outermost first."""
+        directory_keys = list(self.__gitignore_parent_keys)
+
+        directory_key = self.__root_key
+        directory_keys.append(directory_key)
+        relative_path = self.__get_relative_path(directory_key, key)
+        assert relative_path is not None
+        for part in relative_path.split("/")[:-1]:
+            directory_key = os.path.join(directory_key, part)  # noqa: PTH118
+            directory_keys.append(directory_key)
+
+        return directory_keys
+
+    def __get_gitignore_rules(self, directory_key: str) -> list[ExcludeRule]:
+        if directory_key not in self.__gitignore_rules:
+            gitignore_path = Path(directory_key) / GITIGNORE_FILENAME
+            try:
+                lines = gitignore_path.read_text(encoding="utf-8").splitlines()
+            except (OSError, UnicodeDecodeError):
+                lines = []
+            else:
+                logger.debug(f"Loaded ignore patterns from '{gitignore_path}'")
+
+            self.__gitignore_rules[directory_key] = compile_exclude_patterns(lines)
+
+        return self.__gitignore_rules[directory_key]
+
+    def __find_gitignore_parent_keys(self) -> list[str]:
+        """Find the parents of the root directory up to the root of its git repository, outermost first."""
+        parent_keys: list[str] = []
+        for parent_path in self.root_path.parents:
+            parent_keys.insert(0, str(parent_path))
+            if (parent_path / ".git").exists():
+                return parent_keys
+
+        # The root directory is not inside a git repository
+        return []
@@ -0,0 +1,129 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import gzip
+import logging
+import os
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+PRECOMPRESSIBLE_SUFFIXES = {".html", ".css", ".js", ".svg", ".json"}
+
+# Smaller files fit in a single network packet, so compressing them gains nothing
+PRECOMPRESS_MIN_SIZE = 1024
+
+type Compressor = Callable[[bytes], bytes]
+
+
+def __gzip_compress(content: bytes) -> bytes:
+    # A fixed timestamp in the header keeps the output reproducible
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+@cache
+def get_compressors() -> dict[str, Compressor | None]:
+    """Get the compressors by the suffix of the files they write, None if the compressor is not installed."""
+    try:
+        import brotli  # type: ignore[import-not-found, unused-ignore]  # noqa: PLC0415
+    except ImportError:
+        logger.debug(
+            "Package brotli is not installed, not writing .br files, install it with 'pip install mkslides[precompress]'",
+        )
+        brotli_compress = None
+    else:
+
+        def brotli_compress(content: bytes) -> bytes:
+            return bytes(brotli.compress(content, quality=11))
+
+    return {".gz": __gzip_compress, ".br": brotli_compress}
+
+
+def __get_compressed_path(path: Path, suffix: str) -> Path:
+    return path.with_name(path.name + suffix)
+
+
+def __is_precompressible(path: Path) -> bool:
+    # Hidden files are internal to mkslides, like the build manifest
+    return path.suffix in PRECOMPRESSIBLE_SUFFIXES and not path.name.startswith(".")
+
+
+def __find_precompressible_files(root_path: Path) -> list[Path]:
+    # Symlinked directories are not followed, so nothing is written outside the root
+    return [
+        Path(directory_path, filename)
+        for directory_path, _, filenames in os.walk(root_path)
+        for filename in filenames
+        if __is_precompressible(Path(filename))
+    ]
+
+
+def precompress_file(path: Path) -> int:
+    """
+    Write the compressed copies of a file next to it and return how many were written.
+
+    The compressed copies get the modification time of the file, so they are
+    only written again if the file changed. Compressed copies that are no
+    longer wanted, e.g. because the file became too small, are removed.
+    """
+    stat = path.stat()
+    content = None
+    written_count = 0
+    for suffix, compress in get_compressors().items():
+        compressed_path = __get_compressed_path(path, suffix)
+        if compress is None or stat.st_size < PRECOMPRESS_MIN_SIZE:
+            compressed_path.unlink(missing_ok=True)
+            continue
+
+        try:
+            if compressed_path.stat().st_mtime_ns == stat.st_mtime_ns:
+                continue
+        except FileNotFoundError:
+            pass
+
+        if content is None:
+            content = path.read_bytes()
+        compressed_path.write_bytes(compress(content))
+        os.utime(compressed_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        written_count += 1
+
+    return written_count
+
+
+def precompress_directory(root_path: Path) -> int:
+    """Write the compressed copies of the compressible files in a directory tree and return how many were written."""
+    paths = __find_precompressible_files(root_path)
+
+    # zlib and brotli release the GIL while compressing
+    with ThreadPoolExecutor() as executor:
+        written_count = sum(executor.map(precompress_file, paths))
+
+    logger.debug(
+        f"Precompressed {len(paths)} files in '{root_path}', {written_count} compressed copies written",
+    )
+    return written_count
+
+
+def remove_compressed_files(path: Path) -> None:
+    """Remove the compressed copies of a file."""
+    for suffix in get_compressors():
+        __get_compressed_path(path, suffix).unlink(missing_ok=True)
+
+
+def remove_precompressed_directory(root_path: Path) -> None:
+    """Remove the compressed copies written by precompress_directory from a directory tree."""
+    for path in __find_precompressible_files(root_path):
+        mtime_ns = path.stat().st_mtime_ns
+        for suffix in get_compressors():
+            compressed_path = __get_compressed_path(path, suffix)
+            # Compressed files copied from the markdown directory have another modification time
+            if (
+                compressed_path.is_file()
+                and compressed_path.stat().st_mtime_ns == mtime_ns
+            ):
+                compressed_path.unlink()
+                logger.debug(f"Removed compressed copy '{compressed_path}'")
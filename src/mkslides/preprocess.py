@@ -5,13 +5,61 @@
 import importlib.util
 import logging
 from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from mkslides.manifest import hash_bytes
 
 logger = logging.getLogger(__name__)
 
 PREPROCESS_FUNCTION_NAME = "preprocess"
 
 
+@dataclass
+class LoadedPreprocessingFunction:
+    function: Callable[[str], str]
+    mtime_ns: int
+    size: int
+    script_hash: str
+
+
+# Resolved path of the script as str is the key, so each script is only executed
+# once per process, also across rebuilds while serving.
+_loaded_preprocessing_functions: dict[str, LoadedPreprocessingFunction] = {}
+
+
 def load_preprocessing_function(script: str) -> Callable[[str], str] | None:
+    script_path = Path(script).resolve()
+    key = str(script_path)
+    script_stat = script_path.stat()
+
+    loaded = _loaded_preprocessing_functions.get(key)
+    if (
+        loaded
+        and loaded.mtime_ns == script_stat.st_mtime_ns
+        and loaded.size == script_stat.st_size
+    ):
+        return loaded.function
+
+    # The modification time can change without the content changing, e.g. on a checkout
+    script_hash = hash_bytes(script_path.read_bytes())
+    if loaded and loaded.script_hash == script_hash:
+        loaded.mtime_ns = script_stat.st_mtime_ns
+        loaded.size = script_stat.st_size
+        return loaded.function
+
+    preprocess_func = _execute_preprocessing_script(script)
+    _loaded_preprocessing_functions[key] = LoadedPreprocessingFunction(
+        function=preprocess_func,
+        mtime_ns=script_stat.st_mtime_ns,
+        size=script_stat.st_size,
+        script_hash=script_hash,
+    )
+
+    return preprocess_func
+
+
+def _execute_preprocessing_script(script: str) -> Callable[[str], str]:
     spec = importlib.util.spec_from_file_location("preprocess_module", script)
     if spec is None:
         message = f"Could not create module spec from '{script}'"
@@ -0,0 +1,263 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import html
+import re
+import xml.etree.ElementTree as ET
+from functools import cache
+
+from markdown import Markdown
+from markdown.treeprocessors import Treeprocessor
+from markdown.util import HTML_PLACEHOLDER_RE
+
+# Renders the slides to HTML at build time like the markdown plugin of reveal.js
+# does in the browser, so the plugin is not needed on the page. The markdown is
+# rendered with Python-Markdown and the "extra" extensions, the same rules the
+# link scanner follows.
+#
+# https://github.com/hakimel/reveal.js/blob/master/plugin/markdown/plugin.js
+
+DEFAULT_SEPARATOR = r"\r?\n---\r?\n"
+DEFAULT_NOTES_SEPARATOR = r"^\s*notes?:"
+
+ELEMENT_ATTRIBUTES_REGEX = re.compile(r"\.element\s*?(.+?)$", re.MULTILINE)
+SLIDE_ATTRIBUTES_REGEX = re.compile(r"\.slide:\s*?(\S.+?)$", re.MULTILINE)
+ATTRIBUTE_REGEX = re.compile(
+    r"""
+    (?P<name>[^"=\ ]+?)="(?P<value>[^"]+?)"     # name="value"
+    |
+    (?P<data_name>data-[^"=\ ]+?)(?=["\ ])      # Data attribute without value
+    """,
+    re.VERBOSE,
+)
+COMMENT_REGEX = re.compile(r"<!--(?P<value>.*?)-->", re.DOTALL)
+
+# The reveal.js markdown plugin takes the line numbers to highlight from the
+# info string of a code fence, e.g. ```js [1-2|3], Python-Markdown from an
+# attribute list instead.
+CODE_FENCE_LINE_NUMBERS_REGEX = re.compile(
+    r"""
+    ^(?P<fence>[ ]{0,3}(?:`{3,}|~{3,}))[ \t]*
+    (?P<language>[^\s`\[\]]+)?[ \t]*
+    \[[ \t]*
+        (?:(?P<start>\d*):)?[ \t]*          # Optional line number to start from
+        (?P<line_numbers>[\s\d,|-]*)        # Lines to highlight
+    \][ \t]*$
+    """,
+    re.VERBOSE | re.MULTILINE,
+)
+
+
+class SlideAttributesTreeprocessor(Treeprocessor):
+    """
+    Apply the attributes of the `.element` and `.slide` comments.
+
+    An `.element` comment sets its attributes on the previous sibling element,
+    or on its parent when there is none. A `.slide` comment sets its attributes
+    on the section of the slide. The comments are stashed as raw HTML at this
+    point, and are only kept without their attributes.
+    """
+
+    def run(self, root: ET.Element) -> None:
+        self.section_attributes: dict[str, str] = {}
+        self.__apply_comments(root, root)
+
+    def __apply_comments(self, root: ET.Element, parent: ET.Element) -> None:
+        self.__apply_comments_in_text(root, parent.text, parent)
+
+        previous = parent
+        for child in parent:
+            if self.__is_stashed_comment_block(child):
+                self.__apply_comments_in_text(root, child.text, previous)
+            else:
+                self.__apply_comments(root, child)
+                if child.tag != "br":
+                    previous = child
+
+            self.__apply_comments_in_text(root, child.tail, previous)
+
+    def __is_stashed_comment_block(self, element: ET.Element) -> bool:
+        """Check if the element is the paragraph Python-Markdown wraps around a block of raw HTML comments."""
+        if element.tag != "p" or len(element) or not element.text:
+            return False
+
+        match = HTML_PLACEHOLDER_RE.fullmatch(element.text.strip())
+        return match is not None and self.__is_comment(self.__get_stashed(match))
+
+    def __apply_comments_in_text(
+        self,
+        root: ET.Element,
+        text: str | None,
+        target: ET.Element,
+    ) -> None:
+        if not text:
+            return
+
+        for match in HTML_PLACEHOLDER_RE.finditer(text):
+            raw_html = self.__get_stashed(match)
+            if not self.__is_comment(raw_html):
+                continue
+
+            def _replacer(comment_match: re.Match) -> str:
+                value = comment_match.group("value")
+                if element_match := ELEMENT_ATTRIBUTES_REGEX.search(value):
+                    for name, attribute_value in get_attributes(element_match[1]):
+                        if target is root:
+                            self.section_attributes[name] = attribute_value
+                        else:
+                            target.set(name, attribute_value)
+                    value = (
+                        value[: element_match.start()] + value[element_match.end() :]
+                    )
+                elif slide_match := SLIDE_ATTRIBUTES_REGEX.search(value):
+                    self.section_attributes.update(get_attributes(slide_match[1]))
+                    value = value[: slide_match.start()] + value[slide_match.end() :]
+
+                return f"<!--{value}-->"
+
+            index = int(match[1])
+            self.md.htmlStash.rawHtmlBlocks[index] = COMMENT_REGEX.sub(
+                _replacer,
+                raw_html,
+            )
+
+    def __get_stashed(self, placeholder_match: re.Match) -> str:
+        index = int(placeholder_match[1])
+        if index >= len(self.md.htmlStash.rawHtmlBlocks):
+            return ""
+
+        raw_html = self.md.htmlStash.rawHtmlBlocks[index]
+        return raw_html if isinstance(raw_html, str) else ""
+
+    def __is_comment(self, raw_html: str) -> bool:
+        return bool(raw_html) and not COMMENT_REGEX.sub("", raw_html).strip()
+
+
+def get_attributes(attributes: str) -> list[tuple[str, str]]:
+    return [
+        (match["name"], match["value"]) if match["name"] else (match["data_name"], "")
+        for match in ATTRIBUTE_REGEX.finditer(attributes)
+    ]
+
+
+@cache
+def get_markdown() -> tuple[Markdown, SlideAttributesTreeprocessor]:
+    """Get the markdown converter of this process, it is reset before each slide."""
+    md = Markdown(extensions=["extra"])
+    treeprocessor = SlideAttributesTreeprocessor(md)
+    # After the inline processor stashed the inline comments
+    md.treeprocessors.register(treeprocessor, "slide_attributes", 12)
+    return md, treeprocessor
+
+
+def split_slides(
+    markdown_content: str,
+    separator: str | None,
+    separator_vertical: str | None,
+) -> list[str | list[str]]:
+    """Split the markdown into horizontal slides and stacks of vertical slides like reveal.js does."""
+    separator = separator or DEFAULT_SEPARATOR
+    separator_regex = re.compile(
+        separator + (f"|{separator_vertical}" if separator_vertical else ""),
+        re.MULTILINE,
+    )
+    horizontal_separator_regex = re.compile(separator)
+
+    sections: list[str | list[str]] = []
+    vertical_stack: list[str] = []
+    was_horizontal = True
+    last_index = 0
+
+    for match in separator_regex.finditer(markdown_content):
+        is_horizontal = bool(horizontal_separator_regex.search(match[0]))
+        if not is_horizontal and was_horizontal:
+            vertical_stack = []
+            sections.append(vertical_stack)
+
+        content = markdown_content[last_index : match.start()]
+        if is_horizontal and was_horizontal:
+            sections.append(content)
+        else:
+            vertical_stack.append(content)
+
+        last_index = match.end()
+        was_horizontal = is_horizontal
+
+    content = markdown_content[last_index:]
+    if was_horizontal:
+        sections.append(content)
+    else:
+        vertical_stack.append(content)
+
+    return sections
+
+
+def render_slide(markdown_content: str, separator_notes: str | None) -> str:
+    """Render the markdown of a single slide to a section with its speaker notes."""
+    notes_html = ""
+    parts = re.split(
+        separator_notes or DEFAULT_NOTES_SEPARATOR,
+        markdown_content,
+        flags=re.MULTILINE | re.IGNORECASE,
+    )
+    if len(parts) == 2:  # noqa: PLR2004
+        markdown_content = parts[0]
+        notes_html = (
+            f'<aside class="notes">{render_markdown(parts[1].strip())[0]}</aside>'
+        )
+
+    slide_html, section_attributes = render_markdown(markdown_content)
+    attributes_html = "".join(
+        f' {name}="{html.escape(value)}"' for name, value in section_attributes.items()
+    )
+    return f"<section{attributes_html}>\n{slide_html}\n{notes_html}</section>"
+
+
+def render_markdown(markdown_content: str) -> tuple[str, dict[str, str]]:
+    md, treeprocessor = get_markdown()
+    md.reset()
+    markdown_content = CODE_FENCE_LINE_NUMBERS_REGEX.sub(
+        _convert_code_fence_line_numbers,
+        markdown_content,
+    )
+    slide_html = md.convert(markdown_content)
+    return slide_html, treeprocessor.section_attributes
+
+
+def _convert_code_fence_line_numbers(match: re.Match) -> str:
+    attributes = []
+    if language := match["language"]:
+        attributes.append(f".{language}")
+    attributes.append(f'data-line-numbers="{match["line_numbers"].strip()}"')
+    if start := match["start"]:
+        attributes.append(f'data-ln-start-from="{start}"')
+
+    return f"{match['fence']} {{ {' '.join(attributes)} }}"
+
+
+def prerender_slides(
+    markdown_content: str,
+    separator: str | None = None,
+    separator_vertical: str | None = None,
+    separator_notes: str | None = None,
+) -> str:
+    """
+    Render the markdown of a slideshow to the sections of its slides.
+
+    The markdown is split on the same separators as the reveal.js markdown
+    plugin would split it, and the attributes of the `.slide` and `.element`
+    comments are applied to the generated HTML.
+    """
+    sections = []
+    for section in split_slides(markdown_content, separator, separator_vertical):
+        if isinstance(section, list):
+            vertical_sections = "\n".join(
+                render_slide(vertical_section, separator_notes)
+                for vertical_section in section
+            )
+            sections.append(f"<section>\n{vertical_sections}\n</section>")
+        else:
+            sections.append(render_slide(section, separator_notes))
+
+    return "\n".join(sections)
@@ -2,81 +2,238 @@
 #
 # SPDX-License-Identifier: MIT
 
+import asyncio
+import contextlib
 import logging
 import shutil
-import threading
+import webbrowser
 from pathlib import Path
 
-import livereload  # type: ignore[import-untyped]
-from livereload.handlers import LiveReloadHandler  # type: ignore[import-untyped]
 from omegaconf import DictConfig
 
+from mkslides.assetstrategy import AssetStrategy
 from mkslides.build import build
 from mkslides.config import get_config
+from mkslides.devserver import DevServer
+from mkslides.filewatcher import (
+    FileWatcher,
+    NotifyingFileWatcher,
+    create_file_watcher,
+)
+from mkslides.markupgenerator import MarkupGenerator
+from mkslides.outputstore import OutputStore
+from mkslides.pathfilter import PathFilter
+from mkslides.statcache import StatCache
 
 logger = logging.getLogger(__name__)
 
-LiveReloadHandler.DEFAULT_RELOAD_TIME = (
-    0  # https://github.com/lepture/python-livereload/pull/244
-)
-
+# Debounce intervals in seconds if none is given. Notified changes arrive right
+# away, while a scan can find the first of several writes before the others
+NOTIFY_DEBOUNCE_INTERVAL = 0.05
+POLL_DEBOUNCE_INTERVAL = 1.0
+
+
+class _Session:
+    """State of a serve session, rebuilt outside the event loop so serving is not blocked."""
+
+    def __init__(
+        self,
+        config: DictConfig,
+        input_path: Path,
+        output_path: Path,
+        serve_config: DictConfig,
+    ) -> None:
+        self.config_path: Path | None = config.internal.config_path
+        self.input_path = input_path
+        self.output_path = output_path
+        self.serve_config = serve_config
+        self.asset_strategy = AssetStrategy(serve_config.asset_strategy)
+
+        # Kept across reloads, so only outputs that changed are rendered again
+        self.output_store = OutputStore() if serve_config.in_memory else None
+
+        self.is_full_build_needed = False
+        self.stat_cache = self.__create_stat_cache(config)
+        self.markup_generator = self.__build(config)
+
+    def rebuild(self, changed_paths: set[Path]) -> set[str] | None:
+        """Rebuild the outputs that depend on the changed paths and return the changed outputs, or None if everything changed."""
+        logger.info("Reloading...")
 
-def serve(
-    config: DictConfig,
-    input_path: Path,
-    output_path: Path,
-    serve_config: DictConfig,
-) -> None:
-    build(
-        config,
-        input_path,
-        output_path,
-        serve_config.strict,
-    )
+        if self.is_full_build_needed or (
+            self.config_path and self.config_path.absolute() in changed_paths
+        ):
+            config = get_config(self.config_path)
+            self.stat_cache = self.__create_stat_cache(config)
+            self.markup_generator = self.__build(config)
+            self.is_full_build_needed = False
+            return None
+
+        self.stat_cache.invalidate(changed_paths)
+        try:
+            self.markup_generator.process_changes(changed_paths)
+        except Exception:
+            # The state of the last build is unknown, so the next change rebuilds everything
+            self.is_full_build_needed = True
+            raise
+
+        return self.markup_generator.changed_outputs
+
+    def __create_stat_cache(self, config: DictConfig) -> StatCache:
+        """Create the stat cache, reused across reloads as the changed paths are invalidated before each rebuild."""
+        return StatCache(
+            self.input_path,
+            PathFilter(
+                self.input_path,
+                config.exclude,
+                use_gitignore=config.gitignore,
+            ),
+        )
 
-    paths_to_watch: list[Path] = [
-        input_path,
-        config.internal.config_path,
-    ]
+    def __build(self, config: DictConfig) -> MarkupGenerator:
+        return build(
+            config,
+            self.input_path,
+            self.output_path,
+            self.serve_config.strict,
+            incremental=True,
+            asset_strategy=self.asset_strategy,
+            stat_cache=self.stat_cache,
+            output_store=self.output_store,
+        )
 
-    def reload() -> None:
-        logger.info("Reloading...")
-        new_config = get_config(config.internal.config_path)
-        build(new_config, input_path, output_path, serve_config.strict)
 
-    debounce_timer: threading.Timer | None = None
+async def _watch_and_reload(
+    session: _Session,
+    server: DevServer,
+    debounce_interval: float | None,
+) -> None:
+    """Watch the input and config for changes, using a shorter debounce interval if the changes are notified."""
+    watched_paths = [session.input_path]
+    if session.config_path:
+        watched_paths.append(session.config_path)
+    for path in watched_paths:
+        logger.info(f"Watching: '{path}'")
+
+    loop = asyncio.get_running_loop()
+    change_event = asyncio.Event()
+
+    def notify_change() -> None:
+        # Called from the thread receiving the notifications
+        loop.call_soon_threadsafe(change_event.set)
+
+    watcher = await asyncio.to_thread(
+        create_file_watcher,
+        watched_paths,
+        session.stat_cache.path_filter,
+        notify_change,
+    )
+    try:
+        if debounce_interval is None:
+            debounce_interval = (
+                NOTIFY_DEBOUNCE_INTERVAL
+                if isinstance(watcher, NotifyingFileWatcher)
+                else POLL_DEBOUNCE_INTERVAL
+            )
+        await _reload_on_changes(
+            session,
+            server,
+            watcher,
+            change_event,
+            debounce_interval,
+        )
+    finally:
+        await asyncio.to_thread(watcher.close)
 
-    def debounced_reload() -> None:
-        nonlocal debounce_timer
 
-        if debounce_timer is not None:
-            logger.info(
-                f"New change detected, resetting debounce timer ({serve_config.debounce_interval}s) ...",
+async def _reload_on_changes(
+    session: _Session,
+    server: DevServer,
+    watcher: FileWatcher | NotifyingFileWatcher,
+    change_event: asyncio.Event,
+    debounce_interval: float,
+) -> None:
+    """Rebuild after the watched paths changed and stayed unchanged during the debounce interval."""
+    loop = asyncio.get_running_loop()
+    changed_paths: set[Path] = set()
+    last_change_time = 0.0
+
+    while True:
+        # Wait for a notified change or the next scan, or until the debounce
+        # interval of the changes so far has passed
+        timeout = watcher.poll_interval
+        if changed_paths:
+            remaining_time = last_change_time + debounce_interval - loop.time()
+            timeout = (
+                remaining_time if timeout is None else min(timeout, remaining_time)
             )
-            debounce_timer.cancel()
-
-        debounce_timer = threading.Timer(serve_config.debounce_interval, reload)
-        debounce_timer.daemon = True
-        debounce_timer.start()
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(change_event.wait(), timeout)
+        change_event.clear()
+
+        if new_changed_paths := await asyncio.to_thread(watcher.poll):
+            if changed_paths:
+                logger.info(
+                    f"New change detected, resetting debounce timer ({debounce_interval}s) ...",
+                )
+            changed_paths.update(new_changed_paths)
+            last_change_time = loop.time()
+
+        if not changed_paths or loop.time() - last_change_time < debounce_interval:
+            continue
+
+        paths = changed_paths
+        changed_paths = set()
+        try:
+            # The server keeps serving the previous outputs during the rebuild
+            changed_outputs = await asyncio.to_thread(session.rebuild, paths)
+        except Exception:
+            logger.exception("Rebuild failed, fix the error to reload")
+            continue
+
+        # The path filter is created again when the config changed
+        watcher.path_filter = session.stat_cache.path_filter
+        server.dependencies = session.markup_generator.get_output_dependencies()
+        await server.notify(changed_outputs)
+
+
+async def _serve(session: _Session, serve_config: DictConfig) -> None:
+    if session.output_store is not None:
+        server = DevServer(
+            serve_config.dev_ip,
+            serve_config.dev_port,
+            output_store=session.output_store,
+        )
+    else:
+        server = DevServer(
+            serve_config.dev_ip,
+            serve_config.dev_port,
+            output_path=session.output_path,
+        )
+    server.dependencies = session.markup_generator.get_output_dependencies()
 
+    await server.start()
     try:
-        server = livereload.Server()
+        if serve_config.open_in_browser:
+            await asyncio.to_thread(webbrowser.open, server.url)
 
-        # https://github.com/lepture/python-livereload/issues/232
-        server._setup_logging = lambda: None  # noqa: SLF001
+        await _watch_and_reload(session, server, serve_config.debounce_interval)
+    finally:
+        await server.stop()
 
-        for path in paths_to_watch:
-            logger.info(f"Watching: '{path}'")
-            server.watch(filepath=path.as_posix(), func=debounced_reload)
-
-        server.serve(
-            host=serve_config.dev_ip,
-            port=serve_config.dev_port,
-            root=output_path,
-            open_url_delay=0 if serve_config.open_in_browser else None,
-        )
 
+def serve(
+    config: DictConfig,
+    input_path: Path,
+    output_path: Path,
+    serve_config: DictConfig,
+) -> None:
+    try:
+        session = _Session(config, input_path, output_path, serve_config)
+        asyncio.run(_serve(session, serve_config))
+    except KeyboardInterrupt:
+        logger.info("Shutting down...")
     finally:
-        if output_path.exists():
+        if not serve_config.in_memory and output_path.exists():
             shutil.rmtree(output_path)
             logger.info(f"Removed '{output_path}'")
@@ -0,0 +1,226 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import logging
+import os
+import stat
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+from mkslides.pathfilter import PathFilter
+
+logger = logging.getLogger(__name__)
+
+
+class StatCache:
+    """
+    Cache of the files and directories below a root directory, filled by a single walk on first use.
+
+    Paths that are not found by the walk, like paths outside the root or below
+    symlinked directories, are looked up on the filesystem once and remembered
+    as well. Use `invalidate` when paths change, e.g. between rebuilds while
+    serving.
+
+    Paths excluded by the path filter are not descended into and considered
+    to not exist.
+    """
+
+    def __init__(self, root_path: Path, path_filter: PathFilter | None = None) -> None:
+        self.root_path = root_path.resolve(strict=False)
+        self.path_filter = path_filter
+        self.__root_key = str(self.root_path)
+        self.__is_walked = False
+
+        # Absolute path as str is the key, whether it is a directory the value
+        self.__entries: dict[str, bool] = {}
+        # Resolved paths of the regular files found by the walk
+        self.__files: dict[str, Path] = {}
+        # Results of the lookups of paths not found by the walk
+        self.__lookups: dict[str, os.stat_result | None] = {}
+        # Paths excluded by the path filter, whether it is a directory the value
+        self.__excluded: dict[str, bool] = {}
+
+    def files(self) -> list[Path]:
+        """Return the resolved paths of all files below the root."""
+        self.__walk_if_needed()
+        return list(self.__files.values())
+
+    def exists(self, path: Path) -> bool:
+        key = self.__get_key(path)
+        if key in self.__entries:
+            return True
+
+        return not self.__is_excluded(key) and self.__lookup(key) is not None
+
+    def is_file(self, path: Path) -> bool:
+        key = self.__get_key(path)
+        if key in self.__entries:
+            return key in self.__files
+        if self.__is_excluded(key):
+            return False
+
+        result = self.__lookup(key)
+        return result is not None and stat.S_ISREG(result.st_mode)
+
+    def is_dir(self, path: Path) -> bool:
+        key = self.__get_key(path)
+        if key in self.__entries:
+            return self.__entries[key]
+        if self.__is_excluded(key):
+            return False
+
+        result = self.__lookup(key)
+        return result is not None and stat.S_ISDIR(result.st_mode)
+
+    def invalidate(self, paths: Iterable[Path] | None = None) -> None:
+        """Forget the given paths and everything below them, or everything if no paths are given."""
+        # A changed .gitignore file can change which paths are excluded anywhere below it
+        if paths is not None and self.path_filter:
+            paths = list(paths)
+            if any(self.path_filter.is_gitignore(path) for path in paths):
+                paths = None
+
+        if paths is None:
+            self.__is_walked = False
+            self.__entries.clear()
+            self.__files.clear()
+            self.__lookups.clear()
+            self.__excluded.clear()
+            if self.path_filter:
+                self.path_filter.reset()
+            logger.debug(f"Invalidated all cached paths below '{self.root_path}'")
+            return
+
+        for path in paths:
+            key = os.path.abspath(path)  # noqa: PTH100
+            prefix = key.rstrip(os.sep) + os.sep
+            for cache in (
+                self.__entries,
+                self.__files,
+                self.__lookups,
+                self.__excluded,
+            ):
+                for cached_key in [
+                    cached_key
+                    for cached_key in cache
+                    if cached_key == key or cached_key.startswith(prefix)
+                ]:
+                    del cache[cached_key]
+
+            # Paths below the root are walked again, as files() must list them
+            if (
+                self.__is_walked
+                and self.__is_below_root(key)
+                and not self.__is_excluded(os.path.dirname(key))  # noqa: PTH120
+            ):
+                self.__walk(key)
+
+            logger.debug(f"Invalidated cached path '{key}'")
+
+    def __get_key(self, path: Path) -> str:
+        self.__walk_if_needed()
+
+        # Unlike Path.resolve(), this normalizes the path without accessing the filesystem
+        return os.path.abspath(path)  # noqa: PTH100
+
+    def __is_below_root(self, key: str) -> bool:
+        return key == self.__root_key or key.startswith(
+            self.__root_key.rstrip(os.sep) + os.sep,
+        )
+
+    def __lookup(self, key: str) -> os.stat_result | None:
+        if key not in self.__lookups:
+            try:
+                self.__lookups[key] = Path(key).stat()
+            except (OSError, ValueError):
+                self.__lookups[key] = None
+
+        return self.__lookups[key]
+
+    def __walk_if_needed(self) -> None:
+        if self.__is_walked:
+            return
+
+        start_time = time.perf_counter()
+        self.__is_walked = True
+        self.__walk(self.__root_key)
+        end_time = time.perf_counter()
+
+        logger.debug(
+            f"Scanned {len(self.__entries)} paths below '{self.root_path}' in {end_time - start_time:.2f} seconds",
+        )
+        if self.__excluded:
+            excluded_directory_count = sum(self.__excluded.values())
+            logger.info(
+                f"Excluded {len(self.__excluded)} paths below '{self.root_path}', of which {excluded_directory_count} directories were not scanned",
+            )
+
+    def __is_excluded(self, key: str) -> bool:
+        """Check if a path or one of its parents was excluded by the walk."""
+        if not self.__excluded:
+            return False
+
+        while key != self.__root_key and self.__is_below_root(key):
+            if key in self.__excluded:
+                return True
+            key = os.path.dirname(key)  # noqa: PTH120
+
+        return False
+
+    def __exclude_if_needed(self, key: str, is_dir: bool) -> bool:
+        """Check the path filter for a path found by the walk and remember it if it is excluded."""
+        if self.path_filter is None or not self.path_filter.is_excluded(key, is_dir):
+            return False
+
+        self.__excluded[key] = is_dir
+        logger.debug(f"Excluded '{key}'")
+        return True
+
+    def __walk(self, key: str) -> None:
+        """Add a path and everything below it to the cache."""
+        try:
+            mode = Path(key).stat().st_mode
+        except (OSError, ValueError):
+            return
+
+        if self.__exclude_if_needed(key, stat.S_ISDIR(mode)):
+            return
+
+        if stat.S_ISREG(mode):
+            self.__entries[key] = False
+            self.__files[key] = Path(key).resolve()
+            return
+        if not stat.S_ISDIR(mode):
+            return
+
+        self.__entries[key] = True
+
+        # Symlinked directories are not followed, like Path.rglob()
+        if Path(key).is_symlink() and key != self.__root_key:
+            return
+
+        directory_keys = [key]
+        while directory_keys:
+            directory_key = directory_keys.pop()
+            try:
+                with os.scandir(directory_key) as entries:
+                    for entry in entries:
+                        self.__add_entry(entry, directory_keys)
+            except OSError as e:
+                logger.debug(f"Could not scan '{directory_key}': {e}")
+
+    def __add_entry(self, entry: os.DirEntry, directory_keys: list[str]) -> None:
+        if self.__exclude_if_needed(entry.path, entry.is_dir()):
+            return
+
+        if entry.is_dir():
+            self.__entries[entry.path] = True
+            if not entry.is_symlink():
+                directory_keys.append(entry.path)
+        elif entry.is_file():
+            self.__entries[entry.path] = False
+            self.__files[entry.path] = (
+                Path(entry.path).resolve() if entry.is_symlink() else Path(entry.path)
+            )
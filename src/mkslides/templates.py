@@ -0,0 +1,93 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import logging
+from functools import cache
+
+import jinja2
+from jinja2 import (
+    BytecodeCache,
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    PackageLoader,
+    Template,
+    select_autoescape,
+)
+from jinja2.bccache import Bucket
+
+from mkslides.constants import (
+    DEFAULT_INDEX_TEMPLATE_NAME,
+    DEFAULT_SLIDESHOW_TEMPLATE_NAME,
+    TEMPLATES_PACKAGE_PATH,
+)
+from mkslides.utils import get_user_cache_path
+
+logger = logging.getLogger(__name__)
+
+# The environments are created when first needed, so commands that render
+# nothing do not compile the templates.
+
+
+class _TemplateBytecodeCache(FileSystemBytecodeCache):
+    """
+    Bytecode cache that keeps the compiled templates across builds.
+
+    Jinja2 only uses the cached bytecode of a template if the hash of its
+    source matches, so changed templates are compiled again. Failing to write
+    the cache, e.g. on a read-only filesystem, does not fail the build.
+    """
+
+    def dump_bytecode(self, bucket: Bucket) -> None:
+        try:
+            super().dump_bytecode(bucket)
+        except OSError as e:
+            logger.debug(f"Could not cache compiled template: {e!r}")
+
+
+@cache
+def get_bytecode_cache() -> BytecodeCache | None:
+    # Bytecode of another Jinja2 version may not be compatible
+    cache_path = get_user_cache_path() / f"jinja2-{jinja2.__version__}"
+    try:
+        cache_path.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        logger.debug(f"Compiled templates are not cached: {e!r}")
+        return None
+
+    logger.debug(f"Caching compiled templates in '{cache_path}'")
+    return _TemplateBytecodeCache(str(cache_path))
+
+
+@cache
+def get_default_environment() -> Environment:
+    return Environment(
+        loader=PackageLoader(__package__, TEMPLATES_PACKAGE_PATH),
+        autoescape=select_autoescape(),
+        bytecode_cache=get_bytecode_cache(),
+    )
+
+
+@cache
+def get_local_environment() -> Environment:
+    return Environment(
+        loader=FileSystemLoader("."),
+        autoescape=True,
+        bytecode_cache=get_bytecode_cache(),
+    )
+
+
+@cache
+def get_default_index_template() -> Template:
+    return get_default_environment().get_template(DEFAULT_INDEX_TEMPLATE_NAME)
+
+
+@cache
+def get_default_slideshow_template() -> Template:
+    return get_default_environment().get_template(DEFAULT_SLIDESHOW_TEMPLATE_NAME)
+
+
+def get_local_template(name: str) -> Template:
+    """Get a template relative to the working directory, reloaded when it changes."""
+    return get_local_environment().get_template(name)
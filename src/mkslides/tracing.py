@@ -0,0 +1,119 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import AbstractContextManager, nullcontext
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class _Span:
+    def __init__(self, tracer: "Tracer", name: str, args: dict[str, Any]) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.start_time = 0
+
+    def __enter__(self) -> None:
+        self.start_time = time.perf_counter_ns()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        end_time = time.perf_counter_ns()
+        self.tracer.add_event(self.name, self.start_time, end_time, self.args)
+
+
+class Tracer:
+    """
+    Record spans of a build in the Chrome trace event format.
+
+    The trace can be opened in https://ui.perfetto.dev or `chrome://tracing`.
+    Spans are only recorded if the tracer is enabled. A tracer sent to a
+    worker process starts without events, the events recorded there are
+    collected with `pop_events` and merged with `add_events`.
+    """
+
+    def __init__(self, *, enabled: bool = True) -> None:
+        self.enabled = enabled
+
+        # The performance counter is shared by all processes on the same machine
+        self.start_time = time.perf_counter_ns()
+        self.__events: list[dict[str, Any]] = []
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Exclude the recorded events, as they are only collected in the main process."""
+        state = self.__dict__.copy()
+        state["_Tracer__events"] = []
+        return state
+
+    def span(self, name: str, **args: Any) -> AbstractContextManager[None]:
+        """Record the duration of a block, with the keyword arguments shown as its details."""
+        if not self.enabled:
+            return nullcontext()
+
+        return _Span(self, name, args)
+
+    def add_event(
+        self,
+        name: str,
+        start_time: int,
+        end_time: int,
+        args: dict[str, Any],
+    ) -> None:
+        self.__events.append(
+            {
+                "name": name,
+                "ph": "X",
+                "ts": (start_time - self.start_time) / 1000,
+                "dur": (end_time - start_time) / 1000,
+                "pid": os.getpid(),
+                "tid": threading.get_native_id(),
+                "args": args,
+            },
+        )
+
+    def add_events(self, events: list[dict[str, Any]]) -> None:
+        self.__events.extend(events)
+
+    def pop_events(self) -> list[dict[str, Any]]:
+        """Return the events recorded since the last call and forget them."""
+        events = self.__events
+        self.__events = []
+        return events
+
+    def save(self, path: Path) -> None:
+        main_pid = os.getpid()
+        process_names = [
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": pid,
+                "args": {"name": "mkslides" if pid == main_pid else "mkslides worker"},
+            }
+            for pid in sorted({event["pid"] for event in self.__events} | {main_pid})
+        ]
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps(
+                {
+                    "traceEvents": process_names + self.__events,
+                    "displayTimeUnit": "ms",
+                },
+                default=str,
+            ),
+            encoding="utf-8",
+        )
+        logger.info(f"Wrote trace with {len(self.__events)} spans to '{path}'")
@@ -0,0 +1,204 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import json
+import logging
+import sqlite3
+import time
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+from functools import cache
+from importlib.metadata import version
+from pathlib import Path
+from typing import Any
+
+from mkslides.constants import VERSION
+from mkslides.linkscanner import LinkKind, LinkSpan
+from mkslides.manifest import hash_text
+from mkslides.utils import get_user_cache_path
+
+logger = logging.getLogger(__name__)
+
+TRANSFORMATION_CACHE_FILENAME = "transformations.sqlite3"
+
+# Least recently used entries are removed when the entries exceed this size
+TRANSFORMATION_CACHE_MAX_SIZE = 64 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class TransformedMarkdown:
+    """The frontmatter of a slideshow and its markdown after emojizing and preprocessing, with the relative links it contains."""
+
+    frontmatter_metadata: dict[str, object]
+    markdown_content: str
+    link_spans: tuple[LinkSpan, ...]
+    preprocess_script: str | None
+    preprocess_script_hash: str | None
+
+
+@cache
+def __get_library_versions() -> str:
+    # Read from the package metadata, as importing emoji loads its data
+    return f"mkslides {VERSION}, emoji {version('emoji')}, python-frontmatter {version('python-frontmatter')}"
+
+
+def get_transformation_key(content: str) -> str:
+    """
+    Get the key of the transformation of a markdown file with the given content.
+
+    The preprocess script is not part of the key, as it is only known after
+    parsing the frontmatter. It is stored with the transformation instead and
+    compared when the transformation is used.
+    """
+    return hash_text(f"{__get_library_versions()}\n{content}")
+
+
+class TransformationCache:
+    """
+    Cache of the transformed markdown of the slideshows, kept across builds in a SQLite database.
+
+    Each process opens its own connection when the cache is first used, so the
+    cache can be shared with the worker processes. The database is in WAL
+    mode, so these can read while another one writes. Failing to use the
+    cache, e.g. on a read-only filesystem, does not fail the build.
+    """
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        max_size: int = TRANSFORMATION_CACHE_MAX_SIZE,
+    ) -> None:
+        self.path = path or get_user_cache_path() / TRANSFORMATION_CACHE_FILENAME
+        self.max_size = max_size
+        self.connection: sqlite3.Connection | None = None
+        self.is_disabled = False
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Exclude the connection, as it cannot be sent to the worker processes."""
+        state = self.__dict__.copy()
+        state["connection"] = None
+        return state
+
+    def get(self, key: str) -> TransformedMarkdown | None:
+        row = self.__execute("SELECT value FROM transformations WHERE key = ?", (key,))
+        if row is None:
+            return None
+
+        try:
+            data = json.loads(row[0])
+            data["link_spans"] = tuple(
+                LinkSpan(link, LinkKind(kind), *positions)
+                for link, kind, *positions in data["link_spans"]
+            )
+            return TransformedMarkdown(**data)
+        except (ValueError, TypeError, KeyError):
+            logger.debug(f"Cached transformation '{key}' could not be read")
+            return None
+
+    def put(self, key: str, transformed_markdown: TransformedMarkdown) -> None:
+        data = asdict(transformed_markdown)
+        data["link_spans"] = [
+            [
+                link_span.link,
+                link_span.kind.value,
+                link_span.start,
+                link_span.end,
+                link_span.element_start,
+                link_span.element_end,
+            ]
+            for link_span in transformed_markdown.link_spans
+        ]
+        try:
+            value = json.dumps(data, ensure_ascii=False)
+            is_serializable = json.loads(value) == data
+        except (TypeError, ValueError):
+            is_serializable = False
+
+        if not is_serializable:
+            # E.g. dates or non-string keys in the frontmatter, which JSON
+            # cannot store or would read back differently
+            logger.debug(f"Transformation '{key}' cannot be cached")
+            return
+
+        self.__execute(
+            "INSERT OR REPLACE INTO transformations VALUES (?, ?, ?, ?)",
+            (key, value, len(value), time.time()),
+        )
+
+    def evict(self, used_keys: Iterable[str] = ()) -> None:
+        """
+        Mark the entries used by the build as used now and remove the least recently used entries until the entries fit the maximum size.
+
+        Reading an entry does not mark it as used, so cache hits do not write
+        to the database. The entries used by the build are marked all at once
+        here instead.
+        """
+        last_used = time.time()
+        self.__execute(
+            "UPDATE transformations SET last_used = ? WHERE key = ?",
+            [(last_used, key) for key in used_keys],
+        )
+        self.__execute(
+            """
+            DELETE FROM transformations WHERE key IN (
+                SELECT key FROM (
+                    SELECT key, SUM(size) OVER (ORDER BY last_used DESC) AS total_size
+                    FROM transformations
+                )
+                WHERE total_size > ?
+            )
+            """,
+            (self.max_size,),
+        )
+
+    def __execute(
+        self,
+        sql: str,
+        parameters: tuple[Any, ...] | list[tuple[Any, ...]],
+    ) -> Any:
+        """
+        Execute a statement in its own transaction and return the first row, or None if the cache cannot be used.
+
+        A list of parameters executes the statement once for each of them.
+        """
+        if self.is_disabled:
+            return None
+
+        try:
+            connection = self.__connect()
+            with connection:
+                if isinstance(parameters, list):
+                    connection.executemany(sql, parameters)
+                    return None
+
+                rows = connection.execute(sql, parameters).fetchall()
+                return rows[0] if rows else None
+        except (OSError, sqlite3.Error) as e:
+            logger.debug(f"Transformed markdown is not cached: {e!r}")
+            self.is_disabled = True
+            return None
+
+    def __connect(self) -> sqlite3.Connection:
+        if self.connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS transformations (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_used REAL NOT NULL
+                )
+                """,
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS transformations_last_used ON transformations (last_used)",
+            )
+            self.connection = connection
+            logger.debug(f"Caching transformed markdown in '{self.path}'")
+
+        return self.connection
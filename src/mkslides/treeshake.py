@@ -0,0 +1,83 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import logging
+import posixpath
+import re
+from pathlib import Path
+
+from mkslides.assetstrategy import AssetStrategy, install_file
+from mkslides.urltype import URLType
+from mkslides.utils import get_url_type
+
+logger = logging.getLogger(__name__)
+
+CSS_COMMENT_REGEX = re.compile(r"/\*.*?\*/", re.DOTALL)
+CSS_REFERENCE_REGEX = re.compile(
+    r"""
+    @import\s+
+        (?P<import_delimiter>['\"])             # Delimiter
+        (?P<import_location>[^'\"]+)            # Location of the imported stylesheet
+        (?P=import_delimiter)                   # Delimiter
+    |
+    \burl\(\s*
+        (?P<url_delimiter>['\"]?)               # Optional delimiter
+        (?P<url_location>[^'\"()]+?)            # Location of the file, e.g. a font
+        (?P=url_delimiter)
+    \s*\)
+    """,
+    re.VERBOSE,
+)
+
+
+def find_css_references(content: str) -> set[str]:
+    """Find the relative locations of the files referenced by a stylesheet, without their query or fragment."""
+    references = set()
+    for match in CSS_REFERENCE_REGEX.finditer(CSS_COMMENT_REGEX.sub("", content)):
+        location = match["import_location"] or match["url_location"]
+        location = location.split("#", 1)[0].split("?", 1)[0].strip()
+        if location and get_url_type(location) == URLType.RELATIVE:
+            references.add(location)
+
+    return references
+
+
+def install_referenced_files(
+    source_root_path: Path,
+    destination_root_path: Path,
+    relative_path: str,
+    strategy: AssetStrategy,
+) -> None:
+    """
+    Install a file of an asset tree with the files it references, unless they are already installed.
+
+    The references of stylesheets are followed, so a theme is installed with
+    the stylesheets it imports and the fonts and images these use.
+    """
+    pending_paths = [relative_path]
+    visited_paths = set()
+    while pending_paths:
+        path = pending_paths.pop()
+        if path in visited_paths:
+            continue
+        visited_paths.add(path)
+
+        source_path = source_root_path / path
+        if not source_path.is_file():
+            logger.debug(f"Referenced asset '{source_path}' is not found, skipping")
+            continue
+
+        destination_path = destination_root_path / path
+        if not destination_path.exists():
+            install_file(source_path, destination_path, strategy)
+
+        if source_path.suffix == ".css":
+            for reference in find_css_references(
+                source_path.read_text(encoding="utf-8"),
+            ):
+                reference_path = posixpath.normpath(
+                    posixpath.join(posixpath.dirname(path), reference),
+                )
+                if not reference_path.startswith("../"):
+                    pending_paths.append(reference_path)
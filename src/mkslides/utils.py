@@ -2,9 +2,12 @@
 #
 # SPDX-License-Identifier: MIT
 
+import os
+import sys
 from pathlib import Path
 from urllib.parse import urlparse
 
+from mkslides.constants import CACHE_DIR_ENV_VAR, CACHE_DIRNAME
 from mkslides.urltype import URLType
 
 
@@ -38,3 +41,21 @@ def get_url_type(url: str) -> URLType:
         return URLType.ABSOLUTE
 
     return URLType.RELATIVE
+
+
+def get_user_cache_path() -> Path:
+    """Get the directory for caches that are kept across builds, following the conventions of the platform."""
+    if cache_dir := os.environ.get(CACHE_DIR_ENV_VAR):
+        return Path(cache_dir)
+
+    if sys.platform == "win32":
+        local_app_data = os.environ.get("LOCALAPPDATA")
+        base_path = Path(local_app_data) if local_app_data else Path.home()
+        return base_path / CACHE_DIRNAME / "Cache"
+
+    if sys.platform == "darwin":
+        return Path.home() / "Library" / "Caches" / CACHE_DIRNAME
+
+    xdg_cache_home = os.environ.get("XDG_CACHE_HOME")
+    base_path = Path(xdg_cache_home) if xdg_cache_home else Path.home() / ".cache"
+    return base_path / CACHE_DIRNAME
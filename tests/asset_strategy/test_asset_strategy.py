@@ -0,0 +1,76 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from tests.utils import (
+    assert_file_does_not_exist,
+    assert_file_exist,
+    run_build_strict,
+)
+
+
+@pytest.mark.parametrize("strategy", ["copy", "hardlink", "symlink", "reflink"])
+def test_asset_strategy(setup_paths: Any, tmp_path: Path, strategy: str) -> None:
+    cwd, _ = setup_paths
+    input_path = cwd / "baseline" / "slides"
+    output_path = tmp_path / "site"
+    run_build_strict(cwd, input_path, output_path, None, ["--asset-strategy", strategy])
+
+    assert_file_exist(output_path / "mkslides-assets/reveal-js/dist/reveal.css")
+    assert_file_exist(output_path / "mkslides-assets/reveal-js/dist/theme/black.css")
+    assert_file_exist(output_path / "mkslides-assets/highlight-js-themes/monokai.css")
+
+    is_symlink = (output_path / "mkslides-assets/reveal-js").is_symlink()
+    assert is_symlink == (strategy == "symlink")
+
+    version_stamp = json.loads(
+        (output_path / "mkslides-assets/.mkslides-assets-version.json").read_text(),
+    )
+    assert version_stamp["asset_strategy"] == strategy
+
+
+def test_assets_are_not_installed_again_when_up_to_date(
+    setup_paths: Any,
+    tmp_path: Path,
+) -> None:
+    cwd, _ = setup_paths
+    input_path = cwd / "baseline" / "slides"
+    output_path = tmp_path / "site"
+    run_build_strict(cwd, input_path, output_path, None)
+
+    revealjs_css_path = output_path / "mkslides-assets/reveal-js/dist/reveal.css"
+    revealjs_css_mtime = revealjs_css_path.stat().st_mtime_ns
+    stray_file_path = output_path / "stray-file.txt"
+    stray_file_path.write_text("stray")
+
+    run_build_strict(cwd, input_path, output_path, None)
+
+    assert revealjs_css_path.stat().st_mtime_ns == revealjs_css_mtime
+    assert_file_does_not_exist(stray_file_path)
+    assert_file_exist(output_path / "someslides-1.html")
+
+
+def test_assets_are_installed_again_when_strategy_changes(
+    setup_paths: Any,
+    tmp_path: Path,
+) -> None:
+    cwd, _ = setup_paths
+    input_path = cwd / "baseline" / "slides"
+    output_path = tmp_path / "site"
+    run_build_strict(
+        cwd,
+        input_path,
+        output_path,
+        None,
+        ["--asset-strategy", "symlink"],
+    )
+    run_build_strict(cwd, input_path, output_path, None, ["--asset-strategy", "copy"])
+
+    assert not (output_path / "mkslides-assets/reveal-js").is_symlink()
+    assert_file_exist(output_path / "mkslides-assets/reveal-js/dist/reveal.css")
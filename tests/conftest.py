@@ -9,6 +9,19 @@ from pathlib import Path
 
 import pytest
 
+from mkslides.constants import CACHE_DIR_ENV_VAR
+
+
+@pytest.fixture(autouse=True)
+def user_cache_path(
+    tmp_path_factory: pytest.TempPathFactory,
+    monkeypatch: pytest.MonkeyPatch,
+) -> Path:
+    """Use an empty cache directory for each test instead of the cache of the user."""
+    cache_path = tmp_path_factory.mktemp("cache")
+    monkeypatch.setenv(CACHE_DIR_ENV_VAR, str(cache_path))
+    return cache_path
+
 
 @pytest.fixture(scope="module")
 def setup_paths() -> Generator[tuple[Path, Path]]:
@@ -0,0 +1,91 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import os
+from pathlib import Path
+
+from mkslides.copyengine import (
+    CONCURRENT_COPY_MIN_SIZE,
+    CopyStatistics,
+    copy_files,
+    format_size,
+)
+from tests.utils import run_build_strict
+
+
+def test_unchanged_files_are_not_copied_again(tmp_path: Path) -> None:
+    input_path = tmp_path / "slides"
+    (input_path / "data").mkdir(parents=True)
+    (input_path / "someslides-1.md").write_text("# Slides 1\n")
+    (input_path / "someslides-2.md").write_text("# Slides 2\n")
+    (input_path / "data" / "unchanged.csv").write_text("a,b\n")
+    (input_path / "data" / "changed.csv").write_text("a,b\n")
+    output_path = tmp_path / "site"
+    extra_args = ["--incremental"]
+    run_build_strict(tmp_path, input_path, output_path, None, extra_args)
+
+    unchanged_path = output_path / "data" / "unchanged.csv"
+    changed_path = output_path / "data" / "changed.csv"
+    assert unchanged_path.stat().st_mtime_ns == (
+        (input_path / "data" / "unchanged.csv").stat().st_mtime_ns
+    )
+    unchanged_inode = unchanged_path.stat().st_ino
+    (input_path / "data" / "changed.csv").write_text("c,d\n")
+
+    run_build_strict(tmp_path, input_path, output_path, None, extra_args)
+    assert unchanged_path.stat().st_ino == unchanged_inode
+    assert changed_path.read_text() == "c,d\n"
+
+    # Files with the same size and modification time are only copied again
+    # when they are compared by content
+    source_path = input_path / "data" / "unchanged.csv"
+    source_stat = source_path.stat()
+    source_path.write_text("e,f\n")
+    os.utime(source_path, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+    run_build_strict(tmp_path, input_path, output_path, None, extra_args)
+    assert unchanged_path.read_text() == "a,b\n"
+    run_build_strict(
+        tmp_path,
+        input_path,
+        output_path,
+        None,
+        [*extra_args, "--checksum"],
+    )
+    assert unchanged_path.read_text() == "e,f\n"
+
+
+def test_copy_files(tmp_path: Path) -> None:
+    source_path = tmp_path / "source"
+    source_path.mkdir()
+    (source_path / "small.txt").write_text("small\n")
+    (source_path / "large.bin").write_bytes(os.urandom(CONCURRENT_COPY_MIN_SIZE))
+    destination_path = tmp_path / "destination"
+    files = [
+        (source_path / name, destination_path / "nested" / name)
+        for name in ["small.txt", "large.bin"]
+    ]
+
+    copied_paths, statistics = copy_files(files)
+    assert sorted(copied_paths) == sorted(path for _, path in files)
+    assert statistics == CopyStatistics(2, CONCURRENT_COPY_MIN_SIZE + 6, 0, 0)
+    for source, destination in files:
+        assert destination.read_bytes() == source.read_bytes()
+        assert destination.stat().st_mtime_ns == source.stat().st_mtime_ns
+
+    copied_paths, statistics = copy_files(files, checksum=True)
+    assert not copied_paths
+    assert statistics == CopyStatistics(0, 0, 2, CONCURRENT_COPY_MIN_SIZE + 6)
+
+    # No temporary files are left behind
+    assert sorted(path.name for path in (destination_path / "nested").iterdir()) == [
+        "large.bin",
+        "small.txt",
+    ]
+
+
+def test_format_size() -> None:
+    assert format_size(0) == "0 B"
+    assert format_size(1023) == "1023 B"
+    assert format_size(1536) == "1.5 KiB"
+    assert format_size(3 * 1024**3) == "3.0 GiB"
@@ -0,0 +1,341 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import base64
+import hashlib
+import os
+import shutil
+import time
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any
+
+import pytest
+from watchdog.events import (
+    DirCreatedEvent,
+    FileCreatedEvent,
+    FileDeletedEvent,
+    FileModifiedEvent,
+    FileMovedEvent,
+)
+
+from mkslides.config import get_config
+from mkslides.devserver import (
+    RELOAD_PATH,
+    RELOAD_SCRIPT,
+    WEBSOCKET_GUID,
+    WEBSOCKET_OPCODE_CLOSE,
+    WEBSOCKET_OPCODE_PING,
+    WEBSOCKET_OPCODE_PONG,
+    WEBSOCKET_OPCODE_TEXT,
+    DevServer,
+    read_websocket_frame,
+)
+from mkslides.filewatcher import FileWatcher, NotifyingFileWatcher
+from mkslides.markupgenerator import MarkupGenerator
+from mkslides.outputstore import OutputStore
+from mkslides.pathfilter import PathFilter
+
+
+async def request(
+    port: int,
+    path: str,
+    method: str = "GET",
+) -> tuple[int, dict[str, str], bytes]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode(),
+    )
+    response = await reader.read()
+    writer.close()
+
+    head, _, body = response.partition(b"\r\n\r\n")
+    status_line, *header_lines = head.decode().split("\r\n")
+    headers = dict(line.split(": ", 1) for line in header_lines)
+    return int(status_line.split()[1]), headers, body
+
+
+async def connect(
+    port: int,
+    page: str,
+) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    key = base64.b64encode(os.urandom(16)).decode()
+    writer.write(
+        (
+            f"GET {RELOAD_PATH}?page={page} HTTP/1.1\r\n"
+            "Host: localhost\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\n"
+            "Sec-WebSocket-Version: 13\r\n\r\n"
+        ).encode(),
+    )
+
+    head = await reader.readuntil(b"\r\n\r\n")
+    accept = base64.b64encode(
+        hashlib.sha1((key + WEBSOCKET_GUID).encode(), usedforsecurity=False).digest(),
+    ).decode()
+    assert head.startswith(b"HTTP/1.1 101 ")
+    assert f"Sec-WebSocket-Accept: {accept}".encode() in head
+
+    return reader, writer
+
+
+def send_frame(writer: asyncio.StreamWriter, opcode: int, payload: bytes) -> None:
+    """Send a masked frame, as browsers do."""
+    mask = os.urandom(4)
+    masked_payload = bytes(byte ^ mask[index % 4] for index, byte in enumerate(payload))
+    writer.write(bytes([0x80 | opcode, 0x80 | len(payload)]) + mask + masked_payload)
+
+
+async def is_reloaded(reader: asyncio.StreamReader) -> bool:
+    try:
+        frame = await asyncio.wait_for(read_websocket_frame(reader), timeout=0.2)
+    except TimeoutError:
+        return False
+
+    assert frame == (WEBSOCKET_OPCODE_TEXT, b"reload")
+    return True
+
+
+def test_dev_server_serves_output_store(tmp_path: Path) -> None:
+    output_store = OutputStore(max_file_size=4)
+    output_store.write("index.html", b"<html><head></head>index</html>")
+    output_store.write("folder/index.html", b"<html>folder</html>")
+    (tmp_path / "large.png").write_bytes(b"large image")
+    output_store.add_file("img/large.png", tmp_path / "large.png")
+
+    async def run() -> None:
+        server = DevServer("127.0.0.1", 0, output_store=output_store)
+        await server.start()
+
+        status, headers, body = await request(server.port, "/")
+        assert status == HTTPStatus.OK
+        assert headers["Content-Type"] == "text/html"
+        assert body == b"<html><head>" + RELOAD_SCRIPT + b"</head>index</html>"
+
+        status, headers, body = await request(server.port, "/img/large.png")
+        assert status == HTTPStatus.OK
+        assert headers["Content-Type"] == "image/png"
+        assert body == b"large image"
+
+        status, headers, body = await request(server.port, "/img/large.png", "HEAD")
+        assert status == HTTPStatus.OK
+        assert headers["Content-Length"] == str(len(b"large image"))
+        assert body == b""
+
+        status, headers, _ = await request(server.port, "/folder")
+        assert status == HTTPStatus.MOVED_PERMANENTLY
+        assert headers["Location"] == "/folder/"
+        assert RELOAD_SCRIPT in (await request(server.port, "/folder/"))[2]
+
+        assert (await request(server.port, "/missing.html"))[0] == HTTPStatus.NOT_FOUND
+        assert (await request(server.port, "/../../etc/passwd"))[
+            0
+        ] == HTTPStatus.NOT_FOUND
+        assert (await request(server.port, "/", "POST"))[
+            0
+        ] == HTTPStatus.METHOD_NOT_ALLOWED
+
+        await server.stop()
+
+    asyncio.run(run())
+
+
+def test_dev_server_serves_output_directory(tmp_path: Path) -> None:
+    (tmp_path / "site" / "deck").mkdir(parents=True)
+    (tmp_path / "site" / "deck" / "index.html").write_text("<p>Deck</p>")
+    (tmp_path / "secret.txt").write_text("secret")
+
+    async def run() -> None:
+        server = DevServer("127.0.0.1", 0, output_path=tmp_path / "site")
+        await server.start()
+
+        status, _, body = await request(server.port, "/deck/")
+        assert status == HTTPStatus.OK
+        assert body == b"<p>Deck</p>" + RELOAD_SCRIPT
+        assert (await request(server.port, "/../secret.txt"))[0] == HTTPStatus.NOT_FOUND
+        assert (await request(server.port, "/%2E%2E/secret.txt"))[
+            0
+        ] == HTTPStatus.NOT_FOUND
+
+        await server.stop()
+
+    asyncio.run(run())
+
+
+def test_dev_server_reloads_affected_clients() -> None:
+    async def run() -> None:
+        server = DevServer("127.0.0.1", 0, output_store=OutputStore())
+        server.dependencies = {
+            "a.html": {"img/a.png"},
+            "folder/b.html": {"img/b.png"},
+        }
+        await server.start()
+
+        reader_a, writer_a = await connect(server.port, "/a.html")
+        reader_b, writer_b = await connect(server.port, "/folder/b.html")
+        reader_index, writer_index = await connect(server.port, "/")
+
+        # A changed asset only reloads the pages that depend on it
+        assert await server.notify({"img/a.png"}) == 1
+        assert await is_reloaded(reader_a)
+        assert not await is_reloaded(reader_b)
+        assert not await is_reloaded(reader_index)
+
+        # A changed page only reloads the clients showing it
+        assert await server.notify({"index.html", "c.html"}) == 1
+        assert await is_reloaded(reader_index)
+        assert not await is_reloaded(reader_a)
+
+        readers = [reader_a, reader_b, reader_index]
+        assert await server.notify(None) == len(readers)
+        for reader in readers:
+            assert await is_reloaded(reader)
+
+        send_frame(writer_a, WEBSOCKET_OPCODE_PING, b"ping")
+        assert await read_websocket_frame(reader_a) == (WEBSOCKET_OPCODE_PONG, b"ping")
+
+        # Disconnected clients are no longer reloaded
+        send_frame(writer_a, WEBSOCKET_OPCODE_CLOSE, b"\x03\xe8")
+        assert (await read_websocket_frame(reader_a))[0] == WEBSOCKET_OPCODE_CLOSE
+        writer_b.close()
+        await asyncio.sleep(0.1)
+        assert await server.notify(None) == 1
+
+        writer_a.close()
+        writer_index.close()
+        await server.stop()
+
+    asyncio.run(run())
+
+
+def test_output_dependencies(setup_paths: Any, tmp_path: Path) -> None:
+    cwd, _ = setup_paths
+    input_path = tmp_path / "slides"
+    shutil.copytree(cwd / "images" / "slides", input_path)
+
+    markup_generator = MarkupGenerator(
+        get_config(),
+        input_path,
+        tmp_path / "site",
+        strict=True,
+        incremental=True,
+        output_store=OutputStore(),
+    )
+    markup_generator.process_markdown()
+
+    dependencies = markup_generator.get_output_dependencies()
+    assert {
+        "img/example-1.png",
+        "somefolder/example-2.png",
+        "img/somefolder/example-3.png",
+        "example-4.png",
+    } <= dependencies["somefolder/someslides-2.html"]
+
+    image_path = input_path / "img" / "example-1.png"
+    image_path.write_bytes(b"changed")
+    markup_generator.process_changes({image_path})
+    assert markup_generator.changed_outputs == {"img/example-1.png"}
+
+
+@pytest.mark.parametrize("is_file", [True, False])
+def test_file_watcher(tmp_path: Path, is_file: bool) -> None:
+    watched_path = tmp_path / "watched.md" if is_file else tmp_path / "slides"
+    changed_path = watched_path if is_file else watched_path / "folder" / "a.md"
+    changed_path.parent.mkdir(parents=True, exist_ok=True)
+    changed_path.write_text("a")
+
+    watcher = FileWatcher([watched_path])
+    assert watcher.poll() == set()
+
+    changed_path.write_text("changed")
+    assert watcher.poll() == {changed_path}
+    assert watcher.poll() == set()
+
+    changed_path.unlink()
+    assert watcher.poll() == {changed_path}
+
+    if not is_file:
+        added_path = watched_path / "b.md"
+        added_path.write_text("b")
+        assert watcher.poll() == {added_path}
+
+
+def wait_for_changes(watcher: NotifyingFileWatcher, expected: set[Path]) -> None:
+    """Poll until the expected changes are notified, which can take a few notifications."""
+    changed_paths: set[Path] = set()
+    deadline = time.monotonic() + 5
+    while changed_paths != expected and time.monotonic() < deadline:
+        time.sleep(0.01)
+        changed_paths.update(watcher.poll())
+    assert changed_paths == expected
+
+
+@pytest.mark.parametrize("is_file", [True, False])
+def test_notifying_file_watcher(tmp_path: Path, is_file: bool) -> None:
+    watched_path = tmp_path / "watched.md" if is_file else tmp_path / "slides"
+    changed_path = watched_path if is_file else watched_path / "folder" / "a.md"
+    changed_path.parent.mkdir(parents=True, exist_ok=True)
+    changed_path.write_text("a")
+    (tmp_path / "other.md").write_text("other")
+
+    notified_times: list[float] = []
+    watcher = NotifyingFileWatcher(
+        [watched_path],
+        on_change=lambda: notified_times.append(time.monotonic()),
+    )
+    try:
+        assert watcher.poll() == set()
+
+        change_time = time.monotonic()
+        changed_path.write_text("changed")
+        wait_for_changes(watcher, {changed_path})
+        assert notified_times[0] - change_time < 1
+
+        # Files next to a watched file are not watched
+        (tmp_path / "other.md").write_text("changed")
+        changed_path.unlink()
+        wait_for_changes(watcher, {changed_path})
+
+        if not is_file:
+            added_path = watched_path / "b.md"
+            added_path.write_text("b")
+            wait_for_changes(watcher, {added_path})
+    finally:
+        watcher.close()
+
+
+def test_notifying_file_watcher_events(tmp_path: Path) -> None:
+    watched_path = tmp_path / "slides"
+    watched_path.mkdir()
+    watcher = NotifyingFileWatcher(
+        [watched_path],
+        PathFilter(watched_path, ["drafts/"]),
+    )
+    watcher.close()
+
+    # A temporary file moved over the saved file is not a change
+    temporary_key = str(watched_path / ".a.md.swp")
+    saved_key = str(watched_path / "a.md")
+    watcher.on_any_event(FileCreatedEvent(temporary_key))
+    watcher.on_any_event(FileModifiedEvent(temporary_key))
+    watcher.on_any_event(FileMovedEvent(temporary_key, saved_key))
+    assert watcher.poll() == {Path(saved_key)}
+
+    # A removed file stays changed when it is created again
+    watcher.on_any_event(FileDeletedEvent(saved_key))
+    watcher.on_any_event(FileCreatedEvent(saved_key))
+    watcher.on_any_event(FileDeletedEvent(saved_key))
+    assert watcher.poll() == {Path(saved_key)}
+
+    # Excluded paths and paths below them are ignored, directories are not
+    watcher.on_any_event(DirCreatedEvent(str(watched_path / "drafts")))
+    watcher.on_any_event(FileCreatedEvent(str(watched_path / "drafts" / "b.md")))
+    watcher.on_any_event(FileCreatedEvent(str(watched_path / ".git" / "HEAD")))
+    watcher.on_any_event(DirCreatedEvent(str(watched_path / "folder")))
+    watcher.on_any_event(FileCreatedEvent(str(tmp_path / "other.md")))
+    assert watcher.poll() == {watched_path / "folder"}
@@ -0,0 +1,176 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import re
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from mkslides.pathfilter import PathFilter, compile_exclude_pattern
+from mkslides.statcache import StatCache
+from tests.utils import assert_file_does_not_exist, assert_file_exist, run_build_strict
+
+
+def create_files(root_path: Path, *relative_paths: str) -> None:
+    for relative_path in relative_paths:
+        path = root_path / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"# {relative_path}\n")
+
+
+@pytest.mark.parametrize(
+    ("pattern", "relative_path", "is_dir", "expected"),
+    [
+        ("node_modules/", "node_modules", True, True),
+        ("node_modules/", "a/node_modules", True, True),
+        ("node_modules/", "node_modules", False, False),
+        ("*.tmp", "a/b/c.tmp", False, True),
+        ("*.tmp", "a/b/c.tmp.md", False, False),
+        ("/draft.md", "draft.md", False, True),
+        ("/draft.md", "a/draft.md", False, False),
+        ("drafts/*.md", "drafts/a.md", False, True),
+        ("drafts/*.md", "drafts/a/b.md", False, False),
+        ("drafts/*.md", "a/drafts/b.md", False, False),
+        ("**/data/*.csv", "a/b/data/c.csv", False, True),
+        ("**/data/*.csv", "data/c.csv", False, True),
+        ("data/**", "data/a/b.csv", False, True),
+        ("a/**/b", "a/x/y/b", False, True),
+        ("a/**/b", "a/b", False, True),
+        ("file?.md", "file1.md", False, True),
+        ("file?.md", "file10.md", False, False),
+        ("file[0-9].md", "file5.md", False, True),
+        ("file[!0-9].md", "file5.md", False, False),
+        ("\\#notes.md", "#notes.md", False, True),
+        ("*.MD", "a.md", False, False),
+    ],
+)
+def test_exclude_pattern(
+    pattern: str,
+    relative_path: str,
+    is_dir: bool,
+    expected: bool,
+) -> None:
+    rule = compile_exclude_pattern(pattern)
+    assert rule is not None
+    is_match = (is_dir or not rule.is_directory_only) and bool(
+        rule.regex.match(relative_path),
+    )
+
+    assert is_match == expected
+
+
+@pytest.mark.parametrize("pattern", ["", "   ", "# comment", "/"])
+def test_exclude_pattern_ignored(pattern: str) -> None:
+    assert compile_exclude_pattern(pattern) is None
+
+
+def test_path_filter_prunes_walk(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    root_path = tmp_path / "slides"
+    create_files(
+        root_path,
+        "a.md",
+        "draft.md",
+        "node_modules/package/index.js",
+        "images/a.png",
+        "images/a.psd",
+        "images/keep.psd",
+    )
+
+    scandir_calls: list[str] = []
+    original_scandir = os.scandir
+
+    def scandir(path: Any) -> Any:
+        scandir_calls.append(str(path))
+        return original_scandir(path)
+
+    monkeypatch.setattr(os, "scandir", scandir)
+
+    stat_cache = StatCache(
+        root_path,
+        PathFilter(
+            root_path,
+            ["node_modules/", "/draft.md", "*.psd", "!keep.psd"],
+        ),
+    )
+
+    assert sorted(stat_cache.files()) == [
+        root_path / "a.md",
+        root_path / "images" / "a.png",
+        root_path / "images" / "keep.psd",
+    ]
+    assert str(root_path / "node_modules") not in scandir_calls
+    assert not stat_cache.exists(root_path / "draft.md")
+    assert not stat_cache.is_file(root_path / "node_modules" / "package" / "index.js")
+    assert not stat_cache.is_dir(root_path / "node_modules")
+
+
+def test_path_filter_uses_gitignore(tmp_path: Path) -> None:
+    repository_path = tmp_path / "repository"
+    (repository_path / ".git").mkdir(parents=True)
+    (repository_path / ".gitignore").write_text("*.log\n/slides/build/\n")
+    root_path = repository_path / "slides"
+    create_files(
+        root_path,
+        "a.md",
+        "a.log",
+        "build/a.html",
+        "folder/b.md",
+        "folder/secret.txt",
+        "folder/important.log",
+    )
+    (root_path / "folder" / ".gitignore").write_text("secret.txt\n!important.log\n")
+
+    stat_cache = StatCache(root_path, PathFilter(root_path, use_gitignore=True))
+    assert sorted(path.name for path in stat_cache.files()) == [
+        ".gitignore",
+        "a.md",
+        "b.md",
+        "important.log",
+    ]
+
+    # Without .gitignore support only the exclude patterns are used
+    stat_cache = StatCache(root_path, PathFilter(root_path))
+    assert len(stat_cache.files()) == len(list(root_path.rglob("*.*")))
+
+    # A changed .gitignore file changes the excluded paths
+    stat_cache = StatCache(root_path, PathFilter(root_path, use_gitignore=True))
+    assert len(stat_cache.files()) == 4  # noqa: PLR2004
+    (root_path / "folder" / ".gitignore").write_text("")
+    stat_cache.invalidate([root_path / "folder" / ".gitignore"])
+    assert root_path / "folder" / "secret.txt" in stat_cache.files()
+
+
+def test_build_excludes_paths(setup_paths: Any, tmp_path: Path) -> None:
+    cwd, _ = setup_paths
+    input_path = tmp_path / "slides"
+    output_path = tmp_path / "site"
+    create_files(
+        input_path,
+        "a.md",
+        "b.md",
+        "drafts/draft.md",
+        ".git/HEAD",
+        "node_modules/package/index.js",
+        "notes.tmp",
+    )
+    (input_path / ".gitignore").write_text("*.tmp\n")
+    config_path = tmp_path / "mkslides.yml"
+    config_path.write_text(
+        "exclude:\n    - node_modules/\n    - drafts/\ngitignore: true\n",
+    )
+
+    result = run_build_strict(cwd, input_path, output_path, config_path)
+
+    assert_file_exist(output_path / "a.html")
+    assert_file_exist(output_path / "b.html")
+    assert_file_does_not_exist(output_path / "drafts")
+    assert_file_does_not_exist(output_path / ".git")
+    assert_file_does_not_exist(output_path / "node_modules")
+    assert_file_does_not_exist(output_path / "notes.tmp")
+    assert re.search(r"Excluded\s+4\s+paths", result.stdout), result.stdout
@@ -0,0 +1,114 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import json
+from pathlib import Path
+
+from mkslides.fingerprint import FINGERPRINT_LENGTH
+from mkslides.manifest import hash_file
+from tests.utils import (
+    assert_html_contains,
+    assert_html_does_not_contain,
+    run_build_strict,
+)
+
+
+def setup_repository(tmp_path: Path) -> tuple[Path, Path]:
+    input_path = tmp_path / "slides"
+    (input_path / "img").mkdir(parents=True)
+    (input_path / "img" / "logo.png").write_bytes(b"logo")
+    (input_path / "index.css").write_text("body { color: red; }\n")
+    (input_path / "someslides-1.md").write_text(
+        "# Slides 1\n\n![Logo](img/logo.png)\n\n[Slides 2](someslides-2.md)\n",
+    )
+    (input_path / "someslides-2.md").write_text("# Slides 2\n")
+
+    config_path = tmp_path / "mkslides.yml"
+    config_path.write_text("index:\n  theme: index.css\n")
+
+    return input_path, config_path
+
+
+def get_fingerprinted_name(path: Path) -> str:
+    return f"{path.stem}.{hash_file(path)[:FINGERPRINT_LENGTH]}{path.suffix}"
+
+
+def test_fingerprint(tmp_path: Path) -> None:
+    input_path, config_path = setup_repository(tmp_path)
+    output_path = tmp_path / "site"
+    run_build_strict(
+        tmp_path,
+        input_path,
+        output_path,
+        config_path,
+        extra_args=["--fingerprint"],
+    )
+
+    fingerprints = json.loads((output_path / "fingerprints.json").read_text())
+    for output_key, fingerprinted_output_key in fingerprints.items():
+        # The originals are kept next to their fingerprinted copies
+        original_path = output_path / output_key
+        fingerprinted_path = output_path / fingerprinted_output_key
+        assert fingerprinted_path.name == get_fingerprinted_name(original_path)
+        assert fingerprinted_path.read_bytes() == original_path.read_bytes()
+
+    logo_name = get_fingerprinted_name(input_path / "img" / "logo.png")
+    assert fingerprints["img/logo.png"] == f"img/{logo_name}"
+    assert "mkslides-assets/reveal-js/dist/reveal.js" in fingerprints
+    assert "mkslides-assets/reveal-js/dist/theme/black.css" in fingerprints
+    assert "mkslides-assets/highlight-js-themes/monokai.css" in fingerprints
+
+    slides_path = output_path / "someslides-1.html"
+    assert_html_contains(slides_path, f"![Logo](img/{logo_name})")
+    assert_html_contains(slides_path, "[Slides 2](someslides-2.html)")
+    for output_key in [
+        "mkslides-assets/reveal-js/dist/reveal.css",
+        "mkslides-assets/reveal-js/dist/reveal.js",
+        "mkslides-assets/reveal-js/dist/theme/black.css",
+        "mkslides-assets/highlight-js-themes/monokai.css",
+    ]:
+        assert_html_contains(slides_path, f'"{fingerprints[output_key]}"')
+        assert_html_does_not_contain(slides_path, f'"{output_key}"')
+
+    index_css_name = get_fingerprinted_name(input_path / "index.css")
+    assert_html_contains(output_path / "index.html", f'href="{index_css_name}"')
+
+
+def test_fingerprint_incremental(tmp_path: Path) -> None:
+    input_path, config_path = setup_repository(tmp_path)
+    output_path = tmp_path / "site"
+    extra_args = ["--fingerprint", "--incremental"]
+    run_build_strict(tmp_path, input_path, output_path, config_path, extra_args)
+
+    unchanged_mtime = (output_path / "someslides-2.html").stat().st_mtime_ns
+    old_logo_name = get_fingerprinted_name(input_path / "img" / "logo.png")
+    (input_path / "img" / "logo.png").write_bytes(b"new logo")
+    new_logo_name = get_fingerprinted_name(input_path / "img" / "logo.png")
+
+    # Only the slideshow linking to the changed image is rendered again
+    run_build_strict(tmp_path, input_path, output_path, config_path, extra_args)
+    assert (output_path / "someslides-2.html").stat().st_mtime_ns == unchanged_mtime
+    slides_path = output_path / "someslides-1.html"
+    assert_html_contains(slides_path, f"![Logo](img/{new_logo_name})")
+
+    # The copy of the previous content is removed
+    assert (output_path / "img" / new_logo_name).exists()
+    assert not (output_path / "img" / old_logo_name).exists()
+
+    # Without fingerprinting everything is rendered again
+    run_build_strict(
+        tmp_path,
+        input_path,
+        output_path,
+        config_path,
+        ["--incremental"],
+    )
+    assert_html_contains(slides_path, "![Logo](img/logo.png)")
+    assert_html_contains(slides_path, '"mkslides-assets/reveal-js/dist/reveal.js"')
+
+    # The fingerprinted copies of the previous build are removed
+    assert not (output_path / "fingerprints.json").exists()
+    assert not (output_path / "img" / new_logo_name).exists()
+    assert not list(output_path.glob("mkslides-assets/reveal-js/dist/reveal.*.js"))
+    assert (output_path / "img" / "logo.png").exists()
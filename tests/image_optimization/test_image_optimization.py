@@ -0,0 +1,186 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+from pathlib import Path
+
+import pytest
+
+from mkslides.imageoptimizer import get_picture_insertions, get_srcset
+from mkslides.linkscanner import find_link_spans, replace_spans
+from tests.utils import assert_html_contains, run_build_strict
+
+CONFIG = """
+images:
+  optimize: true
+  max_dimension: 800
+  srcset_widths: [400]
+"""
+
+
+def setup_repository(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> tuple[Path, Path]:
+    image_module = pytest.importorskip("PIL.Image")
+    monkeypatch.setenv("MKSLIDES_CACHE_DIR", str(tmp_path / "cache"))
+
+    input_path = tmp_path / "slides"
+    (input_path / "img").mkdir(parents=True)
+    image_module.new("RGB", (2000, 1000), "red").save(input_path / "img" / "photo.jpg")
+    (input_path / "someslides-1.md").write_text(
+        "# Slides 1\n\n![Photo](img/photo.jpg)\n",
+    )
+    (input_path / "someslides-2.md").write_text("# Slides 2\n")
+
+    config_path = tmp_path / "mkslides.yml"
+    config_path.write_text(CONFIG)
+
+    return input_path, config_path
+
+
+def get_variant_paths(output_path: Path) -> list[Path]:
+    return sorted((output_path / "img").glob("photo.*w.webp"))
+
+
+def test_image_optimization(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    input_path, config_path = setup_repository(tmp_path, monkeypatch)
+    image_module = pytest.importorskip("PIL.Image")
+    output_path = tmp_path / "site"
+    run_build_strict(tmp_path, input_path, output_path, config_path)
+
+    # The original is still copied
+    assert (output_path / "img" / "photo.jpg").is_file()
+
+    variant_paths = get_variant_paths(output_path)
+    assert [path.name.split(".")[-2] for path in variant_paths] == ["400w", "800w"]
+    with image_module.open(variant_paths[1]) as image:
+        assert image.format == "WEBP"
+        assert image.size == (800, 400)
+
+    slides_path = output_path / "someslides-1.html"
+    small_name, large_name = (path.name for path in variant_paths)
+    assert_html_contains(
+        slides_path,
+        f'<picture><source type="image/webp" srcset="img/{large_name} 800w, img/{small_name} 400w">'
+        "![Photo](img/photo.jpg)</picture>",
+    )
+
+    # A second build reuses the cached variants
+    cache_entries = list((tmp_path / "cache" / "images").glob("*/*"))
+    assert len(cache_entries) == 1
+    cache_mtime = cache_entries[0].stat().st_mtime_ns
+    run_build_strict(tmp_path, input_path, output_path, config_path)
+    assert cache_entries[0].stat().st_mtime_ns == cache_mtime
+    assert get_variant_paths(output_path) == variant_paths
+
+
+def test_image_optimization_incremental(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    input_path, config_path = setup_repository(tmp_path, monkeypatch)
+    image_module = pytest.importorskip("PIL.Image")
+    output_path = tmp_path / "site"
+    extra_args = ["--incremental"]
+    run_build_strict(tmp_path, input_path, output_path, config_path, extra_args)
+
+    old_variant_paths = get_variant_paths(output_path)
+    unchanged_mtime = (output_path / "someslides-2.html").stat().st_mtime_ns
+    image_module.new("RGB", (2000, 1000), "blue").save(input_path / "img" / "photo.jpg")
+
+    # The slideshow linking to the changed image links its new variants
+    run_build_strict(tmp_path, input_path, output_path, config_path, extra_args)
+    assert (output_path / "someslides-2.html").stat().st_mtime_ns == unchanged_mtime
+    new_variant_paths = get_variant_paths(output_path)
+    assert len(new_variant_paths) == 2  # noqa: PLR2004
+    assert not set(old_variant_paths) & set(new_variant_paths)
+    assert_html_contains(
+        output_path / "someslides-1.html",
+        f'srcset="img/{new_variant_paths[1].name} 800w',
+    )
+
+    # Without optimization the original is shown on its own again
+    config_path.write_text("")
+    run_build_strict(tmp_path, input_path, output_path, config_path, extra_args)
+    assert not get_variant_paths(output_path)
+    assert_html_contains(output_path / "someslides-1.html", "![Photo](img/photo.jpg)")
+    assert "<picture>" not in (output_path / "someslides-1.html").read_text()
+
+
+def test_image_optimization_keeps_the_original_as_fallback(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    input_path, config_path = setup_repository(tmp_path, monkeypatch)
+    (input_path / "someslides-2.md").write_text(
+        """# Slides 2
+
+<img src="img/photo.jpg" alt="Photo">
+
+<picture>
+<source srcset="img/photo.jpg 1x, img/photo.jpg 2x" type="image/webp">
+<img SRC='img/photo.jpg'>
+</picture>
+
+![Reference][photo]
+
+<!-- .slide: data-background-image="img/photo.jpg" -->
+
+[photo]: img/photo.jpg
+""",
+    )
+    output_path = tmp_path / "site"
+    run_build_strict(tmp_path, input_path, output_path, config_path)
+
+    small_name, large_name = (path.name for path in get_variant_paths(output_path))
+    source = f'<source type="image/webp" srcset="img/{large_name} 800w, img/{small_name} 400w">'
+    slides_path = output_path / "someslides-2.html"
+    for expected in [
+        f'<picture>{source}<img src="img/photo.jpg" alt="Photo"></picture>',
+        (
+            '<source srcset="img/photo.jpg 1x, img/photo.jpg 2x" type="image/webp">\n'
+            "<img SRC='img/photo.jpg'>\n</picture>"
+        ),
+        f"<picture>{source}![Reference][photo]</picture>",
+        '<!-- .slide: data-background-image="img/photo.jpg" -->',
+        "[photo]: img/photo.jpg",
+    ]:
+        assert_html_contains(slides_path, expected)
+
+
+def test_get_picture_insertions() -> None:
+    srcset = get_srcset({"img/photo 1.800w.webp": 800, "img/photo 1.400w.webp": 400})
+    assert srcset == "img/photo%201.800w.webp 800w, img/photo%201.400w.webp 400w"
+
+    content = """
+![Photo](img/photo.png "Title") ![Other](img/other.png)
+![Photo](<img/photo.png>) <!-- .element: class="r-stretch" -->
+[Link](img/photo.png) <img src="img/photo.png"> ![Reference][photo]
+
+[photo]: img/photo.png
+"""
+    result = replace_spans(
+        content,
+        get_picture_insertions(
+            content,
+            find_link_spans(content),
+            {"img/photo.png": {"img/photo.800w.avif": 800}},
+        ),
+    )
+
+    source = '<source type="image/avif" srcset="img/photo.800w.avif 800w">'
+    assert result.count(source) == 4  # noqa: PLR2004
+    assert result.count("</picture>") == 4  # noqa: PLR2004
+    assert f'<picture>{source}![Photo](img/photo.png "Title")</picture>' in result
+    assert " ![Other](img/other.png)\n" in result
+    assert (
+        f"<picture>{source}![Photo](<img/photo.png>)"
+        ' <!-- .element: class="r-stretch" --></picture>'
+    ) in result
+    assert (
+        f'[Link](img/photo.png) <picture>{source}<img src="img/photo.png"></picture>'
+        in result
+    )
+    assert f"<picture>{source}![Reference][photo]</picture>" in result
+    assert "\n[photo]: img/photo.png\n" in result
@@ -0,0 +1,215 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import json
+import re
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from tests.utils import (
+    assert_file_does_not_exist,
+    assert_file_exist,
+    assert_html_contains,
+    run_build,
+    run_build_strict,
+)
+
+
+def copy_slides(cwd: Path, tmp_path: Path) -> Path:
+    input_path = tmp_path / "slides"
+    shutil.copytree(cwd / "incremental" / "slides", input_path)
+    return input_path
+
+
+def test_incremental_writes_manifest(setup_paths: Any, tmp_path: Path) -> None:
+    cwd, _ = setup_paths
+    input_path = copy_slides(cwd, tmp_path)
+    output_path = tmp_path / "site"
+    run_build_strict(cwd, input_path, output_path, None, ["--incremental"])
+
+    manifest_path = output_path / ".mkslides-manifest.json"
+    assert_file_exist(manifest_path)
+
+    manifest = json.loads(manifest_path.read_text())
+    assert set(manifest["decks"]) == {
+        "someslides-1.html",
+        "somefolder/someslides-2.html",
+    }
+    assert manifest["decks"]["somefolder/someslides-2.html"]["source"] == (
+        "somefolder/someslides-2.md"
+    )
+    assert manifest["files"] == ["randomfile-1.txt"]
+    assert manifest["index_hash"]
+    assert str(tmp_path) not in manifest_path.read_text()
+
+
+def test_incremental_reuses_outputs_of_moved_input(
+    setup_paths: Any,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    cwd, _ = setup_paths
+    # Keep the logged paths on a single line
+    monkeypatch.setenv("COLUMNS", "1000")
+    input_path = copy_slides(cwd, tmp_path)
+    output_path = tmp_path / "site"
+    run_build_strict(cwd, input_path, output_path, None, ["--incremental"])
+
+    # The slideshows are not rendered again, as the manifest does not depend
+    # on where the input is
+    moved_input_path = input_path.rename(tmp_path / "moved-slides")
+    result = run_build_strict(
+        cwd,
+        moved_input_path,
+        output_path,
+        None,
+        ["--incremental"],
+    )
+
+    for deck in ["someslides-1.html", "somefolder/someslides-2.html"]:
+        assert re.search(
+            rf"Slideshow\s+'\S*{re.escape(deck)}'\s+is\s+up\s+to\s+date",
+            result.stdout,
+        ), result.stdout
+
+
+def test_incremental_only_renders_changed_slideshows(
+    setup_paths: Any,
+    tmp_path: Path,
+) -> None:
+    cwd, _ = setup_paths
+    input_path = copy_slides(cwd, tmp_path)
+    output_path = tmp_path / "site"
+    run_build_strict(cwd, input_path, output_path, None, ["--incremental"])
+
+    unchanged_mtime = (output_path / "somefolder/someslides-2.html").stat().st_mtime_ns
+    index_mtime = (output_path / "index.html").stat().st_mtime_ns
+
+    md_file = input_path / "someslides-1.md"
+    md_file.write_text(md_file.read_text().replace("Lorem ipsum", "Dolor sit"))
+    run_build_strict(cwd, input_path, output_path, None, ["--incremental"])
+
+    assert_html_contains(output_path / "someslides-1.html", "Dolor sit")
+    assert (
+        output_path / "somefolder/someslides-2.html"
+    ).stat().st_mtime_ns == unchanged_mtime
+    assert (output_path / "index.html").stat().st_mtime_ns == index_mtime
+
+
+def test_incremental_regenerates_index_when_navtree_changes(
+    setup_paths: Any,
+    tmp_path: Path,
+) -> None:
+    cwd, _ = setup_paths
+    input_path = copy_slides(cwd, tmp_path)
+    output_path = tmp_path / "site"
+    run_build_strict(cwd, input_path, output_path, None, ["--incremental"])
+
+    md_file = input_path / "someslides-1.md"
+    md_file.write_text(
+        "---\nslides:\n    title: New title\n---\n" + md_file.read_text(),
+    )
+    run_build_strict(cwd, input_path, output_path, None, ["--incremental"])
+
+    assert_html_contains(output_path / "index.html", "New title")
+
+
+def test_incremental_keeps_identical_outputs(
+    setup_paths: Any,
+    tmp_path: Path,
+) -> None:
+    cwd, _ = setup_paths
+    input_path = copy_slides(cwd, tmp_path)
+    output_path = tmp_path / "site"
+    run_build_strict(cwd, input_path, output_path, None, ["--incremental"])
+
+    deck_path = output_path / "someslides-1.html"
+    deck_inode = deck_path.stat().st_ino
+    deck_mtime = deck_path.stat().st_mtime_ns
+
+    # The title is only shown in the index, so the slideshow is rendered
+    # again with the same content and left untouched
+    md_file = input_path / "someslides-1.md"
+    md_file.write_text(
+        "---\nslides:\n    title: New title\n---\n" + md_file.read_text(),
+    )
+    run_build_strict(cwd, input_path, output_path, None, ["--incremental"])
+
+    assert_html_contains(output_path / "index.html", "New title")
+    assert deck_path.stat().st_ino == deck_inode
+    assert deck_path.stat().st_mtime_ns == deck_mtime
+    assert not list(output_path.rglob("*.tmp"))
+
+
+def test_incremental_removes_stale_outputs(setup_paths: Any, tmp_path: Path) -> None:
+    cwd, _ = setup_paths
+    input_path = copy_slides(cwd, tmp_path)
+    output_path = tmp_path / "site"
+    run_build_strict(cwd, input_path, output_path, None, ["--incremental"])
+
+    assert_file_exist(output_path / "somefolder/someslides-2.html")
+
+    shutil.rmtree(input_path / "somefolder")
+    (input_path / "someslides-3.md").write_text("# New slides\n")
+    run_build_strict(cwd, input_path, output_path, None, ["--incremental"])
+
+    assert_file_does_not_exist(output_path / "somefolder/someslides-2.html")
+    assert_file_does_not_exist(output_path / "somefolder")
+    assert_file_exist(output_path / "someslides-3.html")
+    assert_file_exist(output_path / "randomfile-1.txt")
+
+
+def test_incremental_rerenders_when_link_target_is_added(tmp_path: Path) -> None:
+    input_path = tmp_path / "slides"
+    input_path.mkdir()
+    (input_path / "a.md").write_text("# A\n\n[Other](other.md)\n")
+    (input_path / "b.md").write_text("# B\n")
+    output_path = tmp_path / "site"
+    run_build(tmp_path, input_path, output_path, None, ["--incremental"])
+
+    assert_html_contains(output_path / "a.html", "[Other](other.md)")
+
+    (input_path / "other.md").write_text("# Other\n")
+    run_build_strict(tmp_path, input_path, output_path, None, ["--incremental"])
+
+    assert_html_contains(output_path / "a.html", "[Other](other.html)")
+
+
+def test_incremental_rerenders_when_link_target_is_removed(
+    setup_paths: Any,
+    tmp_path: Path,
+) -> None:
+    cwd, _ = setup_paths
+    input_path = copy_slides(cwd, tmp_path)
+    output_path = tmp_path / "site"
+    run_build_strict(cwd, input_path, output_path, None, ["--incremental"])
+
+    (input_path / "randomfile-1.txt").unlink()
+    result = subprocess.run(
+        [
+            "mkslides",
+            "-v",
+            "build",
+            "-s",
+            "--incremental",
+            "-d",
+            output_path,
+            input_path,
+        ],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+    assert result.returncode == 1
+    assert re.search(
+        r"FileNotFoundError:\s+File\s+'.*someslides-\d\.md'\s+contains\s+a\s+link\s+'(\.\./)?randomfile-1\.txt'",
+        result.stderr,
+        flags=re.DOTALL,
+    ), result.stderr
@@ -0,0 +1,71 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import re
+import subprocess
+from pathlib import Path
+from typing import Any
+
+from tests.utils import run_build_strict
+
+
+def test_jobs_output_is_identical(setup_paths: Any, tmp_path: Path) -> None:
+    cwd, _ = setup_paths
+    expected_html_file_count = 9
+    input_path = cwd / "navtree" / "slides"
+    serial_output_path = tmp_path / "site-serial"
+    parallel_output_path = tmp_path / "site-parallel"
+    run_build_strict(cwd, input_path, serial_output_path, None)
+    run_build_strict(cwd, input_path, parallel_output_path, None, ["--jobs", "4"])
+
+    serial_files = sorted(
+        file.relative_to(serial_output_path)
+        for file in serial_output_path.rglob("*.html")
+        if "mkslides-assets" not in file.parts
+    )
+    parallel_files = sorted(
+        file.relative_to(parallel_output_path)
+        for file in parallel_output_path.rglob("*.html")
+        if "mkslides-assets" not in file.parts
+    )
+    assert serial_files == parallel_files
+    assert len(serial_files) == expected_html_file_count
+
+    for file in serial_files:
+        # The index contains the build time
+        if file == Path("index.html"):
+            continue
+
+        assert (serial_output_path / file).read_text() == (
+            parallel_output_path / file
+        ).read_text(), f"{file} differs"
+
+
+def test_jobs_with_strict(setup_paths: Any, tmp_path: Path) -> None:
+    cwd, _ = setup_paths
+    input_path = cwd / "relative_links" / "slides-non-existing-relative-md-link"
+    result = subprocess.run(
+        [
+            "mkslides",
+            "-v",
+            "build",
+            "-s",
+            "-j",
+            "2",
+            "-d",
+            tmp_path / "site",
+            input_path,
+        ],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+    assert result.returncode == 1
+    assert re.search(
+        r"FileNotFoundError:\s+File\s+'.*someslides-1.md'\s+contains\s+a\s+link\s+'non-existing-file.md',\s+but\s+the\s+target\s+is\s+not\s+found\s+among\s+slide\s+files.",
+        result.stderr,
+        flags=re.DOTALL,
+    ), result.stderr
@@ -0,0 +1,406 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import subprocess
+import sys
+from pathlib import Path
+
+import markdown
+import pytest
+from bs4 import BeautifulSoup, Comment
+
+from mkslides.constants import HTML_BACKGROUND_IMAGE_REGEX
+from mkslides.linkscanner import (
+    LinkKind,
+    find_link_spans,
+    find_links,
+    replace_spans,
+)
+from mkslides.urltype import URLType
+from mkslides.utils import get_url_type
+
+CORPUS = [
+    "[link](other.md)",
+    "![image](img/pic.png)",
+    '[link](other.md "title")',
+    "[link](<with spaces.md>)",
+    "[link](<with spaces.md> 'title')",
+    "[link](a(b)c.md)",
+    "[link](a.md 'ti)tle')",
+    '[link](a.md"notitle)',
+    "[link]( spaced.md )",
+    "[a]()",
+    "[a](#anchor) [b](https://example.com) [c](/abs.md) [d](mailto:x@y.z) [e](file:rel.md)",
+    "[a](x.md) and [b](y.md) and ![c](z.png)",
+    "[![img](inner.png)](outer.md)",
+    "[[nested](inner.md)](outer.md)",
+    "[text [with] brackets](brackets.md)",
+    "[unclosed](nope.md",
+    "[unclosed label(nope.md)",
+    "\\[not a link](escaped.md)",
+    "[escaped \\] bracket](escaped-bracket.md)",
+    "[link](path\\_with\\_escapes.md)",
+    "[link](a&amp;b.md) [c](d&e.md) [f](g&copy.md)",
+    "`[code](code.md)` [real](real.md)",
+    "``[code `with` ticks](code.md)`` [real](real.md)",
+    "`unclosed [real](real.md)",
+    "``a` [x](x.md)",
+    "\\`[x](x.md)`",
+    "\\\\`[x](x.md)`",
+    "a `b\nc [x](x.md)` d",
+    "```\n[fenced](fenced.md)\n```\n\n[after](after.md)",
+    "~~~python\n[fenced](fenced.md)\n~~~\n[after](after.md)",
+    "```{.python #id}\n![x](fenced.png)\n```",
+    "````\n```\n[inner](inner.md)\n```\n````\n[after](after.md)",
+    "```\n[unclosed fence](unclosed.md)",
+    "  ```\n[indented fence](indented.md)\n  ```",
+    "text\n```\n[not a fence start](nf.md)\n```",
+    "    [indented code](code.md)\n\n[after](after.md)",
+    "    [indented code](code.md)\n[lazy](lazy.md)",
+    "para\n    [continuation](cont.md)",
+    "- item\n\n    [list content](list.md)\n\n        [list code](code.md)",
+    "1. item [one](one.md)\n2. item [two](two.md)",
+    "* a\n* b\n\n    continuation [x](x.md)\n\nafter\n\n    [code](code.md)",
+    "> quote [x](x.md)\n> more [y](y.md)",
+    "> quote\n>\n>     [quoted code](qc.md)\n\n[after](after.md)",
+    "text\n> [quoted](quoted.md)",
+    "[ref][id]\n\n[id]: ref.md",
+    '[ref][ID]\n\n[id]: <ref.md> "Title"',
+    "[ref][]\n\n[ref]: empty-id.md",
+    "[short]\n\n[short]: short.md",
+    "![img][pic]\n\n[pic]: pic.png",
+    "![pic]\n\n[pic]: pic.png",
+    "[undefined][nope] [also undefined]",
+    "[a][b](c.md)",
+    "[a] [b]\n\n[b]: b.md",
+    "[multi\nline][id]\n\n[id]: multi.md",
+    "[x][multi\nline]\n\n[multi line]: multi.md",
+    "[id]: before.md\n\n[use][id]",
+    "   [id]:\n   next-line.md\n\n[use][id]",
+    "[id]: a.md\n[id]: b.md\n\n[use][id]",
+    "[id]: https://example.com\n\n[use][id]",
+    "Footnote[^1].\n\n[^1]: With a [link](fn.md).",
+    "[^1]: footnote",
+    '<a href="html.md">link</a>',
+    "<a href='single.md'>x</a> <img src=\"img.png\"> <img src=noquote.png>",
+    'Some text <a href="inline.md">inline</a> more.',
+    '<div>\n<a href="in-div.md">x</a>\n[markdown in div](not-parsed.md)\n</div>',
+    '<div>\n<pre><a href="in-pre.md">x</a></pre>\n<code><img src="in-code.png"></code>\n<a href="after-code.md">y</a>\n</div>',
+    '<div markdown="1">\n[parsed](parsed.md)\n</div>',
+    '<div markdown="block">\n[parsed](parsed.md)\n</div>',
+    "<p>[not parsed](np.md)</p> [parsed](parsed.md)",
+    '<video>\n<source src="video.mp4" type="video/mp4">\n</video>',
+    '<video controls><source src="v.webm"></video>',
+    '<pre>\n<a href="pre.md">x</a>\n</pre>\n\n[after](after.md)',
+    "<script>\nvar a = '<a href=\"script.md\">';\n</script>\n[after](after.md)",
+    "<style>\na { background: url(x.png) }\n</style>",
+    '<!-- .slide: data-background-image="bg.png" -->\n\n# Slide',
+    "<!-- .slide: data-background-image='bg-single.png' data-background-size=\"contain\" -->",
+    'Text <!-- .element: data-background-image="inline-bg.png" -->',
+    "<!--\n[commented](commented.md)\n-->\n[after](after.md)",
+    "<!-- [commented](commented.md) -->",
+    '<!-- data-background-image="one.png" data-background-image="two.png" -->',
+    '`<!-- data-background-image="code-bg.png" -->`',
+    '```\n<!-- data-background-image="fenced-bg.png" -->\n```',
+    '<a href="a.md"><code>x</code></a> <code><a href="in-code.md">y</a></code>',
+    "<code>[md in code](md-in-code.md)</code>",
+    '`<a href="code.md">x</a>` <a href="real.md">y</a>',
+    '<a href="with&amp;entity.md">x</a>',
+    '<A HREF="upper.md">x</A> <IMG SRC="upper.png">',
+    '<a\nhref="newline.md">x</a>',
+    "<a href>empty</a>",
+    '<a name="anchor">no href</a>',
+    "<http://autolink.example.com> <me@example.com>",
+    "| a | b |\n|---|---|\n| [cell](cell.md) | ![img](cell.png) |",
+    "Term\n: Definition with [link](def.md)",
+    "# Heading [link](heading.md)\n\nSetext [x](setext.md)\n=====",
+    "*emphasis [x](em.md)* **strong [y](strong.md)**",
+    "[link](a.md){: .class }",
+    "*[HTML]: Hyper Text Markup Language\n\nHTML [x](x.md)",
+    "[id]:r\n: [id]",
+    "*[id]\n[id]:r",
+    "*[id]\n\n: [id]: s",
+    "Term [x](x.md)\n: [id]: def.md\n\n[use][id]",
+    "Term\n:     [indented](indented-def.md)\n\n    [continued](continued-def.md)",
+    ": [id]: first.md\n\n[use][id]",
+    "*[abbr]:\n[id]: abbr-title.md\n\n[use][id]",
+    "\n    [after newline](code.md)",
+    "<div>\n<div>\n[nested](nested.md)\n</div>\n</div>\n\n[after](after.md)",
+    "<div>\nunclosed div [x](x.md)\n\n[still raw](raw.md)",
+    "<hr>\n[after hr](after-hr.md)",
+    "<hr/>[same line](same-line.md)",
+    "<div/>\n[after self closing](after.md)",
+    "   <div>\n[indented 3](i3.md)\n</div>\n\n[after](after.md)",
+    "    <div>\n[indented 4](i4.md)\n</div>",
+    "<span>\n[span is inline](span.md)\n</span>",
+    "Text\n<div>\n[in div](div.md)\n</div>",
+    '<details>\n<summary>Sum</summary>\n<a href="details.md">x</a>\n</details>',
+    '<section data-markdown>\n<img src="section.png">\n</section>',
+    "[link](relative/path/to/file.md#anchor) [q](file.md?query=1)",
+    "[link](../parent.md) ![img](./sibling.png)",
+    "[émojis](é.md) [space](%20encoded.md)",
+    "[a](x.md)\r\n[b](y.md)\r\n",
+    "\t[tab indented](tab.md)\n\n[x](x.md)",
+    "[a](b.md 'title with (parens)')",
+    "[a](b.md (title))",
+    "[a](<b.md>)",
+    "[a](b.md) \\![not image](c.png)",
+    "!\\[not image](c.png)",
+    "[![a](a.png)![b](b.png)](c.md)",
+    "[outer [inner](inner.md) text](outer.md)",
+    "[ref][r] and [r]\n\n[r]: r.md 'title'\n[s]: s.md (title)",
+    "- [x](list1.md)\n- [ ] task\n- ![img](list.png)",
+    "1. one\n\n    ```\n    [indented fence in list](ifl.md)\n    ```",
+    "<div>\n```\n[fence in div](fence-in-div.md)\n```\n</div>\n\n[after](after.md)",
+    '<table>\n<tr><td><a href="cell.md">x</a></td></tr>\n</table>',
+    "text <div>[inline div](inline-div.md)</div>",
+    '<img src="a.png" alt="<b>">',
+    '<img src="a.png" data-src="lazy.png"> <img data-src="only-data.png">',
+    '<a href="one.md" href="two.md">dup</a>',
+    "[link](a.md)\n\n---\n\n[link2](b.md)\n\n***",
+    "Note: **[bold link](bold.md)**",
+    "[`code` label](code-label.md)",
+    "[label](`code`.md)",
+    '<a href="x\\_y.md">escaped in html</a>',
+    '[a](x.md)<!-- data-background-image="bg2.png" -->',
+    '<iframe src="frame.html"></iframe> [x](x.md)',
+    '<div>\n<!-- data-background-image="in-div-bg.png" -->\n</div>',
+    '<pre>\n<!-- data-background-image="in-pre-bg.png" -->\n</pre>',
+    "---\ntitle: frontmatter-like\n---\n[x](x.md)",
+    '[a](b "(c") [d](e.md)',
+    "[a](b '(c)' \"d\") [e](f.md)",
+    "> - [a](quoted-list.md)\n>     [b](quoted-continuation.md)",
+    "a\tb [x](tab-before.md)\t[y](tab-between.md)",
+    "Text[^n]\n\n[^n]: note\n    with [link](fn-cont.md)",
+    "[a](x.md)\r[b](cr.md)",
+    "  \n[a](after-space-line.md)\n \t\n[b](after-tab-line.md)",
+    '`code` \\* [a](after-code.md) <img src="after-code.png">',
+]
+
+# The candidate URLs in `srcset` attributes, which are links the rendering in
+# `find_relative_links_by_rendering` does not collect
+SRCSET_LINKS = {
+    '<img src="a.png" srcset="a-1x.png 1x, a-2x.png 2x">': {
+        "a.png",
+        "a-1x.png",
+        "a-2x.png",
+    },
+    '<picture>\n<source srcset=\'b.webp 800w, b-small.webp 400w\' type="image/webp">\n<img src="b.png">\n</picture>': {
+        "b.webp",
+        "b-small.webp",
+        "b.png",
+    },
+    'Text <img srcset="c&amp;d.png 2x" alt="x"> and <code><img srcset="in-code.png"></code>': {
+        "c&d.png",
+    },
+}
+
+# Links whose title opens a parenthesis before any closes, which never end.
+# Python-Markdown slices these from the end of the block and renders a link
+# to the rest of the paragraph, the scanner moves past the `[` instead.
+UNTERMINATED_LINKS = {
+    '[]("(': set(),
+    'See [the docs]("(draft) for details.': set(),
+    '[a]("(x) [b](y.md)': {"y.md"},
+    '[a]("( y\n\n[b](z.md)': {"z.md"},
+    '![a]("(x) ![b](y.png)': {"y.png"},
+}
+
+# The Python-Markdown versions of which the scanner follows the rules
+SUPPORTED_MARKDOWN_VERSIONS = ["3.10", "3.11"]
+
+FUZZ_SCRIPT = """
+import random
+
+from mkslides.linkscanner import (
+    LinkKind,
+    find_link_spans,
+    find_links,
+    replace_spans,
+)
+
+ALPHABET = "[]()<>\\"' !\\\\`*\\n-=:#a.md/"
+rng = random.Random(0)
+for _ in range(20000):
+    find_links("".join(rng.choice(ALPHABET) for _ in range(rng.randint(1, 40))))
+"""
+
+MD_FILES = sorted(
+    [
+        *Path("tests").rglob("*.md"),
+        Path("slides/index.md"),
+        Path("README.md"),
+    ],
+)
+
+
+def find_relative_links_by_rendering(markdown_content: str) -> set[str]:
+    """Find relative links by rendering the markdown to HTML, like mkslides used to."""
+    html_content = markdown.markdown(markdown_content, extensions=["extra"])
+    soup = BeautifulSoup(html_content, "html.parser")
+
+    found_links = set()
+
+    for tag, attribute in (("a", "href"), ("img", "src"), ("source", "src")):
+        for link in soup.find_all(tag, attrs={attribute: True}):
+            if not link.find_parents(["code", "pre"]):
+                found_links.add(str(link[attribute]))
+
+    for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
+        if match := HTML_BACKGROUND_IMAGE_REGEX.search(comment):
+            found_links.add(match.group("location"))
+
+    return {link for link in found_links if get_url_type(link) == URLType.RELATIVE}
+
+
+def find_relative_links(markdown_content: str) -> set[str]:
+    return {
+        link
+        for link in find_links(markdown_content)
+        if get_url_type(link) == URLType.RELATIVE
+    }
+
+
+def test_markdown_version_is_supported() -> None:
+    # Check the scanner against the changes of a new version before adding it
+    version = ".".join(markdown.__version__.split(".")[:2])
+    assert version in SUPPORTED_MARKDOWN_VERSIONS
+
+
+@pytest.mark.parametrize("markdown_content", CORPUS)
+def test_link_scanner_matches_rendering(markdown_content: str) -> None:
+    assert find_relative_links(markdown_content) == find_relative_links_by_rendering(
+        markdown_content,
+    )
+
+
+@pytest.mark.parametrize("md_file", MD_FILES, ids=str)
+def test_link_scanner_matches_rendering_for_md_files(md_file: Path) -> None:
+    markdown_content = md_file.read_text()
+    assert find_relative_links(markdown_content) == find_relative_links_by_rendering(
+        markdown_content,
+    )
+
+
+def assert_link_spans_are_the_targets(markdown_content: str) -> None:
+    # Replacing the targets at their spans replaces exactly the links found
+    link_spans = [
+        link_span for link_span in find_link_spans(markdown_content) if link_span.link
+    ]
+    rewritten_content = replace_spans(
+        markdown_content,
+        [
+            (link_span.start, link_span.end, f"rewritten-{link_span.start}")
+            for link_span in link_spans
+        ],
+    )
+    assert {link for link in find_links(rewritten_content) if link} == {
+        f"rewritten-{link_span.start}" for link_span in link_spans
+    }
+
+    # The elements are the markdown links and images, tags and comments
+    for link_span in link_spans:
+        assert link_span.element_start < link_span.element_end
+        assert markdown_content[link_span.element_start] in "![<"
+
+
+@pytest.mark.parametrize("markdown_content", [*CORPUS, *UNTERMINATED_LINKS])
+def test_link_spans_are_the_targets(markdown_content: str) -> None:
+    assert_link_spans_are_the_targets(markdown_content)
+
+
+@pytest.mark.parametrize("md_file", MD_FILES, ids=str)
+def test_link_spans_are_the_targets_for_md_files(md_file: Path) -> None:
+    assert_link_spans_are_the_targets(md_file.read_text())
+
+
+@pytest.mark.parametrize("markdown_content", UNTERMINATED_LINKS)
+def test_link_scanner_skips_unterminated_links(markdown_content: str) -> None:
+    assert find_links(markdown_content) == UNTERMINATED_LINKS[markdown_content]
+
+
+def test_link_scanner_terminates_on_random_input() -> None:
+    # Run in another process, as a scanner that loops forever cannot be interrupted
+    subprocess.run(
+        [sys.executable, "-c", FUZZ_SCRIPT],
+        check=True,
+        timeout=60,
+    )
+
+
+def test_link_scanner_ignores_code() -> None:
+    markdown_content = """
+[link](link.md)
+
+```
+[fenced](fenced.md)
+```
+
+    [indented](indented.md)
+
+`[inline](inline.md)` <code><a href="html.md">html</a></code>
+"""
+    assert find_links(markdown_content) == {"link.md"}
+
+
+def test_link_scanner_finds_background_images() -> None:
+    markdown_content = """
+<!-- .slide: data-background-image="background.png" -->
+
+# Slide
+
+Text <!-- .element: data-background-image='element.png' -->
+"""
+    assert find_links(markdown_content) == {"background.png", "element.png"}
+
+
+def test_link_spans_have_their_elements() -> None:
+    markdown_content = """
+![a](x.png "title") [r][ref] <IMG alt="y" SRC="y.png">
+
+<picture>
+<source srcset="z.webp">
+<img src="z.png">
+</picture>
+
+<!-- .slide: data-background-image="bg.png" -->
+
+[ref]: r.md
+"""
+    assert {
+        (
+            link_span.link,
+            link_span.kind,
+            markdown_content[link_span.element_start : link_span.element_end],
+        )
+        for link_span in find_link_spans(markdown_content)
+    } == {
+        ("x.png", LinkKind.MARKDOWN_IMAGE, '![a](x.png "title")'),
+        ("r.md", LinkKind.MARKDOWN_LINK, "[r][ref]"),
+        ("y.png", LinkKind.HTML_IMAGE, '<IMG alt="y" SRC="y.png">'),
+        ("z.webp", LinkKind.HTML_SRCSET, '<source srcset="z.webp">'),
+        ("z.png", LinkKind.HTML_PICTURE_IMAGE, '<img src="z.png">'),
+        (
+            "bg.png",
+            LinkKind.BACKGROUND_IMAGE,
+            '<!-- .slide: data-background-image="bg.png" -->',
+        ),
+    }
+
+
+@pytest.mark.parametrize("markdown_content", SRCSET_LINKS)
+def test_link_scanner_finds_srcset_links(markdown_content: str) -> None:
+    assert find_links(markdown_content) == SRCSET_LINKS[markdown_content]
+    assert_link_spans_are_the_targets(markdown_content)
+
+
+def test_link_scanner_finds_srcset_candidates() -> None:
+    markdown_content = '<img srcset="a.png, b.png 2x,c.png,, d,e.png 480w , data:image/png;base64,AA== 3x">'
+    assert find_links(markdown_content) == {
+        "a.png",
+        "b.png",
+        "c.png",
+        "d,e.png",
+        "data:image/png;base64,AA==",
+    }
@@ -5,8 +5,10 @@
 import json
 import re
 import subprocess
+from pathlib import Path
 from typing import Any
 
+import pytest
 from deepdiff import DeepDiff
 from omegaconf import OmegaConf
 
@@ -169,6 +171,30 @@ def test_navtree_from_config(setup_paths: Any) -> None:
     assert DeepDiff(navtree.to_json(), expected_tree_json, ignore_order=True) == {}
 
 
+def test_navtree_children_are_sorted(tmp_path: Path) -> None:
+    navtree = NavTree(tmp_path / "slides", tmp_path / "site")
+    navtree.from_config_json(
+        ["b.md", {"category": ["d.md", "c.md"]}, {"Custom title": "a.md"}],
+    )
+
+    children = navtree.get_node_children("root")
+    assert [node.identifier for node in children] == ["a.html", "b.html", "category"]
+    assert [node.data for node in children] == ["Custom title", "b", "category"]
+    assert [node.identifier for node in navtree.get_node_children("category")] == [
+        "category/c.html",
+        "category/d.html",
+    ]
+    assert navtree.is_node_leaf("a.html")
+    assert not navtree.is_node_leaf("category")
+
+
+def test_navtree_with_duplicate_entries(tmp_path: Path) -> None:
+    navtree = NavTree(tmp_path / "slides", tmp_path / "site")
+
+    with pytest.raises(ValueError, match=r"'a\.html' is included more than once"):
+        navtree.from_config_json(["a.md", {"Custom title": "a.md"}])
+
+
 def test_files_not_in_folder_without_strict(setup_paths: Any) -> None:
     cwd, output_path = setup_paths
     expected_returncode = 0
@@ -0,0 +1,105 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import shutil
+from pathlib import Path
+from typing import Any
+
+from mkslides.config import get_config
+from mkslides.constants import (
+    OUTPUT_ASSETS_DIRNAME,
+    OUTPUT_ASSETS_VERSION_STAMP_FILENAME,
+    OUTPUT_MANIFEST_FILENAME,
+)
+from mkslides.markupgenerator import MarkupGenerator
+from mkslides.outputstore import OutputStore
+
+
+def test_output_store_matches_output_directory(
+    setup_paths: Any,
+    tmp_path: Path,
+) -> None:
+    cwd, _ = setup_paths
+    input_path = tmp_path / "slides"
+    shutil.copytree(cwd / "images" / "slides", input_path)
+    (input_path / "small.bin").write_bytes(b"\0" * 512)
+    (input_path / "large.bin").write_bytes(b"\0" * 2048)
+
+    output_path = tmp_path / "site"
+    MarkupGenerator(
+        get_config(),
+        input_path,
+        output_path,
+        strict=True,
+    ).process_markdown()
+
+    output_store = OutputStore(max_file_size=1024)
+    memory_output_path = tmp_path / "memory-site"
+    MarkupGenerator(
+        get_config(),
+        input_path,
+        memory_output_path,
+        strict=True,
+        incremental=True,
+        output_store=output_store,
+    ).process_markdown()
+
+    assert not memory_output_path.exists()
+
+    for path in output_path.rglob("*"):
+        relative_path = path.relative_to(output_path).as_posix()
+        # The index contains the build time, the version stamp is not needed in memory
+        if path.is_dir() or relative_path in {
+            "index.html",
+            f"{OUTPUT_ASSETS_DIRNAME}/{OUTPUT_ASSETS_VERSION_STAMP_FILENAME}",
+        }:
+            continue
+
+        content = output_store.get(relative_path)
+        assert content is not None, relative_path
+        if isinstance(content, Path):
+            content = content.read_bytes()
+        assert content == path.read_bytes(), relative_path
+
+    # Large files and bundled assets are served from their source location
+    assert output_store.get("large.bin") == (input_path / "large.bin").resolve()
+    assert isinstance(
+        output_store.get("mkslides-assets/reveal-js/dist/reveal.js"),
+        Path,
+    )
+    assert output_store.get("small.bin") == b"\0" * 512
+    assert output_store.get("../slides/someslides-1.md") is None
+
+
+def test_output_store_targeted_rebuilds(setup_paths: Any, tmp_path: Path) -> None:
+    cwd, _ = setup_paths
+    input_path = tmp_path / "slides"
+    shutil.copytree(cwd / "images" / "slides", input_path)
+
+    output_store = OutputStore()
+    markup_generator = MarkupGenerator(
+        get_config(),
+        input_path,
+        tmp_path / "site",
+        strict=True,
+        incremental=True,
+        output_store=output_store,
+    )
+    markup_generator.process_markdown()
+    assert output_store.manifest is not None
+    assert output_store.get(OUTPUT_MANIFEST_FILENAME) is None
+
+    deck_path = input_path / "somefolder" / "someslides-2.md"
+    deck_path.write_text(deck_path.read_text() + "\n\n## Extra slide\n")
+    markup_generator.process_changes({deck_path})
+    content = output_store.get("somefolder/someslides-2.html")
+    assert isinstance(content, bytes)
+    assert b"Extra slide" in content
+
+    # Removed slideshows are removed from the store by the next build
+    deck_path.unlink()
+    markup_generator.stat_cache.invalidate([deck_path])
+    markup_generator.process_changes({deck_path})
+    assert output_store.get("somefolder/someslides-2.html") is None
+    assert not (tmp_path / "site").exists()
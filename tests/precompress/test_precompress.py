@@ -0,0 +1,107 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import gzip
+from pathlib import Path
+
+import pytest
+
+from mkslides.precompress import PRECOMPRESS_MIN_SIZE, precompress_file
+from tests.utils import run_build_strict
+
+
+def setup_repository(tmp_path: Path) -> Path:
+    input_path = tmp_path / "slides"
+    input_path.mkdir()
+    (input_path / "someslides-1.md").write_text("# Slides 1\n")
+    (input_path / "someslides-2.md").write_text("# Slides 2\n")
+    (input_path / "data.json").write_text("{}\n")
+    (input_path / "logo.png").write_bytes(b"logo" * PRECOMPRESS_MIN_SIZE)
+
+    return input_path
+
+
+def test_precompress(tmp_path: Path) -> None:
+    input_path = setup_repository(tmp_path)
+    output_path = tmp_path / "site"
+    run_build_strict(tmp_path, input_path, output_path, None, ["--precompress"])
+
+    compressed_paths = set(output_path.rglob("*.gz"))
+    assert output_path / "someslides-1.html.gz" in compressed_paths
+    for path in output_path.rglob("*"):
+        if path.suffix not in {".html", ".css", ".js"}:
+            continue
+
+        compressed_path = path.with_name(f"{path.name}.gz")
+        if path.stat().st_size < PRECOMPRESS_MIN_SIZE:
+            assert compressed_path not in compressed_paths
+        else:
+            content = gzip.decompress(compressed_path.read_bytes())
+            assert content == path.read_bytes()
+
+    # Small and incompressible files are not compressed, nor the build internals
+    assert not (output_path / "data.json.gz").exists()
+    assert not (output_path / "logo.png.gz").exists()
+    assert not list(output_path.glob(".*.gz"))
+
+    # Without precompressing the compressed copies are removed
+    run_build_strict(tmp_path, input_path, output_path, None)
+    assert not list(output_path.rglob("*.gz"))
+
+
+def test_precompress_incremental(tmp_path: Path) -> None:
+    input_path = setup_repository(tmp_path)
+    output_path = tmp_path / "site"
+    extra_args = ["--precompress", "--incremental"]
+    run_build_strict(tmp_path, input_path, output_path, None, extra_args)
+
+    unchanged_path = output_path / "someslides-2.html.gz"
+    unchanged_mtime = unchanged_path.stat().st_mtime_ns
+    (input_path / "someslides-1.md").write_text("# Slides 1 changed\n")
+
+    # Only the outputs that changed are compressed again
+    run_build_strict(tmp_path, input_path, output_path, None, extra_args)
+    assert unchanged_path.stat().st_mtime_ns == unchanged_mtime
+    changed_path = output_path / "someslides-1.html"
+    content = gzip.decompress(
+        changed_path.with_name("someslides-1.html.gz").read_bytes(),
+    )
+    assert content == changed_path.read_bytes()
+
+    # The compressed copies of removed outputs are removed
+    (input_path / "someslides-2.md").unlink()
+    run_build_strict(tmp_path, input_path, output_path, None, extra_args)
+    assert not unchanged_path.exists()
+
+    # Without precompressing the compressed copies are removed
+    run_build_strict(tmp_path, input_path, output_path, None, ["--incremental"])
+    assert not list(output_path.rglob("*.gz"))
+
+
+def test_precompress_file(tmp_path: Path) -> None:
+    path = tmp_path / "slides.html"
+    path.write_text("<p>Slide</p>\n" * PRECOMPRESS_MIN_SIZE)
+    compressed_path = tmp_path / "slides.html.gz"
+
+    assert precompress_file(path) >= 1
+    assert gzip.decompress(compressed_path.read_bytes()) == path.read_bytes()
+    assert compressed_path.stat().st_mtime_ns == path.stat().st_mtime_ns
+
+    # Unchanged files are not compressed again
+    assert precompress_file(path) == 0
+
+    # Files that became too small lose their compressed copies
+    path.write_text("<p>Slide</p>\n")
+    assert precompress_file(path) == 0
+    assert not compressed_path.exists()
+
+
+def test_precompress_file_with_brotli(tmp_path: Path) -> None:
+    brotli = pytest.importorskip("brotli")
+    path = tmp_path / "slides.html"
+    path.write_text("<p>Slide</p>\n" * PRECOMPRESS_MIN_SIZE)
+
+    assert precompress_file(path) == 2  # noqa: PLR2004
+    compressed_path = tmp_path / "slides.html.br"
+    assert brotli.decompress(compressed_path.read_bytes()) == path.read_bytes()
@@ -2,9 +2,12 @@
 #
 # SPDX-License-Identifier: MIT
 
+import os
 import re
+from pathlib import Path
 from typing import Any
 
+from mkslides.preprocess import load_preprocessing_function
 from tests.utils import assert_html_contains_regexp, run_build_strict
 
 
@@ -41,3 +44,41 @@ def test_preprocessing(setup_paths: Any) -> None:
             re.VERBOSE | re.DOTALL,
         ),
     )
+
+
+def test_preprocessing_script_is_loaded_once(tmp_path: Path) -> None:
+    script_path = tmp_path / "preprocess_script.py"
+    log_path = tmp_path / "executions.log"
+    script_template = """
+from pathlib import Path
+
+with Path({log_path!r}).open("a") as log:
+    log.write("executed\\n")
+
+def preprocess(markdown_content: str) -> str:
+    return {replacement!r}
+"""
+    script_path.write_text(
+        script_template.format(log_path=str(log_path), replacement="a"),
+    )
+
+    for _ in range(3):
+        preprocess_function = load_preprocessing_function(str(script_path))
+        assert preprocess_function
+        assert preprocess_function("") == "a"
+    assert log_path.read_text().splitlines() == ["executed"]
+
+    # Touching the script without changing it does not execute it again
+    os.utime(script_path, ns=(0, 0))
+    preprocess_function = load_preprocessing_function(str(script_path))
+    assert preprocess_function
+    assert preprocess_function("") == "a"
+    assert log_path.read_text().splitlines() == ["executed"]
+
+    script_path.write_text(
+        script_template.format(log_path=str(log_path), replacement="b"),
+    )
+    preprocess_function = load_preprocessing_function(str(script_path))
+    assert preprocess_function
+    assert preprocess_function("") == "b"
+    assert log_path.read_text().splitlines() == ["executed", "executed"]
@@ -0,0 +1,90 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import re
+from typing import Any
+
+from mkslides.prerender import prerender_slides, split_slides
+from tests.utils import (
+    assert_html_contains,
+    assert_html_contains_regexp,
+    assert_html_does_not_contain,
+    run_build_strict,
+)
+
+
+def test_prerender(setup_paths: Any) -> None:
+    cwd, output_path = setup_paths
+    input_path = cwd / "prerender" / "slides"
+    config_path = cwd / "prerender" / "prerender-config.yml"
+    run_build_strict(cwd, input_path, output_path, config_path)
+
+    slides_path = output_path / "someslides-1.html"
+    assert_html_contains(
+        slides_path,
+        '<section data-background-color="#ff0000">',
+    )
+    assert_html_contains(
+        slides_path,
+        '<h1 class="r-fit-text">Prerendered slides',
+    )
+    assert_html_contains(slides_path, '<li class="fragment">First item')
+    assert_html_contains(slides_path, '<li class="fragment">Second item')
+    assert_html_contains(
+        slides_path,
+        '<aside class="notes"><p>The <em>speaker</em> notes</p></aside>',
+    )
+    assert_html_contains(
+        slides_path,
+        '<code class="language-python" data-line-numbers="1|2">',
+    )
+    assert_html_contains(slides_path, '<a href="someslides-2.html">Other slides</a>')
+    assert_html_contains_regexp(
+        slides_path,
+        re.compile(
+            r"""
+            <section>\s*
+                <section>\s*<h2>Code</h2>.*?</section>\s*
+                <section>\s*<h2>Vertical\ slide</h2>.*?</section>\s*
+            </section>
+            """,
+            re.VERBOSE | re.DOTALL,
+        ),
+    )
+    assert_html_does_not_contain(slides_path, "data-markdown")
+    assert_html_does_not_contain(slides_path, "markdown.js")
+    assert_html_does_not_contain(slides_path, "RevealMarkdown")
+
+    # The frontmatter can opt out
+    slides_path = output_path / "someslides-2.html"
+    assert_html_contains(slides_path, "<section data-markdown")
+    assert_html_contains(slides_path, "markdown.js")
+    assert_html_contains(slides_path, "RevealMarkdown")
+
+
+def test_split_slides() -> None:
+    markdown_content = "A\n---\nB\n-v-\nC\n-v-\nD\n---\nE"
+
+    assert split_slides(markdown_content, None, None) == [
+        "A",
+        "B\n-v-\nC\n-v-\nD",
+        "E",
+    ]
+    assert split_slides(markdown_content, r"^---$", r"^-v-$") == [
+        "A\n",
+        ["\nB\n", "\nC\n", "\nD\n"],
+        "\nE",
+    ]
+
+
+def test_prerender_slide_attributes() -> None:
+    rendered_slides = prerender_slides(
+        '<!-- .element: data-state="first" -->\n\n'
+        'Text **bold** <!-- .element: class="highlight" -->\n\n'
+        '```\n<!-- .slide: class="in-code" -->\n```\n',
+    )
+
+    assert rendered_slides.startswith('<section data-state="first">')
+    assert '<strong class="highlight">bold</strong>' in rendered_slides
+    assert "&lt;!-- .slide: class=&quot;in-code&quot; --&gt;" in rendered_slides
@@ -2,6 +2,7 @@
 #
 # SPDX-License-Identifier: MIT
 
+from pathlib import Path
 from typing import Any
 
 from tests.utils import (
@@ -108,3 +109,40 @@ def test_relative_slideshow_links(setup_paths: Any) -> None:
         output_path / "someslides-1.html",
         '<a target="_blank" href="/folder/test.md" class="dummy">test</a>',
     )
+
+
+def test_relative_slideshow_links_are_rewritten_where_they_are_found(
+    tmp_path: Path,
+) -> None:
+    input_path = tmp_path / "slides"
+    input_path.mkdir()
+    (input_path / "a&b.md").write_text("# A and B\n")
+    (input_path / "someslides-2.md").write_text("# Slides 2\n")
+    (input_path / "someslides-1.md").write_text(
+        """# Slides 1
+
+[Reference][ref] and [title](someslides-2.md "Title")
+
+> - Quoted [list item](someslides-2.md)
+
+<A HREF='someslides-2.md'>upper</A> <a href="a&amp;b.md">entity</a> [entity](a&amp;b.md)
+
+`[code](someslides-2.md)`
+
+[ref]: someslides-2.md
+""",
+    )
+    output_path = tmp_path / "site"
+    run_build_strict(tmp_path, input_path, output_path, None)
+
+    for expected in [
+        "[Reference][ref]",
+        "[ref]: someslides-2.html",
+        '[title](someslides-2.html "Title")',
+        "[list item](someslides-2.html)",
+        "<A HREF='someslides-2.html'>upper</A>",
+        '<a href="a&amp;b.html">entity</a>',
+        "[entity](a&b.html)",
+        "`[code](someslides-2.md)`",
+    ]:
+        assert_html_contains(output_path / "someslides-1.html", expected)
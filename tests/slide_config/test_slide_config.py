@@ -0,0 +1,122 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+from copy import deepcopy
+from pathlib import Path
+from typing import Any
+
+import pytest
+from omegaconf import DictConfig, OmegaConf
+from omegaconf.errors import OmegaConfBaseException
+
+from mkslides.config import (
+    FRONTMATTER_ALLOWED_KEYS,
+    SlideConfig,
+    SlideConfigResolver,
+    get_config,
+)
+
+CONFIG_PATHS = [
+    Path("tests/plugins/plugins-config.yml"),
+    Path("tests/frontmatter/frontmatter_overrides_options-config.yml"),
+]
+
+FRONTMATTERS: list[dict[str, Any]] = [
+    {},
+    {"title": "Not a config key"},
+    {"slides": {"title": "Title", "theme": "solarized", "separator": "<!--s-->"}},
+    {"slides": {"title": 2024}},
+    {"slides": {"title": True, "separator": 1.5}},
+    {"slides": {"title": "${index.title} - deck"}},
+    {"slides": {"charset": None}},
+    {"slides": {"prerender": True}},
+    {"slides": {"prerender": "false"}},
+    {"revealjs": {"width": 1920, "transition": "zoom"}},
+    {"revealjs": {"menu": {"openOnInit": False}, "keyboard": {"13": "next"}}},
+    {"revealjs": {"menu": None, "slideNumber": False}},
+    {"revealjs": {"dependencies": [{"src": "plugin.js", "async": True}]}},
+    {"plugins": []},
+    {"plugins": [{"name": "RevealMenu", "extra_css": ["menu.css"]}]},
+    {"plugins": [{"extra_javascript": ["a.js", "b.js"]}]},
+    {"plugins": [{"name": 1}]},
+    {
+        "slides": {"title": "Title"},
+        "revealjs": {"width": 1920},
+        "plugins": [{"name": "RevealMenu"}],
+    },
+]
+
+INVALID_FRONTMATTERS: list[dict[str, Any]] = [
+    {"slides": {"unknown": "value"}},
+    {"slides": {"theme": None}},
+    {"slides": {"title": ["a", "list"]}},
+    {"slides": {"prerender": "maybe"}},
+    {"slides": {"prerender": None}},
+    {"plugins": [{"unknown": "value"}]},
+    {"plugins": [{"extra_css": "not-a-list.css"}]},
+]
+
+
+def resolve_by_merging(
+    global_config: DictConfig,
+    frontmatter_metadata: dict[str, Any],
+) -> SlideConfig:
+    """Resolve the slide config by updating a full copy of the global config, the reference implementation."""
+    slide_config = deepcopy(global_config)
+    for key in FRONTMATTER_ALLOWED_KEYS:
+        if key in frontmatter_metadata:
+            OmegaConf.update(slide_config, key, frontmatter_metadata[key])
+
+    return SlideConfig(
+        slides=OmegaConf.to_object(slide_config.slides),  # type: ignore[arg-type]
+        revealjs=OmegaConf.to_container(slide_config.revealjs),  # type: ignore[arg-type]
+        plugins=OmegaConf.to_object(slide_config.plugins),  # type: ignore[arg-type]
+    )
+
+
+@pytest.mark.parametrize("config_path", CONFIG_PATHS)
+@pytest.mark.parametrize("frontmatter_metadata", FRONTMATTERS)
+def test_slide_config_matches_merging(
+    config_path: Path,
+    frontmatter_metadata: dict[str, Any],
+) -> None:
+    global_config = get_config(config_path)
+    resolver = SlideConfigResolver(global_config)
+
+    assert resolver.resolve(frontmatter_metadata) == resolve_by_merging(
+        global_config,
+        frontmatter_metadata,
+    )
+
+
+@pytest.mark.parametrize("frontmatter_metadata", INVALID_FRONTMATTERS)
+def test_slide_config_rejects_invalid_frontmatter(
+    frontmatter_metadata: dict[str, Any],
+) -> None:
+    resolver = SlideConfigResolver(get_config(CONFIG_PATHS[0]))
+
+    with pytest.raises(OmegaConfBaseException):
+        resolver.resolve(frontmatter_metadata)
+
+
+def test_slide_configs_do_not_share_values() -> None:
+    resolver = SlideConfigResolver(get_config(CONFIG_PATHS[0]))
+    base = deepcopy(resolver.base)
+
+    # Two decks overriding the same nested key, and one without overrides
+    slide_config_1 = resolver.resolve({"revealjs": {"menu": {"openOnInit": False}}})
+    slide_config_2 = resolver.resolve({"revealjs": {"menu": {"openOnInit": True}}})
+    slide_config_3 = resolver.resolve({})
+    slide_config_1.revealjs["menu"]["openButton"] = False
+    slide_config_1.revealjs["slideNumber"] = False
+    slide_config_1.plugins[0].extra_javascript.append("changed.js")  # type: ignore[union-attr]
+    slide_config_1.slides.title = "Changed"
+
+    assert slide_config_2.revealjs["menu"] == {"openButton": True, "openOnInit": True}
+    assert slide_config_2.revealjs["slideNumber"] == "c/t"
+    assert slide_config_2 == resolver.resolve(
+        {"revealjs": {"menu": {"openOnInit": True}}},
+    )
+    assert slide_config_3 == base
+    assert resolver.base == base
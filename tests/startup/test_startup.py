@@ -0,0 +1,120 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import logging
+import re
+import subprocess
+import sys
+from collections.abc import Generator
+from pathlib import Path
+
+import pytest
+
+from mkslides import assetmanifest
+from mkslides.assetmanifest import (
+    AssetManifest,
+    get_asset_manifest,
+    scan_asset_manifest,
+)
+
+# Only needed to build or serve, not to start the CLI
+DEFERRED_MODULES = {
+    "asyncio",
+    "emoji",
+    "frontmatter",
+    "jinja2",
+    "markdown",
+    "mkslides.build",
+    "mkslides.markupgenerator",
+    "mkslides.serve",
+    "omegaconf",
+    "yaml",
+}
+
+IMPORTTIME_REGEX = re.compile(
+    r"""
+    ^import\ time:
+    \s*\d+\s*\|         # Self time in µs
+    \s*\d+\s*\|         # Cumulative time in µs
+    \s*(?P<module>\S+)  # Module name, indented by its depth
+    """,
+    re.VERBOSE | re.MULTILINE,
+)
+
+
+def get_imported_modules(args: list[str]) -> set[str]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "mkslides", *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(IMPORTTIME_REGEX.findall(result.stderr))
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["--version"],
+        ["--help"],
+        ["build", "--help"],
+        ["serve", "--help"],
+    ],
+)
+def test_startup_defers_imports(args: list[str]) -> None:
+    imported_modules = get_imported_modules(args)
+    assert "click" in imported_modules
+    assert not imported_modules & DEFERRED_MODULES
+
+
+def test_version() -> None:
+    result = subprocess.run(
+        [sys.executable, "-m", "mkslides", "--version"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    asset_manifest = get_asset_manifest()
+    assert f"reveal.js, version {asset_manifest.revealjs_version}" in result.stdout
+    assert (
+        f"highlight.js themes, version {asset_manifest.highlightjs_themes_version}"
+        in result.stdout
+    )
+
+
+def test_asset_manifest_is_up_to_date() -> None:
+    # Fails if the assets were updated without regenerating the manifest
+    assert get_asset_manifest() == scan_asset_manifest()
+
+
+def test_asset_manifest_to_json() -> None:
+    asset_manifest = scan_asset_manifest()
+    assert "black" in asset_manifest.revealjs_themes
+    assert "monokai" in asset_manifest.highlightjs_themes
+    assert AssetManifest.from_json(asset_manifest.to_json()) == asset_manifest
+
+
+@pytest.fixture
+def uncached_asset_manifest() -> Generator[None]:
+    get_asset_manifest.cache_clear()
+    yield
+    get_asset_manifest.cache_clear()
+
+
+@pytest.mark.usefixtures("uncached_asset_manifest")
+def test_missing_asset_manifest_falls_back_to_scanning(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    monkeypatch.setattr(
+        assetmanifest,
+        "ASSET_MANIFEST_RESOURCE",
+        tmp_path / "asset-manifest.json",
+    )
+
+    with caplog.at_level(logging.DEBUG, logger=assetmanifest.__name__):
+        assert get_asset_manifest() == scan_asset_manifest()
+
+    assert [record.levelno for record in caplog.records] == [logging.DEBUG]
@@ -0,0 +1,124 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import os
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from mkslides.config import get_config
+from mkslides.markupgenerator import MarkupGenerator
+from mkslides.statcache import StatCache
+
+
+def create_files(root_path: Path, *relative_paths: str) -> None:
+    for relative_path in relative_paths:
+        path = root_path / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(relative_path)
+
+
+def count_scandir_calls(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    calls = []
+    original_scandir = os.scandir
+
+    def scandir(path: Any) -> Any:
+        calls.append(str(path))
+        return original_scandir(path)
+
+    monkeypatch.setattr(os, "scandir", scandir)
+
+    return calls
+
+
+def test_stat_cache_walks_once(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    root_path = tmp_path / "slides"
+    create_files(root_path, "a.md", "b/c.md", "b/d/e.png")
+    (tmp_path / "shared.png").write_text("shared")
+    scandir_calls = count_scandir_calls(monkeypatch)
+
+    stat_cache = StatCache(root_path)
+
+    assert sorted(stat_cache.files()) == [
+        root_path / "a.md",
+        root_path / "b" / "c.md",
+        root_path / "b" / "d" / "e.png",
+    ]
+    assert stat_cache.is_dir(root_path / "b" / "d")
+    assert not stat_cache.is_file(root_path / "b" / "d")
+    assert stat_cache.is_file(root_path / "b" / "c.md")
+    assert stat_cache.exists(root_path / "b" / ".." / "a.md")
+    assert not stat_cache.exists(root_path / "missing.png")
+    assert stat_cache.exists(root_path / ".." / "shared.png")
+    assert sorted(scandir_calls) == sorted(
+        [str(root_path), str(root_path / "b"), str(root_path / "b" / "d")],
+    )
+
+
+def test_stat_cache_invalidate(tmp_path: Path) -> None:
+    root_path = tmp_path / "slides"
+    create_files(root_path, "a.md", "b/c.md", "b/d/e.png")
+    (tmp_path / "shared.png").write_text("shared")
+
+    stat_cache = StatCache(root_path)
+    assert not stat_cache.exists(root_path / "f.png")
+    assert stat_cache.exists(tmp_path / "shared.png")
+
+    create_files(root_path, "f.png", "b/d/g.png")
+    (root_path / "a.md").unlink()
+    (tmp_path / "shared.png").unlink()
+
+    # Without invalidation, the cache is not updated
+    assert not stat_cache.exists(root_path / "f.png")
+    assert stat_cache.exists(root_path / "a.md")
+
+    stat_cache.invalidate(
+        [
+            root_path / "f.png",
+            root_path / "a.md",
+            root_path / "b" / "d",
+            tmp_path / "shared.png",
+        ],
+    )
+    assert stat_cache.is_file(root_path / "f.png")
+    assert not stat_cache.exists(root_path / "a.md")
+    assert not stat_cache.exists(tmp_path / "shared.png")
+    assert sorted(stat_cache.files()) == [
+        root_path / "b" / "c.md",
+        root_path / "b" / "d" / "e.png",
+        root_path / "b" / "d" / "g.png",
+        root_path / "f.png",
+    ]
+
+    create_files(root_path, "h/i.md")
+    stat_cache.invalidate()
+    assert root_path / "h" / "i.md" in stat_cache.files()
+
+
+def test_stat_cache_is_shared_by_build(
+    setup_paths: Any,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    cwd, output_path = setup_paths
+    input_path = (cwd / "navtree" / "slides").resolve(strict=True)
+    config = get_config()
+    stat_cache = StatCache(input_path)
+    markup_generator = MarkupGenerator(
+        config,
+        input_path,
+        output_path,
+        strict=True,
+        stat_cache=stat_cache,
+    )
+    md_files, _ = markup_generator.scan_files()
+    assert md_files
+
+    # The cache is reused, so a second scan does not walk the directory again
+    scandir_calls = count_scandir_calls(monkeypatch)
+    markup_generator.scan_files()
+    assert not scandir_calls
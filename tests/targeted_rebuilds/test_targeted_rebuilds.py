@@ -0,0 +1,87 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import shutil
+from pathlib import Path
+from typing import Any
+
+from mkslides.config import get_config
+from mkslides.markupgenerator import MarkupGenerator
+
+
+def reset_output_mtimes(output_path: Path) -> None:
+    for path in output_path.rglob("*"):
+        if path.is_file() and "mkslides-assets" not in path.parts:
+            os.utime(path, ns=(0, 0))
+
+
+def get_changed_outputs(output_path: Path) -> set[str]:
+    return {
+        path.relative_to(output_path).as_posix()
+        for path in output_path.rglob("*")
+        if path.is_file()
+        and "mkslides-assets" not in path.parts
+        and path.stat().st_mtime_ns != 0
+    }
+
+
+def test_targeted_rebuilds(setup_paths: Any, tmp_path: Path) -> None:
+    cwd, _ = setup_paths
+    input_path = tmp_path / "slides"
+    output_path = tmp_path / "site"
+    shutil.copytree(cwd / "images" / "slides", input_path)
+
+    markup_generator = MarkupGenerator(
+        get_config(),
+        input_path,
+        output_path,
+        strict=True,
+        incremental=True,
+    )
+    markup_generator.process_markdown()
+
+    # A changed slideshow is the only output that is rendered again
+    reset_output_mtimes(output_path)
+    deck_path = input_path / "somefolder" / "someslides-2.md"
+    deck_path.write_text(deck_path.read_text() + "\n\n## Extra slide\n")
+    markup_generator.process_changes({deck_path})
+    assert get_changed_outputs(output_path) == {
+        ".mkslides-manifest.json",
+        "somefolder/someslides-2.html",
+    }
+    assert "Extra slide" in (output_path / "somefolder/someslides-2.html").read_text()
+
+    # A changed image is the only file that is copied again
+    reset_output_mtimes(output_path)
+    image_path = input_path / "img" / "example-1.png"
+    image_path.write_bytes(b"changed")
+    markup_generator.process_changes({image_path})
+    assert get_changed_outputs(output_path) == {
+        ".mkslides-manifest.json",
+        "img/example-1.png",
+    }
+    assert (output_path / "img" / "example-1.png").read_bytes() == b"changed"
+
+    # A changed title also regenerates the index, the slideshow is rendered
+    # again but left untouched as its content is the same
+    reset_output_mtimes(output_path)
+    deck_path.write_text(
+        "---\nslides:\n    title: New title\n---\n" + deck_path.read_text(),
+    )
+    markup_generator.process_changes({deck_path})
+    assert get_changed_outputs(output_path) == {
+        ".mkslides-manifest.json",
+        "index.html",
+    }
+    assert "New title" in (output_path / "index.html").read_text()
+
+    # An added slideshow results in a full incremental build
+    reset_output_mtimes(output_path)
+    new_deck_path = input_path / "someslides-3.md"
+    new_deck_path.write_text("# New slides\n")
+    markup_generator.stat_cache.invalidate([new_deck_path])
+    markup_generator.process_changes({new_deck_path})
+    assert "someslides-3.html" in get_changed_outputs(output_path)
+    assert "someslides-3.html" in (output_path / "index.html").read_text()
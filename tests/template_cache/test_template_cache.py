@@ -0,0 +1,61 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+from pathlib import Path
+
+import pytest
+
+from tests.utils import assert_html_contains, run_build_strict
+
+
+def setup_repository(tmp_path: Path) -> tuple[Path, Path]:
+    input_path = tmp_path / "slides"
+    input_path.mkdir()
+    (input_path / "someslides-1.md").write_text("# Slides 1\n")
+    (input_path / "someslides-2.md").write_text("# Slides 2\n")
+
+    config_path = tmp_path / "mkslides.yml"
+    config_path.write_text("slides:\n  template: custom.html.jinja\n")
+    (tmp_path / "custom.html.jinja").write_text("<html>{{ markdown }} v1</html>\n")
+
+    return input_path, config_path
+
+
+def test_compiled_templates_are_cached(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    cache_path = tmp_path / "cache"
+    monkeypatch.setenv("MKSLIDES_CACHE_DIR", str(cache_path))
+    input_path, config_path = setup_repository(tmp_path)
+    output_path = tmp_path / "site"
+
+    run_build_strict(tmp_path, input_path, output_path, config_path)
+    assert_html_contains(output_path / "someslides-1.html", "v1")
+
+    # The custom and default index templates are cached
+    cache_files = list(cache_path.glob("jinja2-*/*.cache"))
+    assert len(cache_files) == 2  # noqa: PLR2004
+
+    run_build_strict(tmp_path, input_path, output_path, config_path)
+    assert sorted(cache_path.glob("jinja2-*/*.cache")) == sorted(cache_files)
+
+    # A changed template is compiled again
+    (tmp_path / "custom.html.jinja").write_text("<html>{{ markdown }} v2</html>\n")
+    run_build_strict(tmp_path, input_path, output_path, config_path)
+    assert_html_contains(output_path / "someslides-1.html", "v2")
+
+
+def test_build_without_writable_cache(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # The cache directory cannot be created below a file
+    cache_path = tmp_path / "file" / "cache"
+    cache_path.parent.write_text("")
+    monkeypatch.setenv("MKSLIDES_CACHE_DIR", str(cache_path))
+    input_path, config_path = setup_repository(tmp_path)
+
+    run_build_strict(tmp_path, input_path, tmp_path / "site", config_path)
+    assert_html_contains(tmp_path / "site" / "someslides-2.html", "v1")
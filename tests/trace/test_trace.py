@@ -0,0 +1,101 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import json
+import re
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from tests.utils import run_build_strict
+
+DECK_SPAN_NAMES = {
+    "read",
+    "read transformation cache",
+    "parse frontmatter",
+    "emojize",
+    "find links",
+    "check links",
+    "render",
+}
+
+
+def load_spans(trace_path: Path) -> list[dict[str, Any]]:
+    trace = json.loads(trace_path.read_text())
+    return [event for event in trace["traceEvents"] if event["ph"] == "X"]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_trace(
+    setup_paths: Any,
+    tmp_path: Path,
+    jobs: int,
+) -> None:
+    cwd, _ = setup_paths
+    input_path = cwd / "preprocessing" / "slides"
+    config_path = cwd / "preprocessing" / "preprocessing-config.yml"
+    trace_path = tmp_path / "trace.json"
+    result = run_build_strict(
+        cwd,
+        input_path,
+        tmp_path / "site",
+        config_path,
+        ["--trace", str(trace_path), "--jobs", str(jobs)],
+    )
+    assert re.search(r"Wrote\s+trace\s+with\s+\d+\s+spans", result.stdout)
+
+    spans = load_spans(trace_path)
+    names = {span["name"] for span in spans}
+    assert (
+        DECK_SPAN_NAMES
+        | {
+            "process markdown",
+            "install assets",
+            "scan",
+            "preprocess",
+            "write",
+            "generate index",
+        }
+        <= names
+    )
+
+    # Each phase of each slideshow is a separate span
+    decks = sorted(str(path) for path in input_path.rglob("*.md"))
+    for name in DECK_SPAN_NAMES:
+        assert (
+            sorted(span["args"]["deck"] for span in spans if span["name"] == name)
+            == decks
+        ), name
+
+    # Spans of the worker processes are merged into the trace
+    root_span = next(span for span in spans if span["name"] == "process markdown")
+    render_spans = [span for span in spans if span["name"] == "render"]
+    assert all(span["dur"] >= 0 for span in spans)
+    assert all(
+        root_span["ts"] <= span["ts"] <= root_span["ts"] + root_span["dur"]
+        for span in render_spans
+    )
+    assert (root_span["pid"] not in {span["pid"] for span in render_spans}) == (
+        jobs > 1
+    )
+
+
+def test_trace_is_written_when_build_fails(setup_paths: Any, tmp_path: Path) -> None:
+    cwd, _ = setup_paths
+    input_path = cwd / "relative_links" / "slides-non-existing-relative-md-link"
+    trace_path = tmp_path / "trace.json"
+
+    with pytest.raises(AssertionError):
+        run_build_strict(
+            cwd,
+            input_path,
+            tmp_path / "site",
+            None,
+            ["--trace", str(trace_path)],
+        )
+
+    names = {span["name"] for span in load_spans(trace_path)}
+    assert {"process markdown", "check links"} <= names
+    assert "render" not in names
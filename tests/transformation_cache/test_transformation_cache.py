@@ -0,0 +1,116 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import datetime as dt
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+from mkslides.linkscanner import LinkKind, LinkSpan
+from mkslides.transformationcache import TransformationCache, TransformedMarkdown
+from tests.utils import assert_html_contains, run_build_strict
+
+PREPROCESS_SCRIPT = """
+from pathlib import Path
+
+
+def preprocess(markdown_content: str) -> str:
+    with Path("{calls_path}").open("a") as file:
+        file.write(markdown_content.splitlines()[0] + "\\n")
+    return markdown_content.replace("@", "{replacement}")
+"""
+
+
+def write_preprocess_script(tmp_path: Path, replacement: str) -> None:
+    (tmp_path / "preprocess.py").write_text(
+        PREPROCESS_SCRIPT.format(
+            calls_path=tmp_path / "calls.txt",
+            replacement=replacement,
+        ),
+    )
+
+
+def get_calls(tmp_path: Path) -> list[str]:
+    calls_path = tmp_path / "calls.txt"
+    calls = calls_path.read_text().splitlines() if calls_path.exists() else []
+    calls_path.unlink(missing_ok=True)
+    return sorted(calls)
+
+
+def test_transformation_cache(tmp_path: Path) -> None:
+    input_path = tmp_path / "slides"
+    input_path.mkdir()
+    (input_path / "someslides-1.md").write_text("# Slides 1 @ :smile:\n")
+    (input_path / "someslides-2.md").write_text("# Slides 2 @\n")
+    write_preprocess_script(tmp_path, "a")
+    config_path = tmp_path / "mkslides.yml"
+    config_path.write_text("slides:\n  preprocess_script: preprocess.py\n")
+    output_path = tmp_path / "site"
+
+    run_build_strict(tmp_path, input_path, output_path, config_path)
+    assert get_calls(tmp_path) == ["# Slides 1 @ 😄", "# Slides 2 @"]
+
+    # The transformed markdown is reused by the next full build
+    run_build_strict(tmp_path, input_path, output_path, config_path)
+    assert get_calls(tmp_path) == []
+    assert_html_contains(output_path / "someslides-1.html", "# Slides 1 a 😄")
+
+    # Only changed slideshows are transformed again
+    (input_path / "someslides-2.md").write_text("# Slides 2 changed @\n")
+    run_build_strict(tmp_path, input_path, output_path, config_path)
+    assert get_calls(tmp_path) == ["# Slides 2 changed @"]
+
+    # A changed preprocess script transforms all slideshows again
+    write_preprocess_script(tmp_path, "b")
+    run_build_strict(tmp_path, input_path, output_path, config_path)
+    assert get_calls(tmp_path) == ["# Slides 1 @ 😄", "# Slides 2 changed @"]
+    assert_html_contains(output_path / "someslides-1.html", "# Slides 1 b 😄")
+
+
+def create_transformed_markdown(markdown_content: str) -> TransformedMarkdown:
+    return TransformedMarkdown(
+        frontmatter_metadata={"slides": {"title": "Title"}},
+        markdown_content=markdown_content,
+        link_spans=(
+            LinkSpan("img/example.png", LinkKind.MARKDOWN_IMAGE, 8, 23, 0, 24),
+        ),
+        preprocess_script=None,
+        preprocess_script_hash=None,
+    )
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path: Path) -> None:
+    transformed_markdown = create_transformed_markdown("x" * 1000)
+    cache = TransformationCache(tmp_path / "cache.sqlite3", max_size=2500)
+    for key in ["a", "b", "c"]:
+        cache.put(key, transformed_markdown)
+
+    # Reading an entry does not mark it as used, only the build evicting does
+    assert cache.get("a") == transformed_markdown
+    cache.evict(["a"])
+
+    assert cache.get("a") == transformed_markdown
+    assert cache.get("b") is None
+    assert cache.get("c") == transformed_markdown
+
+
+@pytest.mark.parametrize(
+    "frontmatter_metadata",
+    [{"date": dt.date(2024, 1, 1)}, {1: "a"}],
+)
+def test_frontmatter_that_json_cannot_store_is_not_cached(
+    tmp_path: Path,
+    frontmatter_metadata: dict[str, object],
+) -> None:
+    cache = TransformationCache(tmp_path / "cache.sqlite3")
+    transformed_markdown = create_transformed_markdown("")
+    cache.put(
+        "a",
+        replace(transformed_markdown, frontmatter_metadata=frontmatter_metadata),
+    )
+    assert cache.get("a") is None
+
+    cache.put("a", transformed_markdown)
+    assert cache.get("a") == transformed_markdown
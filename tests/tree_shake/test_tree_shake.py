@@ -0,0 +1,125 @@
+# SPDX-FileCopyrightText: Copyright (C) 2024 Martijn Saelens and Contributors to the project (https://github.com/MartenBE/mkslides/graphs/contributors)
+#
+# SPDX-License-Identifier: MIT
+
+import json
+from pathlib import Path
+
+from mkslides.constants import REVEALJS_PAGE_FILES
+from mkslides.treeshake import find_css_references
+from tests.utils import run_build_strict
+
+
+def setup_repository(tmp_path: Path) -> tuple[Path, Path]:
+    input_path = tmp_path / "slides"
+    input_path.mkdir()
+    (input_path / "someslides-1.md").write_text("# Slides 1\n")
+    (input_path / "someslides-2.md").write_text(
+        "---\nslides:\n  theme: league\n  highlight_theme: vs\n---\n\n# Slides 2\n",
+    )
+
+    config_path = tmp_path / "mkslides.yml"
+    config_path.write_text("slides:\n  theme: black\n")
+
+    return input_path, config_path
+
+
+def test_tree_shake_assets(tmp_path: Path) -> None:
+    input_path, config_path = setup_repository(tmp_path)
+    output_path = tmp_path / "site"
+    run_build_strict(
+        tmp_path,
+        input_path,
+        output_path,
+        config_path,
+        ["--tree-shake-assets"],
+    )
+
+    revealjs_path = output_path / "mkslides-assets" / "reveal-js"
+    highlightjs_themes_path = output_path / "mkslides-assets" / "highlight-js-themes"
+    for revealjs_file in REVEALJS_PAGE_FILES:
+        assert (revealjs_path / revealjs_file).is_file()
+
+    assert {path.name for path in (revealjs_path / "dist" / "theme").glob("*.css")} == {
+        "black.css",
+        "league.css",
+    }
+    assert {path.name for path in highlightjs_themes_path.rglob("*.css")} == {
+        "monokai.css",
+        "vs.css",
+    }
+
+    installed_paths = [
+        path
+        for path in output_path.joinpath("mkslides-assets").rglob("*")
+        if path.is_file()
+    ]
+    assert all(
+        path.is_relative_to(revealjs_path / "dist")
+        or path.is_relative_to(highlightjs_themes_path)
+        for path in installed_paths
+    )
+
+    # The fonts and stylesheets the themes reference are installed
+    for path in installed_paths:
+        if path.suffix == ".css":
+            for reference in find_css_references(path.read_text(encoding="utf-8")):
+                assert (path.parent / reference).is_file(), f"{reference} of {path}"
+
+    # Without tree-shaking all assets are installed again
+    run_build_strict(tmp_path, input_path, output_path, config_path)
+    assert (revealjs_path / "dist" / "theme" / "white.css").is_file()
+
+
+def test_tree_shake_assets_with_jobs_and_fingerprint(tmp_path: Path) -> None:
+    input_path, config_path = setup_repository(tmp_path)
+    output_path = tmp_path / "site"
+    run_build_strict(
+        tmp_path,
+        input_path,
+        output_path,
+        config_path,
+        ["--tree-shake-assets", "--jobs", "2", "--fingerprint"],
+    )
+
+    # The themes the worker processes found are installed and fingerprinted
+    fingerprints = json.loads((output_path / "fingerprints.json").read_text())
+    for output_key in [
+        "mkslides-assets/reveal-js/dist/theme/black.css",
+        "mkslides-assets/reveal-js/dist/theme/league.css",
+        "mkslides-assets/highlight-js-themes/monokai.css",
+        "mkslides-assets/highlight-js-themes/vs.css",
+    ]:
+        theme_path = output_path / output_key
+        assert theme_path.is_file()
+        assert (output_path / fingerprints[output_key]).is_file()
+        for reference in find_css_references(theme_path.read_text(encoding="utf-8")):
+            assert (theme_path.parent / reference).is_file(), (
+                f"{reference} of {theme_path}"
+            )
+
+    theme_path = output_path / "mkslides-assets" / "reveal-js" / "dist" / "theme"
+    assert not (theme_path / "white.css").exists()
+
+
+def test_find_css_references() -> None:
+    content = """
+        @import url(./fonts/league-gothic/league-gothic.css);
+        @import "print.css";
+        @import url(https://fonts.googleapis.com/css?family=Lato);
+        /* url(commented.png) */
+        @font-face {
+            src: url("font.eot?#iefix") format("embedded-opentype"),
+                url('font.woff') format("woff"),
+                url(data:font/woff2;base64,AAAA);
+        }
+        .slide { background: url( ../img/background.png ); }
+    """
+
+    assert find_css_references(content) == {
+        "./fonts/league-gothic/league-gothic.css",
+        "print.css",
+        "font.eot",
+        "font.woff",
+        "../img/background.png",
+    }
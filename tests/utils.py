@@ -14,6 +14,7 @@ def __run_build_generic(
     config_path: Path | None,
     *,
     strict: bool = False,
+    extra_args: list[str] | None = None,
 ) -> subprocess.CompletedProcess[str]:
     command = [
         "mkslides",
@@ -29,6 +30,9 @@ def __run_build_generic(
     if config_path:
         command.extend(["-f", str(config_path)])
 
+    if extra_args:
+        command.extend(extra_args)
+
     command.append(str(input_path))
 
     result = subprocess.run(
@@ -47,8 +51,16 @@ def run_build_strict(
     input_path: Path,
     output_path: Path,
     config_path: Path | None,
+    extra_args: list[str] | None = None,
 ) -> subprocess.CompletedProcess[str]:
-    return __run_build_generic(cwd, input_path, output_path, config_path, strict=True)
+    return __run_build_generic(
+        cwd,
+        input_path,
+        output_path,
+        config_path,
+        strict=True,
+        extra_args=extra_args,
+    )
 
 
 def run_build(
@@ -56,8 +68,16 @@ def run_build(
     input_path: Path,
     output_path: Path,
     config_path: Path | None,
+    extra_args: list[str] | None = None,
 ) -> subprocess.CompletedProcess[str]:
-    return __run_build_generic(cwd, input_path, output_path, config_path, strict=False)
+    return __run_build_generic(
+        cwd,
+        input_path,
+        output_path,
+        config_path,
+        strict=False,
+        extra_args=extra_args,
+    )
 
 
 def assert_file_exist(file: Path) -> None: